@@ -1,25 +1,45 @@
 from flask import Flask
 from flask_cors import CORS
 from .routes import main as routes
+from . import deadline
 from flasgger import Swagger
 
+# Values that must never sign anything (unset, or copied from .env.example)
+PLACEHOLDER_SECRET_KEYS = (None, '', 'change_me', 'your_default_secret_key')
+
 def create_app():
     app = Flask(__name__)
-    app.config.from_object('config')
+    app.config.from_object('config.Config')
+    
+    # audio_url links are signed with SECRET_KEY; with a missing or placeholder
+    # secret anyone could forge them, so questions carry inline audio instead
+    app.config['AUDIO_URLS_ENABLED'] = app.config.get('SECRET_KEY') not in PLACEHOLDER_SECRET_KEYS
+    if not app.config['AUDIO_URLS_ENABLED']:
+        print("⚠ SECRET_KEY is not set: signed audio URLs are disabled, questions carry inline audio")
     
     # Enable CORS for all routes (allow React frontend)
     CORS(app, resources={
         r"/*": {
             "origins": ["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173", "http://localhost:8080", "http://localhost:8081"],
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", deadline.DEADLINE_HEADER]
         }
     })
 
+    # Per-request time budget from X-Request-Deadline-Ms (504 once it runs out)
+    deadline.init_app(app)
+
     # Initialize Swagger
     Swagger(app)
 
     # Register blueprints
     app.register_blueprint(routes)
 
+    # Pre-render the static fallback questions into the TTS audio cache
+    from .executor import io_executor
+    from .interview_service import interview_service
+    from .tts_service import tts_service
+    if tts_service.cache and tts_service.is_available():
+        io_executor.submit(tts_service.prerender, interview_service.static_fallback_questions())
+
     return app
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+In-process caches for the AI service
+Bounded LRU caches with TTL and hit/miss counters, shared by all requests in a
+worker. The write generations that invalidate them live in SQLite, so a write
+handled by any gunicorn worker on the host invalidates every worker's entries.
+"""
+import os
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from .sqlite_store import SQLiteStore
+
+
+class TTLCache:
+    """Thread-safe bounded LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, name: str, max_size: int = 512, ttl: float = 3600.0, copy_values: bool = False):
+        """
+        Args:
+            name: Cache name reported in stats()
+            max_size: Entries kept (least recently used evicted first)
+            ttl: Seconds an entry stays valid
+            copy_values: Store and return deep copies, for mutable values that
+                callers may modify (e.g. annotate search results)
+        """
+        self.name = name
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.copy_values = copy_values
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None on miss/expiry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return copy.deepcopy(value) if self.copy_values else value
+
+    def put(self, key: Hashable, value: Any):
+        """Insert or replace an entry, evicting the least recently used if full"""
+        if self.copy_values:
+            value = copy.deepcopy(value)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'name': self.name,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class GenerationCounter:
+    """
+    Monotonic per-key write generations. Cache keys embed the current generation,
+    so bumping it makes every older entry unreachable in O(1) (they age out via LRU).
+    Generations are rows of a SQLite table shared by every worker on the host, so
+    a bump in one worker invalidates the entries cached by all of them.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        """
+        Args:
+            path: SQLite database file
+            namespace: Prefix that keeps this counter's keys apart from other counters in the file
+        """
+        self.namespace = namespace
+        self._store = SQLiteStore(path, schema=(
+            "CREATE TABLE IF NOT EXISTS cache_generations (key TEXT PRIMARY KEY, generation INTEGER NOT NULL)",
+        ))
+
+    def get(self, key: Hashable) -> int:
+        return self.get_many(key)[0]
+
+    def get_many(self, *keys: Hashable) -> Tuple[int, ...]:
+        """Current generations of keys, read in one query"""
+        names = [f"{self.namespace}:{key}" for key in keys]
+        rows = dict(self._store.connection().execute(
+            f"SELECT key, generation FROM cache_generations WHERE key IN ({', '.join('?' * len(names))})", names
+        ).fetchall())
+        return tuple(rows.get(name, 0) for name in names)
+
+    def bump(self, key: Hashable) -> int:
+        name = f"{self.namespace}:{key}"
+        with self._store.connection() as conn:
+            conn.execute(
+                "INSERT INTO cache_generations (key, generation) VALUES (?, 1) "
+                "ON CONFLICT(key) DO UPDATE SET generation = generation + 1",
+                (name,)
+            )
+            return conn.execute("SELECT generation FROM cache_generations WHERE key = ?", (name,)).fetchone()[0]
+
+
+# (job_id, write generation) -> (description, version); job descriptions rarely change
+job_description_cache = TTLCache(
+    'job_descriptions',
+    max_size=int(os.getenv('JOB_CACHE_SIZE', '512')),
+    ttl=float(os.getenv('JOB_CACHE_TTL', '3600'))
+)
+
+# (query hash, job_id, n_results, filters, generations) -> ChromaDB query results
+search_result_cache = TTLCache(
+    'search_results',
+    max_size=int(os.getenv('SEARCH_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('SEARCH_CACHE_TTL', '300')),
+    copy_values=True
+)
+
+CACHE_GENERATIONS_DB = os.getenv('CACHE_GENERATIONS_DB') or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'cache_generations.sqlite3'
+)
+
+# Write generations for application searches, keyed by job_id
+application_write_generations = GenerationCounter(CACHE_GENERATIONS_DB, 'applications')
+
+# Write generations for job descriptions, keyed by job_id
+job_description_generations = GenerationCounter(CACHE_GENERATIONS_DB, 'job_descriptions')
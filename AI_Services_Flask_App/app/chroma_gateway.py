@@ -0,0 +1,305 @@
+"""
+Single-writer ChromaDB gateway
+One process owns the persistent ChromaDB store and serves it over HTTP; Flask
+workers use GatewayClient instead of opening their own PersistentClient on the
+shared directory. Every request must carry CHROMA_GATEWAY_TOKEN in the
+X-Gateway-Token header; without a token configured, the gateway only serves
+clients on the same machine.
+
+Run the gateway (one process, many threads):
+    gunicorn -w 1 --threads 16 -b 127.0.0.1:8001 "app.chroma_gateway:create_gateway_app()"
+Point the AI service workers at it (with the same CHROMA_GATEWAY_TOKEN):
+    CHROMA_GATEWAY_URL=http://127.0.0.1:8001
+"""
+import os
+import hmac
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import deadline as request_deadline
+
+TOKEN_HEADER = 'X-Gateway-Token'
+
+# ==================== CLIENT ====================
+
+class GatewayError(Exception):
+    """Raised when the gateway rejects a request"""
+
+
+class GatewayTimeout(GatewayError):
+    """
+    Raised when a write did not finish within its budget. It may still be
+    applied unless the gateway reports it as cancelled.
+    """
+
+
+class _RemoteCollection:
+    """Subset of the chromadb Collection API, forwarded to the gateway"""
+
+    def __init__(self, client: 'GatewayClient', name: str):
+        self._client = client
+        self.name = name
+
+    def add(self, ids, documents=None, metadatas=None):
+        return self._client._post(self.name, 'add', {'ids': ids, 'documents': documents, 'metadatas': metadatas})
+
+    def upsert(self, ids, documents=None, metadatas=None):
+        return self._client._post(self.name, 'upsert', {'ids': ids, 'documents': documents, 'metadatas': metadatas})
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None):
+        payload = {'ids': ids, 'where': where, 'limit': limit, 'offset': offset}
+        if include is not None:
+            payload['include'] = include
+        return self._client._post(self.name, 'get', payload)
+
+    def query(self, query_texts, n_results=10, where=None, include=None):
+        payload = {'query_texts': query_texts, 'n_results': n_results, 'where': where}
+        if include is not None:
+            payload['include'] = include
+        return self._client._post(self.name, 'query', payload)
+
+    def delete(self, ids=None, where=None):
+        return self._client._post(self.name, 'delete', {'ids': ids, 'where': where})
+
+    def count(self):
+        return self._client._post(self.name, 'count', {})['count']
+
+
+class GatewayClient:
+    """Thin HTTP client for the gateway with a pooled keep-alive session"""
+
+    def __init__(self, base_url: str, pool_size: int = 16, timeout: float = 30.0, token: Optional[str] = None):
+        """
+        Args:
+            base_url: Gateway URL
+            pool_size: Keep-alive connections kept open to the gateway
+            timeout: Seconds a call waits at most (cut to the request deadline)
+            token: Shared CHROMA_GATEWAY_TOKEN sent with every call
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token = token
+        # Collections known to exist, so operations skip the 'ensure' round trip
+        self._known_collections = set()
+        self._known_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _post(self, collection: str, op: str, payload: Dict[str, Any], create: bool = False) -> Any:
+        # The gateway is told how long this request can still wait (bounds queued writes)
+        timeout = request_deadline.timeout_for(self.timeout, what=f"Chroma gateway {op}")
+        headers = {request_deadline.DEADLINE_HEADER: str(int(timeout * 1000))}
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        response = self.session.post(
+            f"{self.base_url}/collections/{collection}/{op}",
+            params={'create': '1'} if create else None,
+            json=payload,
+            headers=headers,
+            timeout=timeout
+        )
+        if response.status_code >= 400:
+            try:
+                message = response.json().get('error', response.text)
+            except ValueError:
+                message = response.text
+            error = GatewayTimeout if response.status_code == 504 else GatewayError
+            raise error(f"Gateway {op} on '{collection}' failed - HTTP {response.status_code}: {message}")
+        return response.json()
+
+    def _ensure(self, name: str, create: bool) -> _RemoteCollection:
+        if name not in self._known_collections:
+            self._post(name, 'ensure', {}, create=create)
+            with self._known_lock:
+                self._known_collections.add(name)
+        return _RemoteCollection(self, name)
+
+    def get_or_create_collection(self, name: str) -> _RemoteCollection:
+        return self._ensure(name, create=True)
+
+    def get_collection(self, name: str) -> _RemoteCollection:
+        return self._ensure(name, create=False)
+
+
+# ==================== SERVER ====================
+
+class _WriteBatcher:
+    """
+    Single writer thread in front of the store. Concurrent add/upsert requests
+    for the same collection are coalesced into one ChromaDB call. A write whose
+    caller gave up before it was dequeued is cancelled and never applied.
+    """
+
+    def __init__(self, client, max_batch: int = 256):
+        self.client = client
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='chroma-gateway-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, op: str, collection: str, payload: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        self._queue.put((op, collection, payload, future))
+        return future
+
+    def _run(self):
+        while True:
+            ops = [self._queue.get()]
+            while len(ops) < self.max_batch:
+                try:
+                    ops.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # From here on a write can no longer be cancelled by its caller
+            ops = [item for item in ops if item[3].set_running_or_notify_cancel()]
+            self._apply(ops)
+
+    @staticmethod
+    def _group_key(item: tuple) -> tuple:
+        op, collection, payload, _ = item
+        return op, collection, payload.get('documents') is not None, payload.get('metadatas') is not None
+
+    def _apply(self, ops: List[tuple]):
+        # Group runs of consecutive same-kind writes so ordering is preserved; a
+        # group only mixes payloads that carry the same fields, so documents and
+        # metadatas stay aligned with their ids
+        group: List[tuple] = []
+        for item in ops:
+            if group and (self._group_key(item) != self._group_key(group[0]) or item[0] == 'delete'):
+                self._apply_group(group)
+                group = []
+            group.append(item)
+        if group:
+            self._apply_group(group)
+
+    def _apply_group(self, group: List[tuple]):
+        op, collection_name = group[0][0], group[0][1]
+        try:
+            collection = self.client.get_or_create_collection(collection_name)
+            if op == 'delete':
+                payload = group[0][2]
+                collection.delete(ids=payload.get('ids'), where=payload.get('where'))
+            else:
+                ids, documents, metadatas = [], [], []
+                for _, _, payload, _ in group:
+                    ids.extend(payload['ids'])
+                    documents.extend(payload.get('documents') or [])
+                    metadatas.extend(payload.get('metadatas') or [])
+                getattr(collection, op)(
+                    ids=ids,
+                    documents=documents or None,
+                    metadatas=metadatas or None
+                )
+            for _, _, _, future in group:
+                future.set_result(True)
+        except Exception as e:
+            if len(group) > 1:
+                # One bad request must not fail the others that were batched with it
+                for item in group:
+                    self._apply_group([item])
+                return
+            group[0][3].set_exception(e)
+
+
+def create_gateway_app(persist_dir: Optional[str] = None):
+    """Flask app that owns the ChromaDB store and serves it to the AI service workers"""
+    import chromadb
+    from concurrent.futures import TimeoutError as FutureTimeout
+    from flask import Flask, request, jsonify
+    from .chromadb_utils import PERSIST_DIR
+
+    persist_dir = persist_dir or os.getenv('CHROMA_GATEWAY_PERSIST_DIR', PERSIST_DIR)
+    os.makedirs(persist_dir, exist_ok=True)
+    client = chromadb.PersistentClient(path=persist_dir)
+    batcher = _WriteBatcher(client, max_batch=int(os.getenv('CHROMA_GATEWAY_MAX_BATCH', '256')))
+    write_timeout = float(os.getenv('CHROMA_GATEWAY_WRITE_TIMEOUT', '60'))
+    token = os.getenv('CHROMA_GATEWAY_TOKEN', '')
+    if not token:
+        print("⚠ CHROMA_GATEWAY_TOKEN is not set: the Chroma gateway only serves clients on this machine")
+
+    app = Flask(__name__)
+
+    @app.before_request
+    def _authorize():
+        if token:
+            if not hmac.compare_digest(request.headers.get(TOKEN_HEADER, ''), token):
+                return jsonify({'error': 'Invalid or missing gateway token'}), 401
+        elif request.remote_addr not in ('127.0.0.1', '::1'):
+            return jsonify({'error': 'Set CHROMA_GATEWAY_TOKEN to serve other machines'}), 403
+
+    @app.route('/health', methods=['GET'])
+    def health():
+        return jsonify({'status': 'ok', 'persist_dir': persist_dir}), 200
+
+    @app.route('/collections/<name>/<op>', methods=['POST'])
+    def collection_op(name, op):
+        data = request.json or {}
+        try:
+            if op == 'ensure':
+                if request.args.get('create') == '1':
+                    client.get_or_create_collection(name)
+                else:
+                    client.get_collection(name)
+                return jsonify({'name': name}), 200
+
+            if op in ('add', 'upsert', 'delete'):
+                timeout = write_timeout
+                budget_ms = request.headers.get(request_deadline.DEADLINE_HEADER)
+                if budget_ms:
+                    try:
+                        timeout = min(timeout, float(budget_ms) / 1000)
+                    except ValueError:
+                        pass
+                future = batcher.submit(op, name, data)
+                try:
+                    future.result(timeout=timeout)
+                except FutureTimeout:
+                    if future.cancel():
+                        error = f'{op} not applied within {timeout:.1f}s and cancelled; safe to retry'
+                    else:
+                        error = f'{op} still running after {timeout:.1f}s; it may have been applied'
+                    print(f"⚠ Gateway {op} on '{name}': {error}")
+                    return jsonify({'error': error, 'cancelled': future.cancelled()}), 504
+                return jsonify({'success': True}), 200
+
+            collection = client.get_collection(name)
+            kwargs = {k: v for k, v in data.items() if v is not None}
+            if op == 'get':
+                result = collection.get(**kwargs)
+            elif op == 'query':
+                result = collection.query(**kwargs)
+            elif op == 'count':
+                return jsonify({'count': collection.count()}), 200
+            else:
+                return jsonify({'error': f'Unknown operation: {op}'}), 400
+            return jsonify(_to_json(result)), 200
+        except Exception as e:
+            print(f"✗ Gateway {op} on '{name}' failed: {e}")
+            status = 404 if op == 'ensure' else 500
+            return jsonify({'error': str(e)}), status
+
+    return app
+
+
+def _to_json(result) -> Dict[str, Any]:
+    """Convert a ChromaDB result (which may hold numpy arrays) to plain JSON types"""
+    converted = {}
+    for key, value in dict(result).items():
+        if hasattr(value, 'tolist'):
+            value = value.tolist()
+        elif isinstance(value, list):
+            value = [v.tolist() if hasattr(v, 'tolist') else v for v in value]
+        converted[key] = value
+    return converted
+
+
+if __name__ == '__main__':
+    gateway = create_gateway_app()
+    gateway.run(host='127.0.0.1', port=int(os.getenv('CHROMA_GATEWAY_PORT', '8001')), threaded=True)
@@ -2,15 +2,90 @@ import chromadb
 from chromadb.config import Settings
 import os
 import uuid
+import json
+import hashlib
+import threading
 from datetime import datetime
+from .write_queue import WriteBehindQueue
+from .chroma_gateway import GatewayClient
+from .cache import (
+    job_description_cache,
+    search_result_cache,
+    application_write_generations,
+    job_description_generations
+)
+
+PERSIST_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../chromadb_data"))
+
+# When set, the store is owned by a single gateway process (see chroma_gateway.py)
+CHROMA_GATEWAY_URL = os.getenv('CHROMA_GATEWAY_URL', '')
+
+# Write-behind settings for application writes
+WRITE_BEHIND_ENABLED = os.getenv('CHROMA_WRITE_BEHIND', 'True') == 'True'
+WRITE_BATCH_SIZE = int(os.getenv('CHROMA_WRITE_BATCH_SIZE', '64'))
+WRITE_FLUSH_INTERVAL = float(os.getenv('CHROMA_WRITE_FLUSH_INTERVAL', '0.5'))
+WRITE_COMPACT_RECORDS = int(os.getenv('CHROMA_WRITE_COMPACT_RECORDS', '1000'))
+
+_client = None
+_client_lock = threading.Lock()
+
+# Generation keys for searches that span all jobs, and for deletes (job unknown)
+ALL_JOBS_GENERATION = '__all_jobs__'
+DELETE_GENERATION = '__deletes__'
+
 
 def get_chroma_client():
-    base_dir = os.path.abspath(os.path.dirname(__file__))
-    persist_dir = os.path.join(base_dir, "../chromadb_data")
-    persist_dir = os.path.abspath(persist_dir)
-    os.makedirs(persist_dir, exist_ok=True)
-    # Use PersistentClient for ChromaDB 1.x
-    return chromadb.PersistentClient(path=persist_dir)
+    """
+    Return the process-wide ChromaDB client (opened once, then reused).
+    Talks to the single-writer gateway when CHROMA_GATEWAY_URL is set,
+    otherwise opens the persistent store directly.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if CHROMA_GATEWAY_URL:
+                    _client = GatewayClient(
+                        CHROMA_GATEWAY_URL,
+                        pool_size=int(os.getenv('CHROMA_GATEWAY_POOL_SIZE', '16')),
+                        token=os.getenv('CHROMA_GATEWAY_TOKEN') or None
+                    )
+                else:
+                    os.makedirs(PERSIST_DIR, exist_ok=True)
+                    # Use PersistentClient for ChromaDB 1.x
+                    _client = chromadb.PersistentClient(path=PERSIST_DIR)
+    return _client
+
+
+def _flush_to_chroma(collection_name, ids, documents, metadatas):
+    """Write one batch from the write-behind queue to ChromaDB"""
+    collection = get_chroma_client().get_or_create_collection(collection_name)
+    # upsert keeps replays of the log idempotent after a crash
+    write = getattr(collection, 'upsert', None) or collection.add
+    write(documents=documents, ids=ids, metadatas=metadatas)
+    if collection_name == "applications":
+        _bump_application_generations(metadatas)
+    print(f"✓ Flushed {len(ids)} writes to ChromaDB collection '{collection_name}'")
+
+
+def _bump_application_generations(metadatas):
+    """
+    Invalidate cached searches affected by newly stored applications.
+    Called once the data is actually in ChromaDB, so a search can never cache
+    results that predate a write under the new generation.
+    """
+    for job_id in {str(m.get('job_id')) for m in metadatas if m and m.get('job_id')}:
+        application_write_generations.bump(job_id)
+    application_write_generations.bump(ALL_JOBS_GENERATION)
+
+
+write_queue = WriteBehindQueue(
+    log_path=os.path.join(PERSIST_DIR, "write_behind.log"),
+    flush_fn=_flush_to_chroma,
+    batch_size=WRITE_BATCH_SIZE,
+    flush_interval=WRITE_FLUSH_INTERVAL,
+    compact_min_records=WRITE_COMPACT_RECORDS
+)
 
 def save_job_description(job_description, job_id=None):
     """
@@ -33,22 +108,38 @@ def save_job_description(job_description, job_id=None):
         "type": "job_description"
     }
     
-    collection.add(
+    # upsert, so the stored text is always the one just saved (and cached below)
+    collection.upsert(
         documents=[job_description], 
         ids=[str(job_id)],
         metadatas=[metadata]
     )
+    # Moving the job's generation on orphans the copies cached by every worker
+    generation = job_description_generations.bump(str(job_id))
+    job_description_cache.put((str(job_id), generation), (job_description, metadata['created_at']))
     print(f"✓ Job {job_id} saved to ChromaDB")
     return job_id
 
 def get_job_description(job_id):
-    """Retrieve job description from ChromaDB"""
+    """
+    Retrieve job description (read-through cache in front of ChromaDB, tagged
+    with the job's shared write generation)
+    """
+    cache_key = (str(job_id), job_description_generations.get(str(job_id)))
+    cached = job_description_cache.get(cache_key)
+    if cached is not None:
+        return cached[0]
+    
     client = get_chroma_client()
     try:
         collection = client.get_or_create_collection("job_descriptions")
         result = collection.get(ids=[str(job_id)])
         if result['documents']:
-            return result['documents'][0]
+            description = result['documents'][0]
+            metadatas = result.get('metadatas') or [None]
+            version = (metadatas[0] or {}).get('created_at')
+            job_description_cache.put(cache_key, (description, version))
+            return description
     except Exception as e:
         print(f"Error retrieving job description: {e}")
     return None
@@ -56,6 +147,8 @@ def get_job_description(job_id):
 def save_application(cv_text, application_id=None, metadata=None):
     """
     Save application CV text to ChromaDB
+    With write-behind enabled the write is durably queued and flushed to
+    ChromaDB in the background; get_application sees it immediately.
     Args:
         cv_text: The extracted CV text
         application_id: Optional application ID (if not provided, will generate UUID)
@@ -63,9 +156,6 @@ def save_application(cv_text, application_id=None, metadata=None):
     Returns:
         application_id: The ID of the saved application
     """
-    client = get_chroma_client()
-    collection = client.get_or_create_collection("applications")
-    
     if not application_id:
         application_id = str(uuid.uuid4())
     
@@ -75,20 +165,34 @@ def save_application(cv_text, application_id=None, metadata=None):
         "type": "application"
     }
     
-    # Merge with provided metadata
+    # Merge with provided metadata (ChromaDB rejects None values)
     if metadata:
-        app_metadata.update(metadata)
+        app_metadata.update({k: v for k, v in metadata.items() if v is not None})
     
+    if WRITE_BEHIND_ENABLED:
+        write_queue.enqueue("applications", str(application_id), cv_text, app_metadata)
+        print(f"✓ Application {application_id} queued for ChromaDB")
+        return application_id
+    
+    collection = get_chroma_client().get_or_create_collection("applications")
     collection.add(
         documents=[cv_text], 
         ids=[str(application_id)],
         metadatas=[app_metadata]
     )
+    _bump_application_generations([app_metadata])
     print(f"✓ Application {application_id} saved to ChromaDB")
     return application_id
 
 def get_application(application_id):
     """Retrieve application CV text from ChromaDB"""
+    pending = write_queue.get_pending("applications", application_id)
+    if pending:
+        return {
+            'cv_text': pending['document'],
+            'metadata': pending['metadata']
+        }
+    
     client = get_chroma_client()
     try:
         collection = client.get_collection("applications")
@@ -102,6 +206,59 @@ def get_application(application_id):
         print(f"Error retrieving application: {e}")
     return None
 
+def list_application_ids(offset=0, limit=500):
+    """
+    Page through application IDs stored in ChromaDB (IDs only, no documents)
+    Args:
+        offset: Number of stored applications to skip
+        limit: Maximum number of IDs to return
+    Returns:
+        List of application IDs in storage order
+    Raises:
+        Any ChromaDB error (reconciliation must not mistake a failure for an empty store)
+    """
+    collection = get_chroma_client().get_or_create_collection("applications")
+    result = collection.get(limit=limit, offset=offset, include=[])
+    return result.get('ids') or []
+
+
+def get_existing_application_ids(application_ids):
+    """
+    Return the subset of application_ids present in ChromaDB (including queued
+    writes). ChromaDB errors propagate, so a failed check is never read as
+    "every application is missing".
+    """
+    ids = [str(i) for i in application_ids]
+    existing = {i for i in ids if write_queue.get_pending("applications", i)}
+    collection = get_chroma_client().get_or_create_collection("applications")
+    result = collection.get(ids=ids, include=[])
+    existing.update(result.get('ids') or [])
+    return [i for i in ids if i in existing]
+
+
+def delete_applications(application_ids):
+    """
+    Delete a batch of applications from ChromaDB, together with any queued
+    write for them (otherwise the next flush would add them back). Returns the
+    number requested.
+    """
+    ids = [str(i) for i in application_ids]
+    if not ids:
+        return 0
+    
+    def delete(ids):
+        collection = get_chroma_client().get_or_create_collection("applications")
+        collection.delete(ids=ids)
+    
+    if WRITE_BEHIND_ENABLED:
+        write_queue.discard("applications", ids, delete)
+    else:
+        delete(ids)
+    # The deleted rows' jobs are unknown here, so invalidate every cached search
+    application_write_generations.bump(DELETE_GENERATION)
+    print(f"✓ Deleted {len(ids)} applications from ChromaDB")
+    return len(ids)
+
 def search_similar_applications(query_text, job_id=None, n_results=10):
     """
     Search for similar applications using semantic search
@@ -112,20 +269,35 @@ def search_similar_applications(query_text, job_id=None, n_results=10):
     Returns:
         List of similar applications with scores
     """
+    where_filter = None
+    if job_id:
+        where_filter = {"job_id": str(job_id)}
+    
+    # Entries are tagged with the job's write generation; any write to the job
+    # (or any delete) moves the generation on and orphans the stale entries
+    generation_key = str(job_id) if job_id else ALL_JOBS_GENERATION
+    cache_key = (
+        hashlib.sha256(query_text.encode('utf-8')).hexdigest(),
+        str(job_id) if job_id else None,
+        n_results,
+        json.dumps(where_filter, sort_keys=True),
+        application_write_generations.get_many(generation_key, DELETE_GENERATION)
+    )
+    cached = search_result_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     client = get_chroma_client()
     try:
         collection = client.get_collection("applications")
         
-        where_filter = None
-        if job_id:
-            where_filter = {"job_id": str(job_id)}
-        
         results = collection.query(
             query_texts=[query_text],
             n_results=n_results,
             where=where_filter if where_filter else None
         )
         
+        search_result_cache.put(cache_key, results)
         return results
     except Exception as e:
         print(f"Error searching applications: {e}")
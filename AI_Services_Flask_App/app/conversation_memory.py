@@ -0,0 +1,146 @@
+"""
+Rolling conversation memory
+Question prompts used to carry the last few raw messages, and the final
+evaluation the whole transcript, so long interviews either lost context or
+paid for it in tokens. Instead each answered question is folded, once, into a
+one-line digest (topic, question gist, the most informative part of the
+answer) and its topics are added to a covered-topics list. The newest digests
+are kept within a token cap and older ones collapse into their topics, so the
+memory a prompt carries stays the same size however long the interview runs.
+The memory is a plain dict, kept on the interview session.
+"""
+import os
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from .prompt_builder import build_brief, truncate_to_tokens, estimate_tokens
+from .question_bank import question_bank
+
+MEMORY_VERSION = 1
+
+
+def _fingerprint(question: str, answer: str) -> str:
+    return hashlib.sha256(f"{question}\x00{answer}".encode('utf-8')).hexdigest()[:16]
+
+
+class ConversationMemory:
+    """Folds Q/A pairs into a capped running summary and covered-topics list"""
+
+    def __init__(self, summary_tokens: int = 300, max_topics: int = 24, question_tokens: int = 25,
+                 answer_tokens: int = 45):
+        """
+        Args:
+            summary_tokens: Cap on the digests kept verbatim (older ones keep only their topics)
+            max_topics: Covered topics remembered (oldest dropped first)
+            question_tokens: Length of the question gist in a digest
+            answer_tokens: Length of the answer gist in a digest
+        """
+        self.summary_tokens = summary_tokens
+        self.max_topics = max_topics
+        self.question_tokens = question_tokens
+        self.answer_tokens = answer_tokens
+        self._lock = threading.Lock()
+        self._stats = {'folded': 0, 'rebuilt': 0, 'collapsed': 0}
+
+    def _pairs(self, conversation_history: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], str]]:
+        """(interviewer message, answer) for every question that has been answered"""
+        pairs = []
+        question = None
+        for msg in conversation_history:
+            if msg.get('role') == 'interviewer':
+                question = msg
+            elif msg.get('role') == 'candidate' and question is not None:
+                pairs.append((question, msg.get('content', '')))
+                question = None
+        return pairs
+
+    def _topics_of(self, question: Dict[str, Any]) -> List[str]:
+        """Skills the question asked about, else its focus area, else a short gist"""
+        text = question.get('content', '')
+        skills = sorted(question_bank.skills_in(text))
+        if skills:
+            return skills
+        focus_area = (question.get('focus_area') or '').strip()
+        if focus_area and focus_area not in ('general', 'technical', 'clarification'):
+            return [focus_area]
+        return [truncate_to_tokens(text, 8)]
+
+    def _empty(self) -> Dict[str, Any]:
+        return {'version': MEMORY_VERSION, 'pairs': 0, 'last': None, 'digests': [], 'earlier': [], 'topics': []}
+
+    def update(self, memory: Optional[Dict[str, Any]], conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        memory with every answered question in conversation_history folded in.
+        Only pairs not folded yet are processed; a history that no longer matches
+        (a retried answer replaced, a question dropped) is folded again from the
+        start. Returns the same object when there is nothing new.
+        """
+        pairs = self._pairs(conversation_history)
+        if memory and memory.get('version') == MEMORY_VERSION and memory['pairs'] <= len(pairs):
+            folded = memory['pairs']
+            last = pairs[folded - 1] if folded else None
+            if folded == 0 or memory['last'] == _fingerprint(last[0].get('content', ''), last[1]):
+                if folded == len(pairs):
+                    return memory
+                new_memory = {**memory, 'digests': list(memory['digests']), 'earlier': list(memory['earlier']),
+                              'topics': list(memory['topics'])}
+                return self._fold(new_memory, pairs, folded)
+        if memory:
+            with self._lock:
+                self._stats['rebuilt'] += 1
+        return self._fold(self._empty(), pairs, 0)
+
+    def _fold(self, memory: Dict[str, Any], pairs: List[Tuple[Dict[str, Any], str]], start: int) -> Dict[str, Any]:
+        collapsed = 0
+        for number, (question, answer) in enumerate(pairs[start:], start=start + 1):
+            topics = self._topics_of(question)
+            for topic in topics:
+                if topic in memory['topics']:
+                    memory['topics'].remove(topic)
+                memory['topics'].append(topic)
+            del memory['topics'][:-self.max_topics]
+
+            answer_gist = build_brief(answer, self.answer_tokens).replace('\n', ' ') or '(no answer)'
+            memory['digests'].append(
+                f"Q{number} [{', '.join(topics)}]: {truncate_to_tokens(question.get('content', ''), self.question_tokens)}"
+                f" -> {truncate_to_tokens(answer_gist, self.answer_tokens)}"
+            )
+            # Oldest digests collapse to their topics once the verbatim part is over its cap
+            while len(memory['digests']) > 1 and \
+                    sum(estimate_tokens(d) for d in memory['digests']) > self.summary_tokens:
+                oldest = memory['digests'].pop(0)
+                label = oldest.split(']:', 1)[0].split('[', 1)[-1]
+                if label in memory['earlier']:
+                    memory['earlier'].remove(label)
+                memory['earlier'] = (memory['earlier'] + [label])[-self.max_topics:]
+                collapsed += 1
+
+        memory['pairs'] = len(pairs)
+        memory['last'] = _fingerprint(pairs[-1][0].get('content', ''), pairs[-1][1]) if pairs else None
+        with self._lock:
+            self._stats['folded'] += len(pairs) - start
+            self._stats['collapsed'] += collapsed
+        return memory
+
+    def summary(self, memory: Dict[str, Any]) -> str:
+        """Running summary for prompts: collapsed topics, then the recent digests"""
+        lines = []
+        if memory['earlier']:
+            lines.append(f"Earlier questions covered: {'; '.join(memory['earlier'])}")
+        lines.extend(memory['digests'])
+        return '\n'.join(lines) or '(nothing yet)'
+
+    def covered_topics(self, memory: Dict[str, Any]) -> str:
+        """Covered topics for prompts, oldest first"""
+        return ' | '.join(memory['topics']) or '(none yet)'
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {'summary_tokens': self.summary_tokens, 'max_topics': self.max_topics, **stats}
+
+
+conversation_memory = ConversationMemory(
+    summary_tokens=int(os.getenv('MEMORY_SUMMARY_TOKENS', '300')),
+    max_topics=int(os.getenv('MEMORY_MAX_TOPICS', '24'))
+)
@@ -0,0 +1,155 @@
+"""
+Request-scoped deadlines
+Each request gets a time budget when it arrives: the caller's
+X-Request-Deadline-Ms header (milliseconds the caller will wait), else
+REQUEST_DEADLINE_MS. The deadline lives in a context variable, so every
+downstream call made while serving the request (LLM attempts, TTS, STT, the
+Chroma gateway) sizes its timeout to the time that is left, and skips work
+that could no longer finish. Work handed to io_executor carries the deadline
+along; background work that outlives the request runs detached() (or is
+handed over with io_executor.submit_detached).
+"""
+import os
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Iterator
+
+DEADLINE_HEADER = 'X-Request-Deadline-Ms'
+# Budget for requests that send no header (0 = no deadline)
+REQUEST_DEADLINE_MS = float(os.getenv('REQUEST_DEADLINE_MS', '60000'))
+# Longest budget a caller may ask for
+REQUEST_DEADLINE_MAX_MS = float(os.getenv('REQUEST_DEADLINE_MAX_MS', '180000'))
+
+# time.monotonic() value the current request must finish by, None when unbounded
+_deadline: ContextVar[Optional[float]] = ContextVar('request_deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when too little of the request's time budget is left for a call"""
+
+
+def current() -> Optional[float]:
+    """The deadline in force (a time.monotonic() value), or None"""
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline (may be negative), or None without a deadline"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def clamp(deadline: float) -> float:
+    """The earlier of deadline and the request deadline"""
+    current_deadline = _deadline.get()
+    return deadline if current_deadline is None else min(deadline, current_deadline)
+
+
+def timeout_for(default: float, minimum: float = 0.0, what: str = 'call') -> float:
+    """
+    Timeout for one downstream call: default, cut to the time left.
+
+    Args:
+        default: The call's own timeout in seconds
+        minimum: Shortest budget the call can plausibly succeed in
+        what: Name of the call, for the error message
+
+    Raises:
+        DeadlineExceeded: when less than minimum (or nothing) is left
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0 or left < minimum:
+        raise DeadlineExceeded(f"{max(left, 0) * 1000:.0f}ms left, not enough for {what}")
+    return min(default, left)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float] = None, at: Optional[float] = None) -> Iterator[Optional[float]]:
+    """
+    Tighten the deadline to `seconds` from now (or to the monotonic time `at`)
+    for the enclosed block; a deadline already in force is never extended.
+    """
+    candidates = [d for d in (_deadline.get(), at,
+                              time.monotonic() + seconds if seconds is not None else None) if d is not None]
+    token = _deadline.set(min(candidates) if candidates else None)
+    try:
+        yield _deadline.get()
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """Run the enclosed block without the request's deadline (work that outlives the request)"""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def carry(iterator: Iterator) -> Iterator:
+    """
+    Iterate under the deadline in force now. A streamed response body is
+    produced after the view has returned and its deadline was cleared.
+    """
+    at = _deadline.get()
+    iterator = iter(iterator)
+
+    def run():
+        while True:
+            token = _deadline.set(at)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _deadline.reset(token)
+            yield item
+    return run()
+
+
+def _request_budget(header: Optional[str]) -> Optional[float]:
+    """
+    Seconds granted to a request given its deadline header. A header that is
+    not a positive finite number gets the default budget, so a caller cannot
+    lift the deadline (or the REQUEST_DEADLINE_MAX_MS cap) with 0, -1 or NaN.
+    """
+    budget_ms = REQUEST_DEADLINE_MS
+    if header:
+        try:
+            requested_ms = float(header)
+        except ValueError:
+            requested_ms = None
+        if requested_ms is not None and math.isfinite(requested_ms) and requested_ms > 0:
+            budget_ms = min(requested_ms, REQUEST_DEADLINE_MAX_MS)
+    return budget_ms / 1000 if budget_ms > 0 else None
+
+
+def init_app(app):
+    """Start each request's deadline from its header and answer 504 once it is exceeded"""
+    from flask import g, request, jsonify
+
+    @app.before_request
+    def _start_deadline():
+        budget = _request_budget(request.headers.get(DEADLINE_HEADER))
+        g.deadline_token = _deadline.set(time.monotonic() + budget if budget is not None else None)
+
+    @app.teardown_request
+    def _clear_deadline(exc=None):
+        token = g.pop('deadline_token', None)
+        if token is not None:
+            try:
+                _deadline.reset(token)
+            except ValueError:
+                # Reset from a different context (e.g. a streamed response finishing later)
+                _deadline.set(None)
+
+    @app.errorhandler(DeadlineExceeded)
+    def _deadline_exceeded(e):
+        print(f"⚠ Request deadline exceeded: {e}")
+        return jsonify({'error': 'Request deadline exceeded', 'detail': str(e)}), 504
@@ -0,0 +1,300 @@
+"""
+Background evaluation jobs
+Answer and interview evaluation run on their own bounded worker pool, apart from
+the shared I/O executor that question generation and TTS use, so scoring never
+sits on the candidate's critical path and can be rate-limited on its own.
+Job state is written through to SQLite, so a poll reaching any worker on the
+host finds the job, and results can be pushed to Django's interview-results
+endpoint as a webhook once ready.
+"""
+import os
+import json
+import time
+import uuid
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+import requests
+from .sqlite_store import SQLiteStore
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """Raised when max_pending jobs are already queued or running on the host"""
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to another user
+        return True
+    return True
+
+
+class EvaluationJobQueue:
+    """
+    Bounded pool of evaluation jobs addressable by job ID. Jobs run in the
+    worker that accepted them; their state is stored in a SQLite table shared
+    by every worker, so polls may reach any of them. A job whose worker died
+    before it finished is reported as failed, so the client can fall back.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = 2,
+        max_pending: int = 50,
+        ttl: float = 3600.0,
+        max_retained: int = 2000,
+        webhook_url: Optional[str] = None,
+        webhook_timeout: float = 10.0,
+        webhook_retries: int = 3
+    ):
+        """
+        Args:
+            path: SQLite database file job state is shared through
+            workers: Evaluations that run at once
+            max_pending: Queued plus running jobs on the host (all workers) before submit() refuses new ones
+            ttl: Seconds a finished job stays available for polling
+            max_retained: Finished jobs kept at most (oldest dropped first)
+            webhook_url: URL finished interview evaluations are POSTed to (None disables)
+            webhook_timeout: Per-attempt timeout for webhook delivery
+            webhook_retries: Extra delivery attempts after a connection error or 5xx
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.max_retained = max_retained
+        self.webhook_url = webhook_url
+        self.webhook_timeout = webhook_timeout
+        self.webhook_retries = webhook_retries
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='eval')
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._store = SQLiteStore(path, schema=(
+            "CREATE TABLE IF NOT EXISTS evaluation_jobs ("
+            "job_id TEXT PRIMARY KEY, finished_at REAL, updated_at REAL NOT NULL, data TEXT NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_finished ON evaluation_jobs (finished_at)"
+        ))
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'webhooks_delivered': 0,
+            'webhooks_failed': 0
+        }
+
+    @property
+    def webhook_enabled(self) -> bool:
+        return bool(self.webhook_url)
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[..., Dict[str, Any]],
+        *args,
+        webhook_payload: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue fn(*args) and return the new job's public view. With webhook_payload
+        and a configured webhook_url, the finished result is mapped through it and
+        POSTed to the webhook.
+        """
+        with self._lock:
+            self._prune()
+            conn = self._store.connection()
+            with conn:
+                # Count and insert in one write transaction, so workers can't both take the last slot
+                conn.execute("BEGIN IMMEDIATE")
+                pending = self._count_pending(conn)
+                if pending >= self.max_pending:
+                    self._stats['rejected'] += 1
+                    raise QueueFullError(f"{pending} evaluation jobs already pending")
+                job = self._new_job(kind, webhook_payload)
+                self._save(job, conn)
+            self._stats['submitted'] += 1
+            view = self._view(job)
+        self._executor.submit(self._run, job, fn, args, webhook_payload)
+        return view
+
+    def _new_job(self, kind: str, webhook_payload: Optional[Callable]) -> Dict[str, Any]:
+        return {
+            'job_id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': QUEUED,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            'webhook': {'status': 'pending', 'attempts': 0} if webhook_payload and self.webhook_enabled else None,
+            'pid': os.getpid()
+        }
+
+    def _count_pending(self, conn) -> int:
+        """
+        Queued plus running jobs of every worker on the host. Jobs left unfinished
+        by a worker that died are marked failed instead, so they stop counting
+        and are pruned like other finished jobs.
+        """
+        pending = 0
+        rows = conn.execute("SELECT data FROM evaluation_jobs WHERE finished_at IS NULL").fetchall()
+        for (data,) in rows:
+            job = json.loads(data)
+            if job['pid'] == os.getpid() or _process_alive(job['pid']):
+                pending += 1
+            else:
+                self._save(self._orphaned(job, finished_at=time.time()), conn)
+        return pending
+
+    @staticmethod
+    def _orphaned(job: Dict[str, Any], finished_at: Optional[float] = None) -> Dict[str, Any]:
+        """A job whose worker stopped: nothing will finish it or deliver it"""
+        if job['status'] in (QUEUED, RUNNING):
+            job.update(status=FAILED, error='The worker running this job stopped before it finished')
+            if finished_at is not None:
+                job['finished_at'] = finished_at
+        if job['webhook'] is not None and job['webhook'].get('status') == 'pending':
+            job['webhook']['status'] = 'failed'
+        return job
+
+    def _save(self, job: Dict[str, Any], conn=None):
+        """Write a job's current state through to SQLite (caller holds the lock)"""
+        if conn is not None:
+            self._write(conn, job)
+            return
+        with self._store.connection() as conn:
+            self._write(conn, job)
+
+    @staticmethod
+    def _write(conn, job: Dict[str, Any]):
+        conn.execute(
+            "INSERT OR REPLACE INTO evaluation_jobs (job_id, finished_at, updated_at, data) VALUES (?, ?, ?, ?)",
+            (job['job_id'], job['finished_at'], time.time(), json.dumps(job))
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's public view from any worker, or None if unknown or expired"""
+        row = self._store.connection().execute(
+            "SELECT data FROM evaluation_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = json.loads(row[0])
+        if job['finished_at'] is not None and job['finished_at'] < time.time() - self.ttl:
+            return None
+        unfinished = job['status'] in (QUEUED, RUNNING) or (job['webhook'] or {}).get('status') == 'pending'
+        if unfinished and job['pid'] != os.getpid() and not _process_alive(job['pid']):
+            # The worker was restarted
+            job = self._orphaned(job)
+        return self._view(job)
+
+    def _run(self, job: Dict[str, Any], fn: Callable, args: tuple, webhook_payload: Optional[Callable]):
+        job_id = job['job_id']
+        with self._lock:
+            job['status'] = RUNNING
+            job['started_at'] = time.time()
+            self._save(job)
+        try:
+            result = fn(*args)
+        except Exception as e:
+            print(f"⚠ Evaluation job {job_id} failed: {e}")
+            with self._lock:
+                job.update(status=FAILED, error=str(e), finished_at=time.time())
+                if job['webhook'] is not None:
+                    job['webhook']['status'] = 'skipped'
+                self._save(job)
+                self._stats['failed'] += 1
+            return
+        with self._lock:
+            job.update(status=COMPLETED, result=result, finished_at=time.time())
+            self._save(job)
+            self._stats['completed'] += 1
+        if job['webhook'] is not None:
+            self._deliver(job, webhook_payload(result))
+
+    def _deliver(self, job: Dict[str, Any], payload: Dict[str, Any]):
+        """
+        POST a finished result to the webhook, retrying connection errors and 5xx.
+        The delivery state is built locally and assigned to the job under the lock.
+        """
+        with self._lock:
+            webhook = dict(job['webhook'])
+        status = 'failed'
+        for attempt in range(self.webhook_retries + 1):
+            if attempt:
+                time.sleep(random.uniform(0, min(8.0, 0.5 * 2 ** attempt)))
+            webhook['attempts'] = attempt + 1
+            try:
+                response = self._session.post(self.webhook_url, json=payload, timeout=self.webhook_timeout)
+            except requests.RequestException as e:
+                webhook['error'] = str(e)
+                continue
+            webhook['status_code'] = response.status_code
+            if response.status_code < 500:
+                # 409 means the results were already saved (e.g. by the browser)
+                status = 'delivered' if response.status_code < 300 or response.status_code == 409 else 'rejected'
+                break
+        webhook['status'] = status
+        with self._lock:
+            job['webhook'] = webhook
+            self._save(job)
+            self._stats['webhooks_delivered' if status == 'delivered' else 'webhooks_failed'] += 1
+        if status == 'delivered':
+            print(f"✓ Delivered evaluation job {job['job_id']} to webhook")
+        else:
+            print(f"⚠ Webhook delivery for evaluation job {job['job_id']} {status}: {webhook}")
+
+    def _prune(self):
+        """Drop finished jobs past their TTL or beyond max_retained (caller holds the lock)"""
+        with self._store.connection() as conn:
+            conn.execute("DELETE FROM evaluation_jobs WHERE finished_at < ?", (time.time() - self.ttl,))
+            conn.execute(
+                "DELETE FROM evaluation_jobs WHERE job_id IN (SELECT job_id FROM evaluation_jobs "
+                "WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_retained,)
+            )
+
+    def _view(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        view = {key: job[key] for key in ('job_id', 'kind', 'status', 'created_at', 'finished_at')}
+        if job['status'] == COMPLETED:
+            view['result'] = job['result']
+        elif job['status'] == FAILED:
+            view['error'] = job['error']
+        if job['webhook'] is not None:
+            view['webhook'] = dict(job['webhook'])
+        return view
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._store.connection()
+        retained = conn.execute("SELECT COUNT(*) FROM evaluation_jobs").fetchone()[0]
+        pending = conn.execute("SELECT COUNT(*) FROM evaluation_jobs WHERE finished_at IS NULL").fetchone()[0]
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': pending,
+                'max_pending': self.max_pending,
+                'retained': retained,
+                'webhook_enabled': self.webhook_enabled,
+                **self._stats
+            }
+
+
+evaluation_jobs = EvaluationJobQueue(
+    path=os.getenv('EVAL_JOB_DB') or os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'evaluation_jobs.sqlite3'
+    ),
+    workers=int(os.getenv('EVAL_JOB_WORKERS', '2')),
+    max_pending=int(os.getenv('EVAL_JOB_MAX_PENDING', '50')),
+    ttl=float(os.getenv('EVAL_JOB_TTL_SECONDS', '3600')),
+    webhook_url=os.getenv('EVAL_RESULTS_WEBHOOK_URL') or None
+)
@@ -0,0 +1,32 @@
+"""
+Shared I/O executor
+Bounded thread pool for slow outbound calls (LLM, TTS, STT) so independent
+calls made while serving one request overlap instead of running back to back.
+Each task runs in a copy of the submitting context, so it keeps the request's
+deadline (see deadline.py); fire-and-forget work that outlives the request is
+submitted detached from it.
+"""
+import os
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future
+from . import deadline as request_deadline
+
+IO_EXECUTOR_WORKERS = int(os.getenv('IO_EXECUTOR_WORKERS', '32'))
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks see the context variables of the thread that submitted them"""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
+
+    def submit_detached(self, fn, /, *args, **kwargs) -> Future:
+        """Submit background work that outlives the request, without the request's deadline"""
+        def run():
+            with request_deadline.detached():
+                return fn(*args, **kwargs)
+        return self.submit(run)
+
+
+io_executor = ContextThreadPoolExecutor(max_workers=IO_EXECUTOR_WORKERS, thread_name_prefix='io')
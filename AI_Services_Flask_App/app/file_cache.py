@@ -0,0 +1,145 @@
+"""
+Content-addressed, size-bounded on-disk file cache
+Files are named by a sha256 key, written atomically and evicted
+least-recently-used (by mtime) once the directory exceeds its size bound.
+Backs the TTS audio cache (.mp3) and the LLM response cache (.json). Every
+gunicorn worker writes into the same directory, so the size bound is checked
+against a scan of the directory, not against what this process wrote.
+"""
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no cross-worker lock
+    fcntl = None
+
+
+class FileCache:
+    """Size-bounded LRU cache of files, safe to share between worker processes"""
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = '.mp3'):
+        """
+        Args:
+            directory: Directory holding the cached files (shared by all workers)
+            max_bytes: Size bound for all files in the directory together
+            suffix: File extension of the cached files
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._entries = 0
+        self._total_bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, '.evict.lock')
+        self._scan()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        payload = json.dumps(list(parts), ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def _scan(self):
+        """List the cached files of every worker, oldest mtime (least recently used) first"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.suffix):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Evicted by another worker during the scan
+                continue
+            entries.append((stat.st_mtime, entry.name[:-len(self.suffix)], stat.st_size))
+        entries.sort()
+        with self._lock:
+            self._entries = len(entries)
+            self._total_bytes = sum(size for _, _, size in entries)
+        return entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached bytes or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cached_file:
+                data = cached_file.read()
+            # mtime doubles as the last-access time for LRU, across workers and restarts
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+        with self._lock:
+            self._stats['hits'] += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Atomically store bytes, then evict the least recently used files if the directory is over size"""
+        if not data:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._stats['writes'] += 1
+        self._evict(keep=key)
+
+    def _evict(self, keep: str):
+        """
+        Bring the directory back under max_bytes. The size is rebuilt from a
+        scan because other workers write into the same directory; the scan
+        and removals run under a file lock so workers don't evict twice.
+        """
+        with open(self._lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            entries = self._scan()
+            total = sum(size for _, _, size in entries)
+            evicted = 0
+            for _, old_key, size in entries:
+                if total <= self.max_bytes:
+                    break
+                if old_key == keep:
+                    continue
+                try:
+                    os.remove(self._path(old_key))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted += 1
+        with self._lock:
+            self._entries = len(entries) - evicted
+            self._total_bytes = total
+            self._stats['evictions'] += evicted
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters of this worker; entries/bytes are the whole directory as of the last scan"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'entries': self._entries,
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else 0.0
+            }
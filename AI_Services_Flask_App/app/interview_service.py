@@ -4,20 +4,35 @@ Uses the same fallback approach as CV parsing for reliability
 """
 import os
 from dotenv import load_dotenv
-import json
-import re
-import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from .llm_client import openrouter_client, extract_json, JsonStringFieldStreamer, LLMError
+from .llm_cache import LLM_CACHE_TTL_INITIAL_QUESTION, LLM_CACHE_TTL_EVALUATION
+from .prompt_builder import prompt_builder, estimate_tokens, truncate_to_tokens
+from .question_bank import question_bank
+from .conversation_memory import conversation_memory
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Prompt budget for batched evaluation; transcripts over it are split into several calls
+EVAL_BATCH_TOKEN_BUDGET = int(os.getenv('EVAL_BATCH_TOKEN_BUDGET', '6000'))
+EVAL_BATCH_QUESTION_TOKENS = 120
+EVAL_BATCH_ANSWER_TOKENS = 375
+
+BATCH_EVALUATION_SYSTEM_PROMPT = """You are a fair technical interviewer evaluating a completed interview.
+Judge each answer on technical accuracy, clarity, effort and alignment with the candidate's CV,
+giving credit for partial understanding. Be encouraging while being honest about their capabilities."""
+
 
 class InterviewService:
     """Service for generating interview questions and evaluating answers using multiple LLM models"""
     
     def __init__(self):
-        self.api_key = os.getenv('OPENROUTER_API_KEY', '')
+        self.llm = openrouter_client
+        self.prompts = prompt_builder
+        self.question_bank = question_bank
+        self.memory = conversation_memory
+        self.api_key = self.llm.api_key
         self.models_to_try = [
             "google/gemini-flash-1.5",
             "meta-llama/llama-3.1-8b-instruct:free",
@@ -25,99 +40,45 @@ class InterviewService:
             "anthropic/claude-3-haiku"
         ]
     
-    def _call_llm(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> Optional[str]:
-        """Call LLM with multi-model fallback approach"""
+    def _call_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 1000,
+        required_keys: tuple = (),
+        cache_ttl: Optional[float] = None,
+        site: str = 'unknown'
+    ) -> Optional[str]:
+        """
+        Call LLM with multi-model fallback approach. With required_keys, a reply
+        whose JSON lacks any of them counts as a failed model (and loses a hedge race).
+        cache_ttl opts the call site in to replaying a cached answer to the same prompt.
+        site names the call site in the LLM telemetry.
+        """
         if not self.api_key:
             print("OPENROUTER_API_KEY not set")
             return None
         
-        last_error = None
-        
-        for model in self.models_to_try:
-            try:
-                print(f"Trying model: {model}")
-                
-                response = requests.post(
-                    url="https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://selectra-ai.com",
-                        "X-Title": "Selectra AI Interviews",
-                    },
-                    json={
-                        "model": model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "temperature": 0.7,
-                        "max_tokens": max_tokens
-                    },
-                    timeout=30
-                )
-                
-                result_data = response.json()
-                
-                # Check for errors
-                if 'error' in result_data:
-                    error_msg = result_data['error'].get('message', 'Unknown error')
-                    print(f"Model {model} failed: {error_msg}")
-                    last_error = error_msg
-                    continue
-                
-                if response.status_code != 200:
-                    print(f"Model {model} failed - HTTP {response.status_code}")
-                    last_error = f"HTTP {response.status_code}"
-                    continue
-                
-                if 'choices' not in result_data or not result_data['choices']:
-                    print(f"Model {model} failed - No choices in response")
-                    last_error = "No choices in response"
-                    continue
-                
-                result = result_data['choices'][0]['message']['content'].strip()
-                print(f"SUCCESS! Using model: {model}")
-                return result
-                
-            except requests.exceptions.RequestException as e:
-                print(f"Model {model} failed - Request error: {str(e)[:100]}")
-                last_error = str(e)[:100]
-                continue
-            except Exception as e:
-                print(f"Model {model} failed - Error: {str(e)[:100]}")
-                last_error = str(e)[:100]
-                continue
+        validate = None
+        if required_keys:
+            validate = lambda text: all(extract_json(text).get(key) is not None for key in required_keys)
         
-        print(f"All models failed. Last error: {last_error}")
-        return None
+        return self.llm.complete(
+            self.models_to_try,
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0.7,
+            max_tokens=max_tokens,
+            validate=validate,
+            cache_ttl=cache_ttl,
+            site=site
+        )
     
     def _parse_json_response(self, text: str) -> Dict[str, Any]:
         """Parse JSON from LLM response with fallback handling"""
-        if not text:
-            return {}
-        
-        # Clean up response
-        cleaned = text.strip()
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]
-        elif cleaned.startswith('```'):
-            cleaned = cleaned[3:]
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]
-        
-        try:
-            return json.loads(cleaned.strip())
-        except json.JSONDecodeError:
-            # Try to extract JSON object
-            match = re.search(r'\{.*\}', cleaned, re.S)
-            if match:
-                try:
-                    return json.loads(match.group(0))
-                except json.JSONDecodeError:
-                    pass
-        
-        return {}
+        return extract_json(text)
     
     def generate_initial_question(self, job_description: str, resume_summary: str) -> Dict[str, Any]:
         """Generate the first interview question based on job description and resume"""
@@ -129,11 +90,11 @@ class InterviewService:
 
 NEVER ask generic questions. Always reference specific skills/projects from CV."""
         
-        user_prompt = f"""Generate a SHORT opening question based on the CV.
+        user_template = """Generate a SHORT opening question based on the CV.
 
-Job: {job_description[:1500]}
+Job: {job}
 
-CV: {resume_summary[:1500]}
+CV: {cv}
 
 RULES:
 - Maximum 25-30 words
@@ -148,9 +109,15 @@ GOOD examples (notice they're SHORT):
 
 Return JSON:
 {{"question": "Your SHORT specific question", "focus_area": "skill/tech referenced"}}"""
+        system_prompt, user_prompt = self.prompts.fit(
+            'initial_question', system_prompt, user_template,
+            job=self.prompts.job_brief(job_description),
+            cv=self.prompts.candidate_brief(resume_summary)
+        )
 
         print("\n=== Generating Initial Interview Question ===")
-        response = self._call_llm(system_prompt, user_prompt, max_tokens=300)
+        response = self._call_llm(system_prompt, user_prompt, max_tokens=300, required_keys=('question',),
+                                  cache_ttl=LLM_CACHE_TTL_INITIAL_QUESTION, site='initial_question')
         
         if response:
             data = self._parse_json_response(response)
@@ -163,35 +130,200 @@ Return JSON:
                     'requires_followup': True
                 }
         
-        # Fallback: Try to extract a skill from resume and ask about it
-        fallback_question = self._generate_fallback_question(resume_summary, job_description)
-        return {
-            'success': True,
-            'question': fallback_question,
-            'type': 'opening',
-            'focus_area': 'technical',
-            'fallback': True
-        }
+        # Fallback: a question from the local bank about a skill in the CV
+        return self.bank_question(job_description, resume_summary, [], 1, question_type='opening')
     
-    def _generate_fallback_question(self, resume_summary: str, job_description: str) -> str:
-        """Generate a fallback question by extracting skills from resume"""
-        import re
+    def generate_interview_plan(
+        self,
+        job_description: str,
+        resume_summary: str,
+        total_questions: int = 5
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Draft the interview's new-topic questions in one call: an ordered list of
+        distinct topics from the job requirements and CV, each with a question.
+        New-topic steps are then served from the plan without an LLM call; only
+        follow-ups on the candidate's answers still call the model.
         
-        # Common technical skills to look for
-        tech_patterns = [
-            r'\b(Python|Java|JavaScript|TypeScript|React|Angular|Vue|Node\.?js|Django|Flask|Spring|AWS|Azure|GCP|Docker|Kubernetes|SQL|PostgreSQL|MongoDB|Redis|GraphQL|REST API|microservices)\b'
-        ]
+        Returns:
+            {'items': [{'topic', 'question', 'focus_area'}, ...]} or None if no plan could be made
+        """
+        
+        system_prompt = """You are an expert interviewer planning a structured interview.
+Cover the most important job requirements the candidate's CV speaks to, one topic per question.
+Every question must be SHORT (under 30 words), specific and conversational."""
+        
+        user_template = """Plan {count} interview questions, each on a DIFFERENT topic.
+
+Job Requirements:
+{job}
+
+Candidate CV:
+{cv}
+
+RULES:
+- Order topics from most to least important for the role
+- Each topic is a skill, technology or responsibility from the job or CV
+- One SHORT question per topic (maximum 25-30 words), referencing the CV where possible
+- NO multi-part questions
+
+Return JSON:
+{{"topics": [{{"topic": "skill/area", "question": "Your SHORT question", "focus_area": "what it probes"}}]}}"""
+        system_prompt, user_prompt = self.prompts.fit(
+            'interview_plan', system_prompt, user_template,
+            job=self.prompts.job_brief(job_description),
+            cv=self.prompts.candidate_brief(resume_summary),
+            count=total_questions
+        )
+        
+        print(f"\n=== Generating Interview Plan ({total_questions} topics) ===")
+        response = self._call_llm(system_prompt, user_prompt, max_tokens=90 * total_questions + 100,
+                                  required_keys=('topics',), cache_ttl=LLM_CACHE_TTL_INITIAL_QUESTION,
+                                  site='interview_plan')
+        data = self._parse_json_response(response) if response else {}
         
-        found_skills = []
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, resume_summary, re.IGNORECASE)
-            found_skills.extend(matches)
+        items = self._plan_items(data.get('topics'))
+        if not items:
+            return None
+        return {'items': items[:total_questions]}
+    
+    def generate_job_question_pool(self, job_description: str, count: int = 20) -> List[Dict[str, str]]:
+        """
+        Draft a job's shared question pool in one call: requirement-focused
+        questions that fit any candidate for the job (nothing CV-specific), so
+        they can be reused across the whole applicant pool.
         
-        if found_skills:
-            skill = found_skills[0]
-            return f"Tell me about your experience with {skill}. What's one project where you used it?"
+        Returns:
+            [{'topic', 'question', 'focus_area'}, ...] (empty if no pool could be made)
+        """
+        
+        system_prompt = """You are an expert interviewer preparing questions for everyone applying to one job.
+Questions must not assume anything about a particular candidate's CV.
+Every question must be SHORT (under 30 words), specific and conversational."""
+        
+        user_template = """Write {count} interview questions for this job, covering its requirements.
+
+Job Requirements:
+{job}
+
+RULES:
+- Order questions from most to least important requirement
+- Each question probes ONE skill, technology or responsibility from the job (name it in the question)
+- At most two questions per skill
+- Ask about the candidate's own experience ("Tell me about a time...", "How have you...")
+- NO multi-part questions
+
+Return JSON:
+{{"questions": [{{"topic": "skill/area", "question": "Your SHORT question", "focus_area": "what it probes"}}]}}"""
+        system_prompt, user_prompt = self.prompts.fit(
+            'job_question_pool', system_prompt, user_template,
+            job=self.prompts.job_brief(job_description),
+            count=count
+        )
         
-        return "What's the most challenging technical problem you've solved recently?"
+        print(f"\n=== Generating Job Question Pool ({count} questions) ===")
+        response = self._call_llm(system_prompt, user_prompt, max_tokens=60 * count + 100,
+                                  required_keys=('questions',), site='job_question_pool')
+        data = self._parse_json_response(response) if response else {}
+        return self._plan_items(data.get('questions'))[:count]
+    
+    def _plan_items(self, entries: Any) -> List[Dict[str, str]]:
+        """{'topic', 'question', 'focus_area'} items from a plan or pool response, skipping malformed ones"""
+        items = []
+        for entry in entries or []:
+            if not isinstance(entry, dict) or not str(entry.get('question') or '').strip():
+                continue
+            topic = str(entry.get('topic') or entry.get('focus_area') or 'general').strip()
+            items.append({
+                'topic': topic,
+                'question': str(entry['question']).strip(),
+                'focus_area': str(entry.get('focus_area') or topic).strip()
+            })
+        return items
+    
+    def _planned_question(
+        self,
+        interview_plan: Optional[Dict[str, Any]],
+        conversation_history: List[Dict[str, str]],
+        memory: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The first plan item not asked yet whose topic the conversation hasn't
+        covered. Items drawn from the job's question pool carry 'pooled' and
+        their 'skills'.
+        """
+        if not interview_plan:
+            return None
+        asked = {' '.join(q.lower().split()) for q in self._asked_questions(conversation_history)}
+        covered = {topic.lower() for topic in memory['topics']}
+        for item in interview_plan.get('items') or []:
+            if ' '.join(item['question'].lower().split()) in asked or item['topic'].lower() in covered:
+                continue
+            skills = item.get('skills')
+            if skills is None:
+                skills = self.question_bank.skills_in(f"{item['topic']} {item['question']}")
+            if skills and all(skill.lower() in covered for skill in skills):
+                continue
+            return item
+        return None
+    
+    def bank_question(
+        self,
+        job_description: str,
+        resume_summary: str,
+        conversation_history: List[Dict[str, str]],
+        question_number: int,
+        total_questions: int = 5,
+        question_type: str = 'new_topic'
+    ) -> Dict[str, Any]:
+        """
+        A question from the local question bank, shaped like a generated one.
+        Served when every model fails or no valid question arrives within the
+        latency SLO; picked by overlap with the skills in the CV and job description.
+        """
+        asked = self._asked_questions(conversation_history)
+        picked = None
+        if question_type != 'follow_up':
+            picked = self.question_bank.select(resume_summary, job_description, asked, question_number)
+        if picked is None:
+            return {
+                'success': True,
+                'question': self.question_bank.follow_up(asked, question_number),
+                'type': 'follow_up',
+                'focus_area': 'clarification',
+                'question_number': question_number,
+                'fallback': True,
+                'source': 'question_bank'
+            }
+        return {
+            'success': True,
+            'question': picked['question'],
+            'type': question_type,
+            'focus_area': picked['focus_area'],
+            'question_number': question_number,
+            'requires_followup': question_number < total_questions,
+            'fallback': True,
+            'source': 'question_bank'
+        }
+    
+    def _asked_questions(self, conversation_history: List[Dict[str, str]]) -> List[str]:
+        return [msg.get('content', '') for msg in conversation_history if msg.get('role') == 'interviewer']
+    
+    def static_fallback_questions(self) -> List[str]:
+        """Every question bank text (used to pre-render TTS audio)"""
+        return self.question_bank.all_questions()
+    
+    def is_forced_followup(self, question_number: int) -> bool:
+        """Q2 always follows up on Q1 for natural flow"""
+        return question_number == 2
+    
+    def _memory(
+        self,
+        conversation_history: List[Dict[str, str]],
+        memory: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Rolling memory of the conversation: the session's, caught up, or built from the history"""
+        return self.memory.update(memory, conversation_history)
     
     def generate_followup_question(
         self, 
@@ -199,9 +331,52 @@ Return JSON:
         resume_summary: str, 
         conversation_history: List[Dict[str, str]],
         question_number: int,
-        total_questions: int = 5
+        total_questions: int = 5,
+        prefetched: Optional[Dict[str, Any]] = None,
+        memory: Optional[Dict[str, Any]] = None,
+        interview_plan: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Generate next question - mix of follow-ups and new questions based on job/resume"""
+        """
+        Generate next question - mix of follow-ups and new questions based on job/resume.
+        A prefetched new-topic question (generated while the candidate was answering)
+        is served directly unless this step must be a follow-up. memory is the
+        session's rolling conversation memory (built from the history if omitted);
+        with an interview_plan, new-topic steps are served from it without an LLM call.
+        """
+        
+        # Extract the candidate's last answer for follow-up context
+        last_candidate_answer = ""
+        for msg in reversed(conversation_history):
+            if msg.get('role') == 'candidate':
+                last_candidate_answer = msg.get('content', '')
+                break
+        
+        if prefetched and not (self.is_forced_followup(question_number) and last_candidate_answer):
+            print(f"\n=== Serving prefetched question {question_number}/{total_questions} ===")
+            return {**prefetched, 'question_number': question_number, 'prefetched': True}
+        
+        plan = self.plan_next_question(
+            job_description, resume_summary, conversation_history, question_number, total_questions, memory,
+            interview_plan
+        )
+        return self._run_question_plan(plan)
+    
+    def plan_next_question(
+        self,
+        job_description: str,
+        resume_summary: str,
+        conversation_history: List[Dict[str, str]],
+        question_number: int,
+        total_questions: int = 5,
+        memory: Optional[Dict[str, Any]] = None,
+        interview_plan: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Decide between a follow-up and a new topic and build the prompts for it.
+        Prompts carry the rolling memory rather than raw messages, so their size
+        does not grow with the number of questions. A new topic taken from the
+        interview plan needs no prompts: the plan carries it as 'planned'.
+        """
         
         import random
         
@@ -212,50 +387,187 @@ Return JSON:
                 last_candidate_answer = msg.get('content', '')
                 break
         
-        # Extract topics already covered in conversation
-        covered_topics = self._extract_covered_topics(conversation_history)
-        
         # Decide: follow-up (35%) vs new question (65%)
-        # But Q2 always follows up on Q1 for natural flow
-        should_followup = question_number == 2 or random.random() < 0.35
+        should_followup = self.is_forced_followup(question_number) or random.random() < 0.35
         
-        # Format conversation history
-        conversation_text = "\n".join([
-            f"{'Interviewer' if msg.get('role') == 'interviewer' else 'Candidate'}: {msg.get('content', '')}"
-            for msg in conversation_history[-4:]  # Last 4 messages for context
-        ])
+        memory = self._memory(conversation_history, memory)
+        planned = None
         
         if should_followup and last_candidate_answer:
-            # Generate follow-up question
-            return self._generate_followup(
-                job_description, resume_summary, conversation_text, 
-                last_candidate_answer, question_number, total_questions
+            question_type = 'follow_up'
+            system_prompt, user_prompt = self._followup_prompts(
+                job_description, self.memory.summary(memory), last_candidate_answer, question_number, total_questions
             )
         else:
-            # Generate new question from job requirements or resume
-            return self._generate_new_question(
-                job_description, resume_summary, conversation_text,
-                covered_topics, question_number, total_questions
-            )
+            # New question from the interview plan (or job question pool), else generated from uncovered topics
+            question_type = 'new_topic'
+            planned = self._planned_question(interview_plan, conversation_history, memory)
+            system_prompt = user_prompt = None
+            if planned is None:
+                system_prompt, user_prompt = self._new_question_prompts(
+                    job_description, resume_summary, self.memory.summary(memory),
+                    self.memory.covered_topics(memory), question_number, total_questions
+                )
+        
+        return {
+            'type': question_type,
+            'planned': planned,
+            'site': 'followup_question' if question_type == 'follow_up' else 'new_question',
+            'system_prompt': system_prompt,
+            'user_prompt': user_prompt,
+            'job_description': job_description,
+            'resume_summary': resume_summary,
+            'conversation_history': conversation_history,
+            'question_number': question_number,
+            'total_questions': total_questions
+        }
     
-    def _extract_covered_topics(self, conversation_history: List[Dict[str, str]]) -> str:
-        """Extract topics already discussed in conversation"""
-        topics = []
-        for msg in conversation_history:
-            if msg.get('role') == 'interviewer':
-                topics.append(msg.get('content', ''))
-        return " | ".join(topics[-5:])  # Last 5 questions as context
+    def _run_question_plan(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        if plan.get('planned'):
+            source = 'job pool' if plan['planned'].get('pooled') else 'planned'
+            print(f"\n=== Serving {source} question {plan['question_number']}/{plan['total_questions']} ===")
+            return self._planned_result(plan)
+        label = 'Follow-up' if plan['type'] == 'follow_up' else 'NEW'
+        print(f"\n=== Generating {label} Question {plan['question_number']}/{plan['total_questions']} ===")
+        response = self._call_llm(plan['system_prompt'], plan['user_prompt'], max_tokens=300, required_keys=('question',),
+                                  site=plan['site'])
+        return self._question_result(plan, self._parse_json_response(response) if response else {})
     
-    def _generate_followup(
+    def _planned_result(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        question_number = plan['question_number']
+        return {
+            'success': True,
+            'question': plan['planned']['question'],
+            'type': 'new_topic',
+            'focus_area': plan['planned']['focus_area'],
+            'question_number': question_number,
+            'requires_followup': question_number < plan['total_questions'],
+            'pooled' if plan['planned'].get('pooled') else 'planned': True
+        }
+    
+    def _question_result(self, plan: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the route response for a generated question, or the fallback question"""
+        question_number = plan['question_number']
+        # Stripped like the streamed question text, so the two compare equal
+        question = str(data.get('question') or '').strip()
+        if question:
+            return {
+                'success': True,
+                'question': question,
+                'type': plan['type'],
+                'focus_area': data.get('focus_area', 'technical'),
+                'question_number': question_number,
+                'requires_followup': question_number < plan['total_questions']
+            }
+        
+        return self.bank_question(
+            plan['job_description'], plan['resume_summary'], plan['conversation_history'],
+            question_number, plan['total_questions'], plan['type']
+        )
+    
+    def stream_next_question(
         self,
         job_description: str,
         resume_summary: str,
-        conversation_text: str,
+        conversation_history: List[Dict[str, str]],
+        question_number: int,
+        total_questions: int = 5,
+        memory: Optional[Dict[str, Any]] = None,
+        interview_plan: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Generate the next question with a streaming completion. Yields
+        ('question_delta', text) while the question field is being generated,
+        ('question', text) as soon as it is complete (focus_area may still be
+        streaming), then ('result', dict) shaped like generate_followup_question.
+        """
+        plan = self.plan_next_question(
+            job_description, resume_summary, conversation_history, question_number, total_questions, memory,
+            interview_plan
+        )
+        if plan.get('planned'):
+            result = self._run_question_plan(plan)
+            yield 'question', result['question']
+            yield 'result', result
+            return
+        if not self.api_key:
+            print("OPENROUTER_API_KEY not set")
+            yield 'result', self._question_result(plan, {})
+            return
+        
+        print(f"\n=== Streaming Question {question_number}/{total_questions} ({plan['type']}) ===")
+        field = JsonStringFieldStreamer('question')
+        chunks = []
+        try:
+            for delta in self.llm.stream(
+                self.models_to_try,
+                [
+                    {"role": "system", "content": plan['system_prompt']},
+                    {"role": "user", "content": plan['user_prompt']}
+                ],
+                temperature=0.7,
+                max_tokens=300,
+                site=plan['site']
+            ):
+                chunks.append(delta)
+                was_complete = field.complete
+                text = field.feed(delta)
+                if text:
+                    yield 'question_delta', text
+                if field.complete and not was_complete:
+                    yield 'question', field.value.strip()
+        except LLMError as e:
+            print(f"⚠ Question stream failed: {e}")
+        
+        yield 'result', self._question_result(plan, self._parse_json_response(''.join(chunks)))
+    
+    def generate_new_topic_question(
+        self,
+        job_description: str,
+        resume_summary: str,
+        conversation_history: List[Dict[str, str]],
+        question_number: int,
+        total_questions: int = 5,
+        memory: Optional[Dict[str, Any]] = None,
+        interview_plan: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Generate a new-topic question straight from the conversation (used for prefetch)"""
+        memory = self._memory(conversation_history, memory)
+        planned = self._planned_question(interview_plan, conversation_history, memory)
+        if planned is not None:
+            return self._run_question_plan({
+                'type': 'new_topic',
+                'planned': planned,
+                'question_number': question_number,
+                'total_questions': total_questions
+            })
+        system_prompt, user_prompt = self._new_question_prompts(
+            job_description, resume_summary,
+            self.memory.summary(memory),
+            self.memory.covered_topics(memory),
+            question_number, total_questions
+        )
+        return self._run_question_plan({
+            'type': 'new_topic',
+            'site': 'new_question',
+            'system_prompt': system_prompt,
+            'user_prompt': user_prompt,
+            'job_description': job_description,
+            'resume_summary': resume_summary,
+            'conversation_history': conversation_history,
+            'question_number': question_number,
+            'total_questions': total_questions
+        })
+    
+    def _followup_prompts(
+        self,
+        job_description: str,
+        conversation_summary: str,
         last_answer: str,
         question_number: int,
         total_questions: int
-    ) -> Dict[str, Any]:
-        """Generate a follow-up question based on the candidate's last answer"""
+    ) -> Tuple[str, str]:
+        """Prompts for a follow-up question based on the candidate's last answer"""
         
         system_prompt = """You are an expert interviewer. Ask a SHORT follow-up based on their answer.
 
@@ -265,14 +577,14 @@ RULES:
 3. Sound natural and conversational
 4. Dig deeper into what they said"""
         
-        user_prompt = f"""Generate a SHORT follow-up question.
+        user_template = """Generate a SHORT follow-up question.
 
-Their LAST ANSWER: "{last_answer[:800]}"
+Their LAST ANSWER: "{last_answer}"
 
-Conversation so far:
-{conversation_text}
+Interview so far:
+{conversation}
 
-Job context: {job_description[:500]}
+Job context: {job}
 
 Question {question_number}/{total_questions}
 
@@ -283,42 +595,25 @@ GOOD follow-ups (SHORT):
 
 Return JSON:
 {{"question": "Your SHORT follow-up", "focus_area": "what you're probing"}}"""
-
-        print(f"\n=== Generating Follow-up Question {question_number}/{total_questions} ===")
-        response = self._call_llm(system_prompt, user_prompt, max_tokens=300)
-        
-        if response:
-            data = self._parse_json_response(response)
-            if data.get('question'):
-                return {
-                    'success': True,
-                    'question': data['question'],
-                    'type': 'follow_up',
-                    'focus_area': data.get('focus_area', 'technical'),
-                    'question_number': question_number,
-                    'requires_followup': question_number < total_questions
-                }
-        
-        # Fallback
-        return {
-            'success': True,
-            'question': "Can you elaborate on that with a specific example?",
-            'type': 'follow_up',
-            'focus_area': 'clarification',
-            'question_number': question_number,
-            'fallback': True
-        }
+        return self.prompts.fit(
+            'followup_question', system_prompt, user_template,
+            last_answer=truncate_to_tokens(last_answer, 200),
+            conversation=conversation_summary,
+            job=self.prompts.job_brief(job_description),
+            question_number=question_number,
+            total_questions=total_questions
+        )
     
-    def _generate_new_question(
+    def _new_question_prompts(
         self,
         job_description: str,
         resume_summary: str,
-        conversation_text: str,
+        conversation_summary: str,
         covered_topics: str,
         question_number: int,
         total_questions: int
-    ) -> Dict[str, Any]:
-        """Generate a new question based on job requirements or resume skills not yet covered"""
+    ) -> Tuple[str, str]:
+        """Prompts for a new question on job requirements or resume skills not yet covered"""
         
         system_prompt = """You are an expert interviewer. Ask a NEW question about a DIFFERENT topic.
 
@@ -328,19 +623,19 @@ RULES:
 3. Be specific - reference a technology, project, or skill
 4. Sound natural and conversational"""
 
-        user_prompt = f"""Generate a NEW question about a different topic.
+        user_template = """Generate a NEW question about a different topic.
 
 Job Requirements:
-{job_description[:800]}
+{job}
 
 Candidate CV:
-{resume_summary[:800]}
+{cv}
 
 Topics ALREADY discussed (avoid these):
 {covered_topics}
 
-Conversation so far:
-{conversation_text}
+Interview so far:
+{conversation}
 
 Question {question_number}/{total_questions}
 
@@ -354,32 +649,15 @@ GOOD new questions (SHORT):
 
 Return JSON:
 {{"question": "Your SHORT new question", "focus_area": "skill/topic being explored"}}"""
-
-        print(f"\n=== Generating NEW Question {question_number}/{total_questions} ===")
-        response = self._call_llm(system_prompt, user_prompt, max_tokens=300)
-        
-        if response:
-            data = self._parse_json_response(response)
-            if data.get('question'):
-                return {
-                    'success': True,
-                    'question': data['question'],
-                    'type': 'new_topic',
-                    'focus_area': data.get('focus_area', 'technical'),
-                    'question_number': question_number,
-                    'requires_followup': question_number < total_questions
-                }
-        
-        # Fallback: Generate CV-based question
-        fallback_question = self._generate_followup_fallback(resume_summary, [], question_number)
-        return {
-            'success': True,
-            'question': fallback_question,
-            'type': 'new_topic',
-            'focus_area': 'cv_based',
-            'question_number': question_number,
-            'fallback': True
-        }
+        return self.prompts.fit(
+            'new_question', system_prompt, user_template,
+            job=self.prompts.job_brief(job_description),
+            cv=self.prompts.candidate_brief(resume_summary),
+            covered_topics=covered_topics,
+            conversation=conversation_summary,
+            question_number=question_number,
+            total_questions=total_questions
+        )
     
     def evaluate_answer(
         self,
@@ -395,11 +673,11 @@ Assess if the answer demonstrates reasonable technical knowledge related to thei
 Be constructive and give credit for relevant knowledge, effort, and learning mindset.
 Focus on potential and willingness to learn, not just perfect mastery."""
         
-        user_prompt = f"""Job Requirements:
-{job_description[:800]}
+        user_template = """Job Requirements:
+{job}
 
 Candidate's CV/Resume (skills they claim):
-{resume_summary[:800]}
+{cv}
 
 Interview Question:
 {question}
@@ -425,28 +703,42 @@ Return JSON:
 {{"score": 7, "feedback": "Brief assessment", "strengths": ["specific strength"], "improvements": ["specific area to improve"], "cv_verified": true}}
 
 Return ONLY the JSON."""
+        system_prompt, user_prompt = self.prompts.fit(
+            'evaluate_answer', system_prompt, user_template,
+            job=self.prompts.job_brief(job_description),
+            cv=self.prompts.candidate_brief(resume_summary),
+            question=question,
+            answer=answer
+        )
 
-        response = self._call_llm(system_prompt, user_prompt, max_tokens=500)
+        response = self._call_llm(system_prompt, user_prompt, max_tokens=500, required_keys=('score',),
+                                  cache_ttl=LLM_CACHE_TTL_EVALUATION, site='evaluate_answer')
         
         if response:
             data = self._parse_json_response(response)
-            score = data.get('score')
-            if score is not None:
-                try:
-                    score = max(1, min(10, int(score)))
-                    # Apply a slight boost for completion (be more encouraging)
-                    if score < 5:
-                        score = max(score, min(score + 1, 5))  # Minimum boost to 5 for attempt
-                except (ValueError, TypeError):
-                    score = 6
-                return {
-                    'success': True,
-                    'score': score,
-                    'feedback': data.get('feedback', ''),
-                    'strengths': data.get('strengths', []),
-                    'improvements': data.get('improvements', [])
-                }
+            if data.get('score') is not None:
+                return self._answer_result(data)
         
+        return self._fallback_answer_result()
+    
+    def _answer_result(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape one answer evaluation from the model's JSON"""
+        try:
+            score = max(1, min(10, int(data.get('score'))))
+            # Apply a slight boost for completion (be more encouraging)
+            if score < 5:
+                score = max(score, min(score + 1, 5))  # Minimum boost to 5 for attempt
+        except (ValueError, TypeError):
+            score = 6
+        return {
+            'success': True,
+            'score': score,
+            'feedback': data.get('feedback', ''),
+            'strengths': data.get('strengths', []),
+            'improvements': data.get('improvements', [])
+        }
+    
+    def _fallback_answer_result(self) -> Dict[str, Any]:
         return {
             'success': True,
             'score': 6,
@@ -461,20 +753,21 @@ Return ONLY the JSON."""
         job_description: str,
         resume_summary: str,
         conversation_history: List[Dict[str, str]],
-        answer_scores: List[Dict[str, Any]]
+        answer_scores: List[Dict[str, Any]],
+        memory: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Evaluate the complete interview and provide overall assessment"""
+        """
+        Evaluate the complete interview and provide overall assessment. The
+        transcript is given as the rolling memory, so the prompt stays the same
+        size for long interviews (per-answer detail comes from answer_scores).
+        """
         
         system_prompt = """You are a fair technical interviewer providing a holistic final assessment.
 Your evaluation should assess the candidate's overall fit based on demonstrated understanding and communication.
 Consider their effort, growth potential, and how they compare to typical candidates.
 Be encouraging while being honest about their capabilities."""
         
-        # Format conversation
-        conversation_text = "\n".join([
-            f"{'Q' if msg.get('role') == 'interviewer' else 'A'}: {msg.get('content', '')[:300]}"
-            for msg in conversation_history
-        ])
+        memory = self._memory(conversation_history, memory)
         
         # Calculate average score from individual answers
         if answer_scores:
@@ -482,14 +775,16 @@ Be encouraging while being honest about their capabilities."""
         else:
             avg_score = 5
         
-        user_prompt = f"""Job Requirements:
-{job_description[:1000]}
+        user_template = """Job Requirements:
+{job}
 
 Candidate's CV/Resume Claims:
-{resume_summary[:1000]}
+{cv}
 
-Complete Interview Transcript:
-{conversation_text[:3500]}
+Interview Summary (one line per question; earlier ones by topic):
+{transcript}
+
+Topics Covered: {topics}
 
 Average Answer Score: {avg_score:.1f}/10
 
@@ -520,32 +815,217 @@ Return JSON:
 }}
 
 Return ONLY the JSON."""
+        system_prompt, user_prompt = self.prompts.fit(
+            'evaluate_interview', system_prompt, user_template,
+            job=self.prompts.job_brief(job_description),
+            cv=self.prompts.candidate_brief(resume_summary),
+            transcript=self.memory.summary(memory),
+            topics=self.memory.covered_topics(memory),
+            avg_score=avg_score
+        )
 
         print("\n=== Generating Final Interview Evaluation ===")
-        response = self._call_llm(system_prompt, user_prompt, max_tokens=1000)
+        response = self._call_llm(system_prompt, user_prompt, max_tokens=1000, required_keys=('overall_score',),
+                                  cache_ttl=LLM_CACHE_TTL_EVALUATION, site='evaluate_interview')
         
         if response:
             data = self._parse_json_response(response)
-            score = data.get('overall_score')
-            if score is not None:
-                try:
-                    score = max(1, min(10, int(score)))
-                    # Apply a boost for completion to be more encouraging\n                    if score < 5:
-                        score = max(score, min(score + 1, 5))  # Minimum boost to 5
-                except (ValueError, TypeError):
-                    score = round(avg_score)
-                return {
-                    'success': True,
-                    'overall_score': score,
-                    'strengths': data.get('strengths', []),
-                    'areas_for_improvement': data.get('areas_for_improvement', data.get('improvements', [])),
-                    'cv_verification': data.get('cv_verification', 'unknown'),
-                    'job_fit': data.get('job_fit', 'unknown'),
-                    'recommendation': data.get('recommendation', 'consider'),
-                    'summary': data.get('summary', ''),
-                    'answer_scores': answer_scores
-                }
+            if data.get('overall_score') is not None:
+                return self._final_evaluation_result(data, avg_score, answer_scores)
+        
+        return self._fallback_final_evaluation(avg_score, answer_scores)
+    
+    def evaluate_interview_batch(
+        self,
+        job_description: str,
+        resume_summary: str,
+        conversation_history: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """
+        Score every answer and produce the overall assessment in one structured call.
+        Replaces evaluate_answer per question plus evaluate_full_interview; only a
+        transcript over EVAL_BATCH_TOKEN_BUDGET is split, with the overall assessment
+        made in the last chunk from the earlier chunks' scores.
+        """
+        pairs = self._qa_pairs(conversation_history)
+        if not pairs:
+            # Nothing to score: no LLM call (the routes reject this with 400)
+            result = self._fallback_final_evaluation(5, [])
+            result['llm_calls'] = 0
+            return result
+        context = f"""Job Requirements:
+{self.prompts.job_brief(job_description)}
+
+Candidate's CV/Resume Claims:
+{self.prompts.candidate_brief(resume_summary)}
+"""
+        chunks = self._chunk_qa_pairs(pairs, estimate_tokens(context) + 900)
+        
+        print(f"\n=== Batch Evaluating {len(pairs)} Answers in {len(chunks)} Call(s) ===")
+        answer_results: List[Dict[str, Any]] = []
+        final_data: Dict[str, Any] = {}
+        llm_calls = 0
+        for chunk_number, chunk in enumerate(chunks):
+            is_last = chunk_number == len(chunks) - 1
+            offset = len(answer_results)
+            user_prompt = self._batch_evaluation_prompt(context, chunk, offset, answer_results if is_last else [], is_last)
+            response = self._call_llm(
+                BATCH_EVALUATION_SYSTEM_PROMPT,
+                user_prompt,
+                max_tokens=250 * len(chunk) + (700 if is_last else 0),
+                required_keys=('answers', 'overall_score') if is_last else ('answers',),
+                cache_ttl=LLM_CACHE_TTL_EVALUATION,
+                site='evaluate_interview_batch'
+            )
+            llm_calls += 1
+            data = self._parse_json_response(response) if response else {}
+            
+            scored = {}
+            for item in data.get('answers') or []:
+                if isinstance(item, dict) and item.get('score') is not None:
+                    try:
+                        scored[int(item.get('index'))] = item
+                    except (ValueError, TypeError):
+                        continue
+            for position in range(len(chunk)):
+                item = scored.get(offset + position + 1)
+                answer_results.append(self._answer_result(item) if item else self._fallback_answer_result())
+            if is_last:
+                final_data = data
+        
+        answer_scores = [
+            {
+                'question': pair['question'],
+                'answer': pair['answer'],
+                'score': result['score'],
+                'feedback': result['feedback'],
+                'strengths': result['strengths'],
+                'improvements': result['improvements']
+            }
+            for pair, result in zip(pairs, answer_results)
+        ]
+        avg_score = sum(s['score'] for s in answer_scores) / len(answer_scores) if answer_scores else 5
         
+        if final_data.get('overall_score') is not None:
+            result = self._final_evaluation_result(final_data, avg_score, answer_scores)
+        else:
+            result = self._fallback_final_evaluation(avg_score, answer_scores)
+        result['llm_calls'] = llm_calls
+        return result
+    
+    def _qa_pairs(self, conversation_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Pair each candidate answer with the interviewer message that preceded it"""
+        pairs = []
+        question = None
+        for msg in conversation_history:
+            if msg.get('role') == 'interviewer':
+                question = msg.get('content', '')
+            elif msg.get('role') == 'candidate' and question is not None:
+                pairs.append({'question': question, 'answer': msg.get('content', '')})
+                question = None
+        return pairs
+    
+    def _chunk_qa_pairs(self, pairs: List[Dict[str, str]], overhead_tokens: int) -> List[List[Dict[str, str]]]:
+        """Greedily pack Q&A pairs into as few prompts as fit EVAL_BATCH_TOKEN_BUDGET"""
+        chunks: List[List[Dict[str, str]]] = [[]]
+        used = overhead_tokens
+        for pair in pairs:
+            cost = estimate_tokens(self._batch_pair_text(0, pair))
+            if chunks[-1] and used + cost > EVAL_BATCH_TOKEN_BUDGET:
+                chunks.append([])
+                used = overhead_tokens
+            chunks[-1].append(pair)
+            used += cost
+        return chunks
+    
+    def _batch_pair_text(self, index: int, pair: Dict[str, str]) -> str:
+        question = truncate_to_tokens(pair['question'], EVAL_BATCH_QUESTION_TOKENS)
+        answer = truncate_to_tokens(pair['answer'], EVAL_BATCH_ANSWER_TOKENS)
+        return f"[{index}] Q: {question}\nA: {answer}"
+    
+    def _batch_evaluation_prompt(
+        self,
+        context: str,
+        chunk: List[Dict[str, str]],
+        offset: int,
+        earlier_results: List[Dict[str, Any]],
+        include_overall: bool
+    ) -> str:
+        transcript = "\n\n".join(self._batch_pair_text(offset + i + 1, pair) for i, pair in enumerate(chunk))
+        earlier = ""
+        if earlier_results:
+            earlier = "\nAnswers 1-{} were already scored:\n{}\n".format(
+                len(earlier_results),
+                "\n".join(
+                    f"[{i + 1}] {r['score']}/10 - {truncate_to_tokens(r['feedback'], 40)}"
+                    for i, r in enumerate(earlier_results)
+                )
+            )
+        
+        answers_schema = '"answers": [{"index": 1, "score": 7, "feedback": "Brief assessment", "strengths": ["specific strength"], "improvements": ["specific area to improve"]}]'
+        if include_overall:
+            task = """Score each answer below, then give a final evaluation of the whole interview
+(including any answers scored earlier) considering technical understanding, alignment with the
+job requirements, communication and reasoning, learning potential and overall fit."""
+            schema = f"""{{
+    {answers_schema},
+    "overall_score": 7,
+    "strengths": ["specific technical strength demonstrated"],
+    "areas_for_improvement": ["specific area needing work"],
+    "cv_verification": "verified|partial|unverified",
+    "job_fit": "excellent|good|fair|poor",
+    "recommendation": "recommend|consider|not_recommend",
+    "summary": "2-3 sentence assessment focusing on candidate's capabilities and fit"
+}}"""
+        else:
+            task = "Score each answer below. The overall assessment is made later."
+            schema = f"{{{answers_schema}}}"
+        
+        return f"""{context}{earlier}
+{task}
+
+Interview Answers:
+{transcript}
+
+SCORING GUIDE (per answer and overall):
+- 8-10: Excellent - clear knowledge, well-articulated, strong alignment
+- 6-7: Good - demonstrates solid understanding, good effort
+- 5-6: Satisfactory - shows reasonable understanding, adequate answer
+- 3-4: Fair - basic understanding, some gaps but shows effort
+- 1-2: Poor - minimal understanding or no coherent response
+
+Return JSON with one entry in "answers" per answer, using its [index]:
+{schema}
+
+Return ONLY the JSON."""
+    
+    def _final_evaluation_result(
+        self,
+        data: Dict[str, Any],
+        avg_score: float,
+        answer_scores: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Shape the overall assessment from the model's JSON"""
+        try:
+            score = max(1, min(10, int(data.get('overall_score'))))
+            # Apply a boost for completion to be more encouraging
+            if score < 5:
+                score = max(score, min(score + 1, 5))  # Minimum boost to 5
+        except (ValueError, TypeError):
+            score = round(avg_score)
+        return {
+            'success': True,
+            'overall_score': score,
+            'strengths': data.get('strengths', []),
+            'areas_for_improvement': data.get('areas_for_improvement', data.get('improvements', [])),
+            'cv_verification': data.get('cv_verification', 'unknown'),
+            'job_fit': data.get('job_fit', 'unknown'),
+            'recommendation': data.get('recommendation', 'consider'),
+            'summary': data.get('summary', ''),
+            'answer_scores': answer_scores
+        }
+    
+    def _fallback_final_evaluation(self, avg_score: float, answer_scores: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Fallback evaluation - more lenient thresholds
         if avg_score >= 7:
             recommendation = 'recommend'
@@ -0,0 +1,200 @@
+"""
+Per-job question pools
+Every candidate for a job used to get new-topic questions generated from
+scratch. When a job is created (/job), a pool of requirement-focused questions
+is generated once and kept here, keyed by job ID, with its audio pre-rendered
+into the TTS cache. An interview started with the job's ID takes its new-topic
+questions from the pool, keeping those about skills the candidate's CV
+mentions, so only personalized follow-ups still call the LLM. Pools are written
+to SQLite, so every gunicorn worker on the host shares them, and cached in
+process for as long as their row is unchanged.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from .cache import TTLCache
+from .question_bank import question_bank
+from .sqlite_store import SQLiteStore, RowCache
+
+
+def description_hash(job_description: str) -> str:
+    """Hash of a whitespace-normalized job description (an edited job gets a new pool)"""
+    return hashlib.sha256(' '.join((job_description or '').split()).encode('utf-8')).hexdigest()
+
+
+class JobQuestionPool:
+    """Job ID -> question pool, in an in-process LRU backed by a SQLite table"""
+
+    def __init__(self, path: str, max_memory: int = 200, ttl: float = 30 * 24 * 3600,
+                 max_rankings: int = 2048, build_timeout: float = 600.0, retry_after: float = 300.0):
+        """
+        Args:
+            path: SQLite database file
+            max_memory: Pools kept in the in-process LRU
+            ttl: Seconds after which a pool is regenerated on the next /job call
+            max_rankings: Candidate (job, CV) rankings kept in memory
+            build_timeout: Seconds after which another worker may take over a build
+                whose worker never finished it
+            retry_after: Seconds a job waits before a failed build is tried again
+        """
+        self.path = path
+        self.max_memory = max(1, max_memory)
+        self.ttl = ttl
+        self.build_timeout = build_timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._memory = RowCache(self.max_memory)
+        self._rankings = TTLCache('job_pool_rankings', max_size=max_rankings, ttl=3600)
+        self._stats = {'built': 0, 'build_failed': 0, 'hits': 0, 'misses': 0, 'interviews': 0}
+        self._store = SQLiteStore(path, schema=(
+            "CREATE TABLE IF NOT EXISTS job_question_pools ("
+            "job_id TEXT PRIMARY KEY, created_at REAL NOT NULL, data TEXT NOT NULL)",
+            # One build per job across every worker on the host
+            "CREATE TABLE IF NOT EXISTS job_question_pool_builds ("
+            "job_id TEXT PRIMARY KEY, building_since REAL, failed_at REAL)"
+        ))
+
+    def get(self, job_id: str, job_description: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        The job's pool ({'job_id', 'description_hash', 'created_at', 'items'}), or
+        None if none is stored, it has expired, or it was made for a different
+        job_description. The in-process copy is used only while the row still has
+        its created_at (another worker may have rebuilt the pool since).
+        """
+        key = str(job_id)
+        with self._lock:
+            row = self._store.connection().execute(
+                "SELECT created_at, data FROM job_question_pools WHERE job_id = ?", (key,)
+            ).fetchone()
+            pool = None
+            if row is None:
+                self._memory.discard(key)
+            else:
+                created_at, data = row
+                pool = self._memory.get(key, created_at)
+                if pool is None:
+                    pool = json.loads(data)
+                    self._memory.put(key, created_at, pool)
+            if pool is not None and (time.time() - pool['created_at'] > self.ttl or (
+                    job_description is not None and pool['description_hash'] != description_hash(job_description))):
+                pool = None
+            self._stats['hits' if pool is not None else 'misses'] += 1
+            return pool
+
+    def put(self, job_id: str, job_description: str, items: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Store a freshly generated pool; each item is tagged with the skills it asks about"""
+        pool = {
+            'job_id': str(job_id),
+            'description_hash': description_hash(job_description),
+            'created_at': time.time(),
+            'items': [
+                {**item, 'skills': sorted(question_bank.skills_in(f"{item['topic']} {item['question']}"))}
+                for item in items
+            ]
+        }
+        with self._lock:
+            with self._store.connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_question_pools (job_id, created_at, data) VALUES (?, ?, ?)",
+                    (pool['job_id'], pool['created_at'], json.dumps(pool))
+                )
+            self._memory.put(pool['job_id'], pool['created_at'], pool)
+            self._stats['built'] += 1
+        return pool
+
+    def start_build(self, job_id: str) -> str:
+        """
+        Claim the job's pool build for this worker. Returns 'started' when claimed,
+        'building' while another worker's claim is younger than build_timeout, or
+        'failed' for retry_after seconds after a build that produced no pool
+        """
+        key = str(job_id)
+        now = time.time()
+        with self._lock:
+            with self._store.connection() as conn:
+                claimed = conn.execute(
+                    "INSERT INTO job_question_pool_builds (job_id, building_since) VALUES (?, ?) "
+                    "ON CONFLICT(job_id) DO UPDATE SET building_since = excluded.building_since, failed_at = NULL "
+                    "WHERE (building_since IS NULL OR building_since < ?) AND (failed_at IS NULL OR failed_at < ?)",
+                    (key, now, now - self.build_timeout, now - self.retry_after)
+                ).rowcount == 1
+                if claimed:
+                    return 'started'
+                building_since = conn.execute(
+                    "SELECT building_since FROM job_question_pool_builds WHERE job_id = ?", (key,)
+                ).fetchone()[0]
+        return 'building' if building_since is not None else 'failed'
+
+    def finish_build(self, job_id: str, failed: bool = False):
+        """Release the build claim; a failed build is not retried for retry_after seconds"""
+        with self._lock:
+            with self._store.connection() as conn:
+                if failed:
+                    conn.execute(
+                        "UPDATE job_question_pool_builds SET building_since = NULL, failed_at = ? WHERE job_id = ?",
+                        (time.time(), str(job_id))
+                    )
+                else:
+                    conn.execute("DELETE FROM job_question_pool_builds WHERE job_id = ?", (str(job_id),))
+            if failed:
+                self._stats['build_failed'] += 1
+
+    def candidate_items(self, job_id: str, resume_summary: str,
+                        job_description: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Pool items for a candidate, best first: questions about skills the CV
+        mentions (most shared skills first), then questions tied to no known
+        skill. Questions only about skills missing from the CV are left out.
+        A pool made for a different job_description (if given) yields nothing.
+        """
+        pool = self.get(job_id, job_description)
+        if not pool:
+            return []
+        ranking_key = hashlib.sha256(
+            f"{pool['job_id']}\x00{pool['created_at']}\x00{resume_summary}".encode('utf-8')
+        ).hexdigest()
+        ranked: Optional[Tuple[int, ...]] = self._rankings.get(ranking_key)
+        if ranked is None:
+            cv_skills = question_bank.skills_in(resume_summary)
+            scored = []
+            for index, item in enumerate(pool['items']):
+                skills = set(item['skills'])
+                if skills and not skills & cv_skills:
+                    continue
+                scored.append((-len(skills & cv_skills) if skills else 1, index))
+            ranked = tuple(index for _, index in sorted(scored))
+            self._rankings.put(ranking_key, ranked)
+        with self._lock:
+            self._stats['interviews'] += int(bool(ranked))
+        return [pool['items'][index] for index in ranked]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._store.connection()
+            stored = conn.execute("SELECT COUNT(*) FROM job_question_pools").fetchone()[0]
+            building = conn.execute(
+                "SELECT COUNT(*) FROM job_question_pool_builds WHERE building_since >= ?",
+                (time.time() - self.build_timeout,)
+            ).fetchone()[0]
+            return {
+                'in_memory': len(self._memory),
+                'stored': stored,
+                'building': building,
+                'ttl_seconds': self.ttl,
+                'rankings': self._rankings.stats(),
+                **self._stats
+            }
+
+
+job_question_pools = JobQuestionPool(
+    path=os.getenv('JOB_QUESTION_POOL_DB') or os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'job_question_pools.sqlite3'
+    ),
+    max_memory=int(os.getenv('JOB_QUESTION_POOL_MEMORY', '200')),
+    ttl=float(os.getenv('JOB_QUESTION_POOL_TTL_SECONDS', str(30 * 24 * 3600))),
+    build_timeout=float(os.getenv('JOB_QUESTION_POOL_BUILD_TIMEOUT_SECONDS', '600')),
+    retry_after=float(os.getenv('JOB_QUESTION_POOL_RETRY_SECONDS', '300'))
+)
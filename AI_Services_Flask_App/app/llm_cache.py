@@ -0,0 +1,129 @@
+"""
+On-disk cache of LLM responses for call sites where replaying an earlier
+generation is acceptable (interview start on page reload, re-evaluating the
+same answer). Keyed by (model, normalized prompt, temperature, max_tokens);
+entries carry their own TTL and the directory is size-bounded (LRU).
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional
+from .file_cache import FileCache
+
+
+class LLMResponseCache:
+    """Persistent response cache that also counts the calls and tokens it saved"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.store = FileCache(directory, max_bytes, suffix='.json')
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0, 'misses': 0, 'expired': 0, 'stores': 0,
+            'calls_saved': 0, 'prompt_tokens_saved': 0, 'completion_tokens_saved': 0
+        }
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        # Whitespace differences (indentation of f-string prompts, trailing newlines) don't change the prompt
+        normalized = [[m.get('role', ''), ' '.join(str(m.get('content', '')).split())] for m in messages]
+        payload = json.dumps([model, normalized, temperature, max_tokens], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.store.get(key)
+        if raw is None:
+            return None
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None
+        if entry.get('expires_at', 0) <= time.time():
+            with self._lock:
+                self._stats['expired'] += 1
+            return None
+        return entry
+
+    def lookup(
+        self,
+        models: List[str],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Return a live cached answer to this prompt from any of the models, or None"""
+        for model in models:
+            entry = self._read(self.make_key(model, messages, temperature, max_tokens))
+            if entry is None:
+                continue
+            usage = entry.get('usage') or {}
+            with self._lock:
+                self._stats['hits'] += 1
+                self._stats['calls_saved'] += 1
+                self._stats['prompt_tokens_saved'] += int(usage.get('prompt_tokens') or 0)
+                self._stats['completion_tokens_saved'] += int(usage.get('completion_tokens') or 0)
+            print(f"✓ LLM response cache hit ({model})")
+            return entry.get('content')
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def store_answer(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        content: str,
+        usage: Dict[str, Any],
+        ttl: float
+    ):
+        """Cache the answer `model` gave to this prompt for ttl seconds"""
+        entry = {
+            'content': content,
+            'usage': {
+                'prompt_tokens': usage.get('prompt_tokens'),
+                'completion_tokens': usage.get('completion_tokens')
+            },
+            'created_at': time.time(),
+            'expires_at': time.time() + ttl
+        }
+        try:
+            self.store.put(self.make_key(model, messages, temperature, max_tokens), json.dumps(entry).encode('utf-8'))
+        except OSError as e:
+            print(f"⚠ Could not cache LLM response: {e}")
+            return
+        with self._lock:
+            self._stats['stores'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['tokens_saved'] = stats['prompt_tokens_saved'] + stats['completion_tokens_saved']
+        store = self.store.stats()
+        stats.update(entries=store['entries'], bytes=store['bytes'], max_bytes=store['max_bytes'])
+        return stats
+
+
+def _create_cache() -> Optional[LLMResponseCache]:
+    if os.getenv('LLM_CACHE_ENABLED', 'True') != 'True':
+        return None
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'llm_cache')
+    try:
+        return LLMResponseCache(
+            os.getenv('LLM_CACHE_DIR') or default_dir,
+            max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', '64')) * 1024 * 1024)
+        )
+    except OSError as e:
+        print(f"⚠ LLM response cache disabled: {e}")
+        return None
+
+
+llm_response_cache = _create_cache()
+
+# Per call site TTLs (seconds); 0 disables caching for that call site
+LLM_CACHE_TTL_INITIAL_QUESTION = float(os.getenv('LLM_CACHE_TTL_INITIAL_QUESTION', '3600'))
+LLM_CACHE_TTL_EVALUATION = float(os.getenv('LLM_CACHE_TTL_EVALUATION', '86400'))
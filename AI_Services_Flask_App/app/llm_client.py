@@ -0,0 +1,60 @@
+"""
+LLM clients of the AI service
+The client itself (pooled session, retries, timeouts, hedging, JSON
+extraction) lives in the shared selectra_llm package; this module wires it to
+the service's model health registry, response cache, telemetry and request
+deadline.
+"""
+import os
+from dotenv import load_dotenv
+# LLMError, JsonStringFieldStreamer and extract_json are imported from here by the call sites
+from selectra_llm import LLMClient, LLMError, JsonStringFieldStreamer, extract_json, llm_telemetry
+from .model_health import model_health
+from .llm_cache import llm_response_cache
+from . import deadline as request_deadline
+
+# Load environment variables
+load_dotenv()
+
+
+def _openrouter_client() -> LLMClient:
+    return LLMClient(
+        os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
+        api_key=os.getenv('OPENROUTER_API_KEY', ''),
+        extra_headers={
+            'HTTP-Referer': 'https://selectra-ai.com',
+            'X-Title': 'Selectra AI Interviews',
+        },
+        pool_size=int(os.getenv('LLM_POOL_SIZE', '20')),
+        connect_timeout=float(os.getenv('LLM_CONNECT_TIMEOUT', '5')),
+        read_timeout=float(os.getenv('LLM_READ_TIMEOUT', '30')),
+        total_timeout=float(os.getenv('LLM_TOTAL_TIMEOUT', '60')),
+        max_retries=int(os.getenv('LLM_MAX_RETRIES', '2')),
+        health=model_health,
+        cache=llm_response_cache,
+        hedge_delay=(
+            float(os.getenv('LLM_HEDGE_DELAY_MS', '2500')) / 1000
+            if os.getenv('LLM_HEDGE_ENABLED', 'False') == 'True' else None
+        ),
+        hedge_quantile=float(os.getenv('LLM_HEDGE_QUANTILE', '0.9')),
+        hedge_workers=int(os.getenv('LLM_HEDGE_WORKERS', '16')),
+        telemetry=llm_telemetry,
+        min_attempt_time=float(os.getenv('LLM_MIN_ATTEMPT_MS', '1000')) / 1000,
+        deadline_clamp=request_deadline.clamp
+    )
+
+
+# Global client instances
+openrouter_client = _openrouter_client()
+
+# Local Ollama (OpenAI-compatible API) used by questions.py
+ollama_client = LLMClient(
+    os.getenv('OLLAMA_API_BASE', 'http://localhost:11434'),
+    api_key=os.getenv('OPENAI_API_KEY', ''),
+    pool_size=int(os.getenv('LLM_POOL_SIZE', '20')),
+    read_timeout=float(os.getenv('OLLAMA_READ_TIMEOUT', '120')),
+    total_timeout=float(os.getenv('OLLAMA_READ_TIMEOUT', '120')),
+    telemetry=llm_telemetry,
+    min_attempt_time=float(os.getenv('LLM_MIN_ATTEMPT_MS', '1000')) / 1000,
+    deadline_clamp=request_deadline.clamp
+)
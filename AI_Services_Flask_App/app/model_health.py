@@ -0,0 +1,191 @@
+"""
+Per-model health tracking for LLM routing
+Rolling error rate and latency per model, a circuit breaker that skips models
+that keep failing (with half-open probes to detect recovery), and ordering of
+healthy models by observed latency and success rate.
+"""
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class _ModelState:
+    def __init__(self, window_size: int):
+        self.outcomes: "deque[bool]" = deque(maxlen=window_size)
+        self.latencies: "deque[float]" = deque(maxlen=window_size)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self.consecutive_failures = 0
+        self.total_calls = 0
+        self.total_failures = 0
+        self.times_opened = 0
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes)
+
+
+class ModelHealthRegistry:
+    """Thread-safe circuit breakers and latency stats, one per model name"""
+
+    def __init__(
+        self,
+        window_size: int = 50,
+        min_samples: int = 5,
+        error_threshold: float = 0.5,
+        consecutive_failures: int = 3,
+        open_seconds: float = 30.0
+    ):
+        """
+        Args:
+            window_size: Number of recent calls the error rate and latency are computed over
+            min_samples: Calls needed before a model is ranked by its stats or tripped by error rate
+            error_threshold: Error rate in the window that opens the circuit
+            consecutive_failures: Failures in a row that open the circuit regardless of the window
+            open_seconds: How long an open circuit is skipped before a half-open probe is allowed
+        """
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self.error_threshold = error_threshold
+        self.consecutive_failures = consecutive_failures
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelState] = {}
+
+    def _get(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            state = self._models[model] = _ModelState(self.window_size)
+        return state
+
+    def _score(self, state: _ModelState) -> float:
+        """Expected cost of routing to a model: p95 latency inflated by its failure rate"""
+        p95 = _percentile(list(state.latencies), 0.95) or 0.0
+        return p95 / max(1.0 - state.error_rate(), 0.05)
+
+    def _rank(self, models: List[str], claim_probes: bool) -> List[str]:
+        now = time.monotonic()
+        measured, unmeasured, probes = [], [], []
+        with self._lock:
+            for position, model in enumerate(models):
+                state = self._get(model)
+                if state.state == OPEN:
+                    if now - state.opened_at < self.open_seconds:
+                        continue
+                    if claim_probes:
+                        state.state = HALF_OPEN
+                        state.probe_started_at = now
+                    probes.append(model)
+                elif state.state == HALF_OPEN:
+                    # Only one probe at a time; a probe that never reported back is retried
+                    if now - state.probe_started_at >= self.open_seconds:
+                        if claim_probes:
+                            state.probe_started_at = now
+                        probes.append(model)
+                elif len(state.latencies) >= self.min_samples:
+                    measured.append((self._score(state), position, model))
+                else:
+                    unmeasured.append(model)
+        return probes + [model for _, _, model in sorted(measured)] + unmeasured
+
+    def order(self, models: List[str]) -> List[str]:
+        """
+        Return the models worth trying, best first. Models with an open circuit
+        are skipped; once open_seconds have passed a single request tries it first
+        as a half-open probe (otherwise a recovered model would never be reached
+        while the others answer). Models with too few samples keep their
+        configured order after the measured ones.
+        """
+        return self._rank(models, claim_probes=True)
+
+    def order_preview(self, models: List[str]) -> List[str]:
+        """Same ordering as order() without claiming half-open probes (for monitoring)"""
+        return self._rank(models, claim_probes=False)
+
+    def latency_quantile(self, model: str, q: float) -> Optional[float]:
+        """Observed success latency quantile in seconds, None until min_samples calls"""
+        with self._lock:
+            state = self._models.get(model)
+            if state is None or len(state.latencies) < self.min_samples:
+                return None
+            return _percentile(list(state.latencies), q)
+
+    def record_success(self, model: str, latency: float):
+        with self._lock:
+            state = self._get(model)
+            state.outcomes.append(True)
+            state.latencies.append(latency)
+            state.total_calls += 1
+            state.consecutive_failures = 0
+            if state.state != CLOSED:
+                print(f"✓ Model {model} recovered, closing circuit")
+                state.state = CLOSED
+                state.outcomes.clear()
+                state.outcomes.append(True)
+
+    def record_failure(self, model: str):
+        with self._lock:
+            state = self._get(model)
+            state.outcomes.append(False)
+            state.total_calls += 1
+            state.total_failures += 1
+            state.consecutive_failures += 1
+            tripped = (
+                state.state == HALF_OPEN
+                or state.consecutive_failures >= self.consecutive_failures
+                or (len(state.outcomes) >= self.min_samples and state.error_rate() >= self.error_threshold)
+            )
+            if tripped and state.state != OPEN:
+                print(f"⚠ Opening circuit for model {model} for {self.open_seconds:.0f}s")
+                state.state = OPEN
+                state.opened_at = time.monotonic()
+                state.times_opened += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current health of every model seen so far"""
+        now = time.monotonic()
+        with self._lock:
+            models = {}
+            for model, state in self._models.items():
+                latencies = list(state.latencies)
+                models[model] = {
+                    'state': state.state,
+                    'error_rate': round(state.error_rate(), 4),
+                    'p50_latency_ms': round(_percentile(latencies, 0.5) * 1000) if latencies else None,
+                    'p95_latency_ms': round(_percentile(latencies, 0.95) * 1000) if latencies else None,
+                    'window_calls': len(state.outcomes),
+                    'total_calls': state.total_calls,
+                    'total_failures': state.total_failures,
+                    'times_opened': state.times_opened,
+                    'retry_in_seconds': (
+                        max(0, round(self.open_seconds - (now - state.opened_at), 1))
+                        if state.state == OPEN else None
+                    )
+                }
+        return models
+
+
+# Shared by every OpenRouter call in this worker
+model_health = ModelHealthRegistry(
+    window_size=int(os.getenv('LLM_HEALTH_WINDOW', '50')),
+    min_samples=int(os.getenv('LLM_HEALTH_MIN_SAMPLES', '5')),
+    error_threshold=float(os.getenv('LLM_CIRCUIT_ERROR_RATE', '0.5')),
+    consecutive_failures=int(os.getenv('LLM_CIRCUIT_CONSECUTIVE_FAILURES', '3')),
+    open_seconds=float(os.getenv('LLM_CIRCUIT_OPEN_SECONDS', '30'))
+)
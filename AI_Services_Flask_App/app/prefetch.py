@@ -0,0 +1,235 @@
+"""
+Speculative next-question prefetch
+While the candidate is answering question N, the next new-topic question (and
+its audio) is generated in the background and kept per interview session.
+Prefetches serve a later request, so they run without the deadline of the
+request that scheduled them. A finished prefetch is also written to a SQLite
+table next to the interview sessions, so question N+1 can be served by any
+gunicorn worker on the host, not only the one that scheduled it.
+"""
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, TimeoutError as FutureTimeout
+from typing import Dict, Any, Callable, Optional
+from .executor import io_executor
+from .session_store import interview_sessions
+from .sqlite_store import SQLiteStore
+from . import deadline as request_deadline
+
+
+class QuestionPrefetcher:
+    """Holds at most one in-flight/ready prefetched question per interview session"""
+
+    def __init__(self, executor: Executor, ttl: float = 900.0, max_sessions: int = 2000, max_wait: float = 30.0,
+                 path: Optional[str] = None):
+        """
+        Args:
+            executor: Executor the speculative generation runs on
+            ttl: Seconds a prefetched question stays valid
+            max_sessions: Maximum number of sessions holding a prefetch (LRU)
+            max_wait: Longest a request waits for a prefetch that is still in flight
+            path: SQLite database finished prefetches are shared through (None: this process only)
+        """
+        self.executor = executor
+        self.ttl = ttl
+        self.max_sessions = max(1, max_sessions)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._store = SQLiteStore(path, schema=(
+            "CREATE TABLE IF NOT EXISTS prefetched_questions ("
+            "session_key TEXT PRIMARY KEY, question_number INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, data TEXT NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS idx_prefetched_created ON prefetched_questions (created_at)"
+        )) if path else None
+        self._stats = {
+            'scheduled': 0,
+            'served': 0,
+            'served_shared': 0,
+            'waited': 0,
+            'missed': 0,
+            'stale': 0,
+            'failed': 0,
+            'rejected': 0,
+            'late_stored': 0,
+            'evicted': 0
+        }
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def schedule(self, session_key: str, question_number: int, generate: Callable[[], Dict[str, Any]]) -> Future:
+        """Start generating the question for question_number in the background"""
+        def run_detached():
+            with request_deadline.detached():
+                return generate()
+        future = self.executor.submit(run_detached)
+        self._hold(session_key, question_number, future, None)
+        self._count('scheduled')
+        return future
+
+    def store(
+        self,
+        session_key: str,
+        question_number: int,
+        future: Future,
+        accept: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ):
+        """
+        Hold an already running generation (e.g. a question that missed its
+        latency SLO) as the prefetch for question_number. accept is checked on the
+        finished result when it is taken; a rejected result counts as a miss.
+        """
+        self._hold(session_key, question_number, future, accept)
+        self._count('late_stored')
+
+    def _hold(self, session_key: str, question_number: int, future: Future, accept: Optional[Callable]):
+        with self._lock:
+            self._entries.pop(session_key, None)
+            self._entries[session_key] = {
+                'question_number': question_number,
+                'future': future,
+                'accept': accept,
+                'created_at': time.monotonic()
+            }
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self._stats['evicted'] += 1
+        if self._store is not None:
+            future.add_done_callback(lambda done: self._publish(session_key, question_number, done, accept))
+
+    def _publish(self, session_key: str, question_number: int, future: Future, accept: Optional[Callable]):
+        """Share a finished prefetch with the other workers, unless it was taken or replaced meanwhile"""
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is None or entry['future'] is not future:
+                return
+        try:
+            result = future.result()
+        except Exception:
+            return
+        if not result or not result.get('success') or not result.get('question'):
+            return
+        if accept is not None and not accept(result):
+            return
+        now = time.time()
+        try:
+            with self._store.connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO prefetched_questions (session_key, question_number, created_at, data) "
+                    "VALUES (?, ?, ?, ?)",
+                    (session_key, question_number, now, json.dumps(result))
+                )
+                conn.execute("DELETE FROM prefetched_questions WHERE created_at < ?", (now - self.ttl,))
+        except Exception as e:
+            print(f"⚠ Could not share prefetched question: {e}")
+
+    def _take_shared(self, session_key: str, question_number: int) -> Optional[Dict[str, Any]]:
+        """Claim a prefetch another worker finished for this session (None if there is none)"""
+        if self._store is None:
+            return None
+        with self._store.connection() as conn:
+            row = conn.execute(
+                "SELECT question_number, created_at, data FROM prefetched_questions WHERE session_key = ?",
+                (session_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM prefetched_questions WHERE session_key = ?", (session_key,))
+        number, created_at, data = row
+        if number != question_number or time.time() - created_at > self.ttl:
+            self._count('stale')
+            return None
+        self._count('served_shared')
+        return json.loads(data)
+
+    def _discard_shared(self, session_key: str):
+        if self._store is not None:
+            with self._store.connection() as conn:
+                conn.execute("DELETE FROM prefetched_questions WHERE session_key = ?", (session_key,))
+
+    def take(
+        self,
+        session_key: Optional[str],
+        question_number: int,
+        max_wait: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the prefetched question if it is still valid for question_number.
+        A prefetch that is still running in this worker is awaited (up to
+        max_wait seconds, if given): it started earlier than a fresh call would,
+        so it finishes sooner. Without one, a prefetch another worker finished is
+        taken from the shared table.
+        """
+        if not session_key:
+            return None
+        with self._lock:
+            entry = self._entries.pop(session_key, None)
+        if entry is None:
+            shared = self._take_shared(session_key, question_number)
+            if shared is None:
+                self._count('missed')
+            return shared
+        self._discard_shared(session_key)
+        if entry['question_number'] != question_number or time.monotonic() - entry['created_at'] > self.ttl:
+            self._count('stale')
+            return None
+
+        future = entry['future']
+        if not future.done():
+            self._count('waited')
+        max_wait = self.max_wait if max_wait is None else min(self.max_wait, max_wait)
+        remaining = request_deadline.remaining()
+        if remaining is not None:
+            max_wait = max(0.0, min(max_wait, remaining))
+        try:
+            result = future.result(timeout=max_wait)
+        except FutureTimeout:
+            self._count('failed')
+            return None
+        except Exception as e:
+            print(f"⚠ Prefetched question failed: {e}")
+            self._count('failed')
+            return None
+
+        if not result or not result.get('success') or not result.get('question'):
+            self._count('failed')
+            return None
+        if entry['accept'] is not None and not entry['accept'](result):
+            self._count('rejected')
+            return None
+        self._count('served')
+        return result
+
+    def discard(self, session_key: Optional[str]):
+        """Forget any prefetch for a session (e.g. when the interview ends)"""
+        if not session_key:
+            return
+        with self._lock:
+            self._entries.pop(session_key, None)
+        self._discard_shared(session_key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = sum(1 for e in self._entries.values() if not e['future'].done())
+            held = len(self._entries)
+            counters = dict(self._stats)
+        shared = 0
+        if self._store is not None:
+            shared = self._store.connection().execute("SELECT COUNT(*) FROM prefetched_questions").fetchone()[0]
+        return {**counters, 'sessions': held, 'in_flight': in_flight, 'shared': shared}
+
+
+PREFETCH_ENABLED = os.getenv('INTERVIEW_PREFETCH', 'True') == 'True'
+
+question_prefetcher = QuestionPrefetcher(
+    io_executor,
+    ttl=float(os.getenv('INTERVIEW_PREFETCH_TTL', '900')),
+    max_sessions=int(os.getenv('INTERVIEW_PREFETCH_MAX_SESSIONS', '2000')),
+    # Shared through the interview session database, so any worker can serve the prefetch
+    path=interview_sessions.path
+)
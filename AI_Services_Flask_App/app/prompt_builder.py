@@ -0,0 +1,195 @@
+"""
+Token-budgeted prompt builder
+Every interview prompt carries the job description and the candidate's CV.
+Instead of re-sending character slices of the raw text, each is reduced once to a
+compact extractive brief (the requirement, skill and experience lines that matter,
+boilerplate dropped, cut on word boundaries) which every question and evaluation
+prompt reuses. Each call site also has a token budget its prompt is fitted to.
+"""
+import os
+import re
+import hashlib
+import threading
+from typing import Dict, Any, Tuple
+from .cache import TTLCache
+
+# Default prompt budgets (system + user prompt tokens) per call site
+DEFAULT_PROMPT_BUDGETS = {
+    'initial_question': 1000,
+    'interview_plan': 1200,
+    'job_question_pool': 1200,
+    'followup_question': 900,
+    'new_question': 1200,
+    'evaluate_answer': 1300,
+    'evaluate_interview': 1800,
+}
+
+# Lines that never help the interviewer: legal notices, perks, application instructions
+BOILERPLATE_PATTERN = re.compile(
+    r'equal opportunity|\beeo\b|affirmative action|regardless of (race|gender|age)|diversity|disabilit|'
+    r'benefits|perks|salary|compensation|paid time off|health insurance|401\(?k\)?|'
+    r'apply now|how to apply|send (your|us)|click|about (us|the company)|who we are|follow us|'
+    r'visa sponsorship|privacy|cookies?\b|references available',
+    re.IGNORECASE
+)
+# Words that mark a requirement, responsibility or accomplishment
+SIGNAL_PATTERN = re.compile(
+    r'\b(experience|years?|required|requirements?|must|responsib\w*|proficien\w*|knowledge|familiar\w*|'
+    r'skills?|degree|built|developed|designed|led|implemented|deployed|architected|optimi[sz]ed|'
+    r'migrated|scaled|projects?|certified|certification)\b',
+    re.IGNORECASE
+)
+# Technology-looking tokens: C++, C#, Node.js, AWS, JavaScript, PostgreSQL
+TECH_TOKEN_PATTERN = re.compile(r'\b[A-Za-z]+[+#]+|\b\w+\.(?:js|net|io)\b|\b[A-Z]{2,}\b|\b[A-Z][a-z]+[A-Z]\w*\b')
+SEGMENT_SPLIT_PATTERN = re.compile(r'\n+|(?<=[.!?;])\s+(?=[A-Z])|\s*[•▪●◦■]\s*|\s+[-*]\s+(?=[A-Z])')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English prose)"""
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, at a sentence end or word boundary rather than mid-word"""
+    text = (text or '').strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, max_tokens * 4 - 1)
+    cut = text[:limit]
+    sentence_end = max(cut.rfind('. '), cut.rfind('\n'))
+    if sentence_end >= limit * 0.7:
+        return cut[:sentence_end + 1].rstrip()
+    space = cut.rfind(' ')
+    if space >= limit * 0.7:
+        cut = cut[:space]
+    return cut.rstrip(' ,;:-') + '…'
+
+
+def build_brief(text: str, max_tokens: int) -> str:
+    """
+    Extractive brief of a job description or CV within max_tokens: boilerplate
+    and duplicate lines are dropped and, if it still doesn't fit, the lines with
+    the most requirement/skill signal are kept in their original order.
+    """
+    segments = []
+    seen = set()
+    for raw in SEGMENT_SPLIT_PATTERN.split(text or ''):
+        segment = ' '.join(raw.split()).strip(' -*')
+        key = segment.lower()
+        if len(segment) < 3 or key in seen or BOILERPLATE_PATTERN.search(segment):
+            continue
+        seen.add(key)
+        segments.append(segment)
+    if not segments:
+        return ''
+
+    compact = '\n'.join(segments)
+    if estimate_tokens(compact) <= max_tokens:
+        return compact
+
+    def score(position: int, segment: str) -> float:
+        signal = 2 * len(SIGNAL_PATTERN.findall(segment)) + len(TECH_TOKEN_PATTERN.findall(segment))
+        # The first line is usually the role title or the candidate's headline
+        return signal + (3 if position == 0 else 0) + (1 if re.search(r'\d', segment) else 0)
+
+    ranked = sorted(range(len(segments)), key=lambda i: (-score(i, segments[i]), i))
+    chosen, used = [], 0
+    for index in ranked:
+        segment = truncate_to_tokens(segments[index], max(40, max_tokens // 4))
+        cost = estimate_tokens(segment) + 1
+        if used + cost > max_tokens:
+            continue
+        chosen.append((index, segment))
+        used += cost
+    return '\n'.join(segment for _, segment in sorted(chosen))
+
+
+class PromptBuilder:
+    """Builds and caches the compact briefs and fits prompts to per-call-site token budgets"""
+
+    def __init__(self, budgets: Dict[str, int], brief_tokens: int = 300, min_section_tokens: int = 40):
+        """
+        Args:
+            budgets: Prompt token budget (system + user) per call site
+            brief_tokens: Size of the job description and candidate briefs
+            min_section_tokens: Sections are never shrunk below this while fitting a budget
+        """
+        self.budgets = budgets
+        self.brief_tokens = brief_tokens
+        self.min_section_tokens = min_section_tokens
+        self._briefs = TTLCache('prompt_briefs', max_size=1024, ttl=6 * 3600)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _brief(self, kind: str, text: str) -> str:
+        key = (kind, hashlib.sha256((text or '').encode('utf-8')).hexdigest())
+        brief = self._briefs.get(key)
+        if brief is None:
+            brief = build_brief(text, self.brief_tokens)
+            self._briefs.put(key, brief)
+        return brief
+
+    def job_brief(self, job_description: str) -> str:
+        """Compact job description, built once per distinct description"""
+        return self._brief('job', job_description)
+
+    def candidate_brief(self, resume_summary: str) -> str:
+        """Compact candidate CV, built once per distinct CV"""
+        return self._brief('candidate', resume_summary)
+
+    def fit(self, site: str, system_prompt: str, template: str, **sections: Any) -> Tuple[str, str]:
+        """
+        Render template with sections so that system + user prompt fit the call
+        site's budget. When over budget, the largest text section is cut on a word
+        boundary (repeatedly) until it fits or every section is at its floor.
+        """
+        budget = self.budgets.get(site)
+        user_prompt = template.format(**sections)
+        shrunk = False
+        while budget is not None:
+            overflow = estimate_tokens(system_prompt) + estimate_tokens(user_prompt) - budget
+            if overflow <= 0:
+                break
+            name = max(
+                (key for key, value in sections.items() if isinstance(value, str)),
+                key=lambda key: len(sections[key]),
+                default=None
+            )
+            current = estimate_tokens(sections[name]) if name else 0
+            if current <= self.min_section_tokens:
+                break
+            sections[name] = truncate_to_tokens(sections[name], max(self.min_section_tokens, current - overflow - 5))
+            user_prompt = template.format(**sections)
+            shrunk = True
+
+        tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+        with self._lock:
+            stats = self._stats.setdefault(site, {'calls': 0, 'prompt_tokens': 0, 'max_prompt_tokens': 0, 'shrunk': 0})
+            stats['calls'] += 1
+            stats['prompt_tokens'] += tokens
+            stats['max_prompt_tokens'] = max(stats['max_prompt_tokens'], tokens)
+            stats['shrunk'] += int(shrunk)
+        return system_prompt, user_prompt
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sites = {
+                site: {
+                    'budget': self.budgets.get(site),
+                    'calls': stats['calls'],
+                    'avg_prompt_tokens': round(stats['prompt_tokens'] / stats['calls']) if stats['calls'] else 0,
+                    'max_prompt_tokens': stats['max_prompt_tokens'],
+                    'shrunk': stats['shrunk']
+                }
+                for site, stats in self._stats.items()
+            }
+        return {'brief_tokens': self.brief_tokens, 'sites': sites, 'briefs': self._briefs.stats()}
+
+
+prompt_builder = PromptBuilder(
+    budgets={
+        site: int(os.getenv(f'PROMPT_BUDGET_{site.upper()}', str(budget)))
+        for site, budget in DEFAULT_PROMPT_BUDGETS.items()
+    },
+    brief_tokens=int(os.getenv('PROMPT_BRIEF_TOKENS', '300'))
+)
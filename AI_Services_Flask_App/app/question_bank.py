@@ -0,0 +1,166 @@
+"""
+Local interview question bank
+Skill-tagged questions loaded once from data/question_bank.json into an
+in-memory index. When no valid LLM question arrives within the latency SLO
+(or every model fails), a question is picked by the overlap between its skills
+and the skills found in the CV and job description.
+"""
+import os
+import re
+import json
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Iterable, FrozenSet, Tuple
+from .cache import TTLCache
+
+DEFAULT_QUESTION_BANK_PATH = os.path.join(os.path.dirname(__file__), 'data', 'question_bank.json')
+
+
+def _normalize(text: str) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+class QuestionBank:
+    """Skill -> question index with per-candidate rankings cached, so a pick is a short list scan"""
+
+    def __init__(self, path: str, max_profiles: int = 2048, profile_ttl: float = 6 * 3600):
+        """
+        Args:
+            path: JSON file with skills (canonical name -> lowercase aliases matched in text),
+                questions tagged with canonical skills, and generic follow_ups
+            max_profiles: Candidate (CV, job description) rankings kept in memory
+            profile_ttl: Seconds a cached ranking is kept
+        """
+        self.path = path
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        self._aliases: Dict[str, str] = {}
+        for skill, aliases in data.get('skills', {}).items():
+            for alias in aliases:
+                self._aliases[alias.lower()] = skill
+        # Longest aliases first so "spring boot" wins over "spring"; lookarounds instead of \b for C++/C#/.NET
+        alternatives = '|'.join(re.escape(alias) for alias in sorted(self._aliases, key=len, reverse=True))
+        self._skill_pattern = re.compile(r'(?<![\w+#.])(%s)(?![\w+#])' % alternatives, re.IGNORECASE)
+
+        self.questions: List[Dict[str, Any]] = []
+        self._by_skill: Dict[str, List[int]] = {}
+        self._general: List[int] = []
+        self._by_text: Dict[str, int] = {}
+        for item in data.get('questions', []):
+            index = len(self.questions)
+            skills = frozenset(item.get('skills') or [])
+            self.questions.append({
+                'id': item['id'],
+                'question': item['question'],
+                'focus_area': item.get('focus_area') or 'general',
+                'skills': skills
+            })
+            self._by_text[_normalize(item['question'])] = index
+            for skill in skills:
+                self._by_skill.setdefault(skill, []).append(index)
+            if not skills:
+                self._general.append(index)
+        self.follow_ups: List[str] = list(data.get('follow_ups') or [])
+
+        self._profiles = TTLCache('question_bank_profiles', max_size=max_profiles, ttl=profile_ttl)
+        self._lock = threading.Lock()
+        self._stats = {'selected': 0, 'skill_matched': 0, 'general': 0, 'follow_ups_selected': 0}
+
+    def skills_in(self, text: str) -> FrozenSet[str]:
+        """Canonical skills mentioned in text"""
+        return frozenset(self._aliases[match.lower()] for match in self._skill_pattern.findall(text or ''))
+
+    def _profile(self, resume_summary: str, job_description: str) -> Tuple[Tuple[int, ...], FrozenSet[str]]:
+        """
+        (question indices best first, skills found in CV or job description) for a
+        candidate. Skills in the CV weigh double, skills only in the job description
+        once, and skills in neither count against a question; general questions last.
+        """
+        key = hashlib.sha256(f"{resume_summary}\x00{job_description}".encode('utf-8')).hexdigest()
+        profile = self._profiles.get(key)
+        if profile is not None:
+            return profile
+        cv_skills = self.skills_in(resume_summary)
+        job_skills = self.skills_in(job_description)
+        relevant = cv_skills | job_skills
+
+        def score(index: int) -> int:
+            skills = self.questions[index]['skills']
+            return 2 * len(skills & cv_skills) + len(skills & job_skills) - len(skills - relevant)
+
+        candidates = {index for skill in relevant for index in self._by_skill.get(skill, [])}
+        ranked = tuple(sorted(candidates, key=lambda i: (-score(i), i))) + tuple(self._general)
+        profile = (ranked, relevant)
+        self._profiles.put(key, profile)
+        return profile
+
+    def select(
+        self,
+        resume_summary: str,
+        job_description: str,
+        asked: Iterable[str] = (),
+        question_number: int = 1
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Best question not asked yet that covers one of the candidate's skills no
+        earlier bank question covered; otherwise a general question, rotating by
+        question_number.
+
+        Returns:
+            {'id', 'question', 'focus_area', 'skills'} or None if the bank is exhausted
+        """
+        ranked, relevant = self._profile(resume_summary, job_description)
+        asked_indices = {self._by_text.get(_normalize(text)) for text in asked}
+        asked_indices.discard(None)
+        covered = frozenset().union(*(self.questions[i]['skills'] for i in asked_indices))
+
+        choice = None
+        for index in ranked:
+            skills = self.questions[index]['skills']
+            if index not in asked_indices and (skills - covered) & relevant:
+                choice = index
+                break
+        if choice is None:
+            general = [index for index in ranked if index not in asked_indices and not self.questions[index]['skills']]
+            if general:
+                choice = general[question_number % len(general)]
+            else:
+                choice = next((index for index in ranked if index not in asked_indices), None)
+        if choice is None:
+            return None
+
+        question = self.questions[choice]
+        with self._lock:
+            self._stats['selected'] += 1
+            self._stats['skill_matched' if question['skills'] else 'general'] += 1
+        return {**question, 'skills': sorted(question['skills'])}
+
+    def follow_up(self, asked: Iterable[str] = (), question_number: int = 1) -> str:
+        """Generic probe on the last answer, avoiding ones already used"""
+        asked_texts = {_normalize(text) for text in asked}
+        remaining = [q for q in self.follow_ups if _normalize(q) not in asked_texts] or self.follow_ups
+        with self._lock:
+            self._stats['follow_ups_selected'] += 1
+        return remaining[question_number % len(remaining)]
+
+    def all_questions(self) -> List[str]:
+        """Every question text in the bank (used to pre-render TTS audio)"""
+        return [q['question'] for q in self.questions] + list(self.follow_ups)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            'questions': len(self.questions),
+            'skills': len(self._by_skill),
+            'follow_ups': len(self.follow_ups),
+            'profiles': self._profiles.stats(),
+            **stats
+        }
+
+
+question_bank = QuestionBank(
+    os.getenv('QUESTION_BANK_PATH') or DEFAULT_QUESTION_BANK_PATH,
+    max_profiles=int(os.getenv('QUESTION_BANK_MAX_PROFILES', '2048'))
+)
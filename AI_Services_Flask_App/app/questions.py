@@ -1,12 +1,9 @@
-import openai
 import os
 import json
-import re
 from typing import Dict, Any, List, Union
+from .llm_client import ollama_client, extract_json, LLMError
 
 
-openai.api_base = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
-openai.api_key = os.getenv("OPENAI_API_KEY", "")
 model = os.getenv("OLLAMA_MODEL", "llama2")
 
 
@@ -33,27 +30,16 @@ Resume:
 {resume}
 """
 
-    resp = openai.ChatCompletion.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}],
+    text = ollama_client.chat(
+        model,
+        [{"role": "user", "content": prompt}],
         temperature=0.2,
         max_tokens=10000,
+        site='ollama_initial_question',
     )
 
-    text = resp["choices"][0]["message"]["content"].strip()
-
     # Parse JSON robustly and extract "question"
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        m = re.search(r"\{.*\}", text, re.S)
-        if m:
-            try:
-                data = json.loads(m.group(0))
-            except json.JSONDecodeError:
-                data = {}
-        else:
-            data = {}
+    data = extract_json(text)
 
     # Fallbacks: check "question" key or try to use the whole text
     question = data.get("question")
@@ -145,27 +131,16 @@ def follow_up(job, resume, previous_chat):
         }
     )
 
-    resp = openai.ChatCompletion.create(
-        model=model,
-        messages=messages,
+    text = ollama_client.chat(
+        model,
+        messages,
         temperature=0.2,
         max_tokens=512,
+        site='ollama_follow_up',
     )
 
-    text = resp["choices"][0]["message"]["content"].strip()
-
     # Robust JSON extraction
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        m = re.search(r"\{.*\}", text, re.S)
-        if m:
-            try:
-                data = json.loads(m.group(0))
-            except json.JSONDecodeError:
-                data = {}
-        else:
-            data = {}
+    data = extract_json(text)
 
     # Extract follow_up or fallback to question or plain text
     follow_up_q = None
@@ -208,33 +183,21 @@ def answer_evaluation(question: str, answer: str, job: str, resume: str) -> Dict
     )
 
     try:
-        resp = openai.ChatCompletion.create(
-            model=model,
-            messages=[
+        text = ollama_client.chat(
+            model,
+            [
                 {"role": "system", "content": system_content},
                 {"role": "user", "content": user_content},
             ],
             temperature=0.0,
             max_tokens=800,
+            site='ollama_answer_evaluation',
         )
-    except Exception as e:
+    except LLMError as e:
         return {"score": None, "feedback": f"LLM call failed: {e}", "improvements": []}
 
-    text = resp["choices"][0]["message"]["content"].strip()
-
     # Parse JSON robustly
-    data: Dict[str, Any] = {}
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        m = re.search(r"\{.*\}", text, re.S)
-        if m:
-            try:
-                data = json.loads(m.group(0))
-            except json.JSONDecodeError:
-                data = {}
-        else:
-            data = {}
+    data: Dict[str, Any] = extract_json(text)
 
     # Normalize result and enforce score in 1-10
     if isinstance(data, dict):
@@ -324,30 +287,18 @@ def evaluate_interview(resume: str, job_description: str, full_chat: Union[str,
     )
 
     try:
-        resp = openai.ChatCompletion.create(
-            model=model,
-            messages=messages,
+        text = ollama_client.chat(
+            model,
+            messages,
             temperature=0.0,
             max_tokens=1200,
+            site='ollama_evaluate_interview',
         )
-    except Exception as e:
+    except LLMError as e:
         return {"score": None, "feedback": f"LLM call failed: {e}", "improvements": []}
 
-    text = resp["choices"][0]["message"]["content"].strip()
-
     # Robust JSON extraction
-    data: Dict[str, Any] = {}
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        m = re.search(r"\{.*\}", text, re.S)
-        if m:
-            try:
-                data = json.loads(m.group(0))
-            except json.JSONDecodeError:
-                data = {}
-        else:
-            data = {}
+    data: Dict[str, Any] = extract_json(text)
 
     # Normalize and enforce score 1-10
     if isinstance(data, dict):
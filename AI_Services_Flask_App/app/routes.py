@@ -1,17 +1,29 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, url_for, current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature
 from .chromadb_utils import (
     save_job_description, 
     get_job_description,
     save_application,
     get_application,
-    search_similar_applications
+    search_similar_applications,
+    list_application_ids,
+    get_existing_application_ids,
+    delete_applications,
+    write_queue
 )
 from .cv_matcher import cv_matcher
+from .cache import job_description_cache, search_result_cache
+from .llm_cache import llm_response_cache
 from datetime import datetime
 import PyPDF2
 import io
 import base64
 import re
+import os
+import json
+import time
+import queue
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 
 main = Blueprint('main', __name__)
 
@@ -73,12 +85,17 @@ def create_job():
               description: "Optional job ID from Django (will use hash if not provided)"
     responses:
       201:
-        description: Job created
+        description: Job created (or its description updated); its shared interview question pool is generated in the background
         schema:
           type: object
           properties:
             job_id:
               type: string
+            question_pool:
+              type: string
+              enum: [ready, building, failed, disabled]
+      409:
+        description: Job already exists with this description (its question pool is built if missing)
       400:
         description: Invalid input
         schema:
@@ -98,16 +115,20 @@ def create_job():
     print(f"Job ID: {job_id if job_id else 'auto-generated'}")
     print(f"Description length: {len(job_description)} characters")
     
-    # Check if job already exists
+    # Check if job already exists; an edited description is stored again (and gets a new pool)
     if job_id:
         existing_job = get_job_description(job_id)
-        if existing_job:
+        if existing_job == job_description:
             print(f"✓ Job {job_id} already exists in ChromaDB")
-            return jsonify({'job_id': job_id, 'message': 'Job already exists'}), 409
+            return jsonify({
+                'job_id': job_id,
+                'message': 'Job already exists',
+                'question_pool': _schedule_job_pool(job_id, job_description)
+            }), 409
     
     saved_job_id = save_job_description(job_description, job_id=job_id)
     
-    return jsonify({'job_id': saved_job_id}), 201
+    return jsonify({'job_id': saved_job_id, 'question_pool': _schedule_job_pool(saved_job_id, job_description)}), 201
 
 @main.route('/compare/<job_id>', methods=['POST'])
 def compare_cv(job_id):
@@ -520,11 +541,581 @@ def search_applications():
         return jsonify({'results': []}), 200
 
 
+@main.route('/applications/ids', methods=['POST'])
+def application_ids():
+    """
+    Page through application IDs stored in ChromaDB (used by reconciliation)
+    ---
+    tags:
+      - Applications
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          properties:
+            offset:
+              type: integer
+              example: 0
+            limit:
+              type: integer
+              example: 500
+            ids:
+              type: array
+              description: "Optional: return only which of these IDs exist"
+              items:
+                type: string
+    responses:
+      200:
+        description: Application IDs
+        schema:
+          type: object
+          properties:
+            ids:
+              type: array
+              items:
+                type: string
+      400:
+        description: Invalid input
+      500:
+        description: ChromaDB could not be read (never reported as an empty page)
+    """
+    data = request.json or {}
+    ids = data.get('ids')
+    if ids is not None and not isinstance(ids, list):
+        return jsonify({'error': 'ids must be a list'}), 400
+    try:
+        offset = max(0, int(data.get('offset', 0)))
+        limit = min(max(1, int(data.get('limit', 500))), 5000)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    
+    try:
+        if ids is not None:
+            return jsonify({'ids': get_existing_application_ids(ids)}), 200
+        return jsonify({'ids': list_application_ids(offset=offset, limit=limit)}), 200
+    except Exception as e:
+        print(f"✗ Error listing application IDs: {e}")
+        return jsonify({'error': f'Failed to list application IDs: {str(e)}'}), 500
+
+
+@main.route('/applications/delete', methods=['POST'])
+def delete_applications_batch():
+    """
+    Delete a batch of applications from ChromaDB
+    ---
+    tags:
+      - Applications
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids:
+              type: array
+              items:
+                type: string
+    responses:
+      200:
+        description: Number of applications deleted
+      400:
+        description: Invalid input
+    """
+    data = request.json or {}
+    ids = data.get('ids')
+    if not isinstance(ids, list):
+        return jsonify({'error': 'ids (list) is required'}), 400
+    
+    try:
+        deleted = delete_applications(ids)
+    except Exception as e:
+        print(f"✗ Error deleting applications: {e}")
+        return jsonify({'error': f'Failed to delete applications: {str(e)}'}), 500
+    return jsonify({'deleted': deleted}), 200
+
+
+@main.route('/applications/batch', methods=['POST'])
+def submit_applications_batch():
+    """
+    Store a batch of application CV texts (used by reconciliation re-ingest)
+    ---
+    tags:
+      - Applications
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            applications:
+              type: array
+              items:
+                type: object
+                properties:
+                  application_id:
+                    type: string
+                  cv_text:
+                    type: string
+                  job_id:
+                    type: string
+                  candidate_name:
+                    type: string
+                  candidate_email:
+                    type: string
+    responses:
+      201:
+        description: Applications saved
+      400:
+        description: Invalid input
+    """
+    data = request.json or {}
+    applications = data.get('applications')
+    if not isinstance(applications, list):
+        return jsonify({'error': 'applications (list) is required'}), 400
+    
+    saved, errors = [], []
+    for item in applications:
+        application_id = item.get('application_id')
+        cv_text = item.get('cv_text')
+        if not application_id or not cv_text:
+            errors.append({'application_id': application_id, 'error': 'application_id and cv_text are required'})
+            continue
+        metadata = {
+            'candidate_name': item.get('candidate_name'),
+            'candidate_email': item.get('candidate_email'),
+            'job_id': str(item['job_id']) if item.get('job_id') else None,
+            'type': 'application',
+            'created_at': datetime.now().isoformat()
+        }
+        try:
+            saved.append(save_application(cv_text, application_id=str(application_id), metadata=metadata))
+        except Exception as e:
+            errors.append({'application_id': application_id, 'error': str(e)})
+    
+    print(f"✓ Batch saved {len(saved)} applications ({len(errors)} errors)")
+    return jsonify({'saved': saved, 'errors': errors}), 201
+
+
+@main.route('/chromadb/write-queue', methods=['GET'])
+def write_queue_status():
+    """
+    Status of the ChromaDB write-behind queue
+    ---
+    tags:
+      - Applications
+    responses:
+      200:
+        description: Queue counters (pending, flushed, batches, failed)
+    """
+    return jsonify(write_queue.stats()), 200
+
+
+@main.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Hit/miss metrics for the in-process caches
+    ---
+    tags:
+      - Jobs
+    responses:
+      200:
+        description: Cache size, hits, misses and hit rate per cache
+    """
+    return jsonify({
+        'job_descriptions': job_description_cache.stats(),
+        'search_results': search_result_cache.stats(),
+        'tts_audio': tts_service.cache_stats(),
+        'llm_responses': llm_response_cache.stats() if llm_response_cache else None,
+        'interview_sessions': interview_sessions.stats()
+    }), 200
+
+
 # ==================== INTERVIEW ROUTES ====================
 
 from .interview_service import interview_service
 from .tts_service import tts_service
 from .stt_service import stt_service
+from .executor import io_executor
+from .job_question_pool import job_question_pools
+from .prefetch import question_prefetcher, PREFETCH_ENABLED
+from .evaluation_jobs import evaluation_jobs, QueueFullError
+from .session_store import interview_sessions, SessionNotFound
+from selectra_llm import llm_telemetry
+from . import deadline as request_deadline
+
+
+# Signed audio URLs stay valid this long (seconds)
+TTS_AUDIO_URL_MAX_AGE = int(os.getenv('TTS_AUDIO_URL_MAX_AGE', '3600'))
+# Longest a question request waits for the LLM before a question bank question is served (0 disables)
+QUESTION_SLO_MS = float(os.getenv('QUESTION_SLO_MS', '4000'))
+# Time kept back from the request deadline to build and send a question bank question
+QUESTION_DEADLINE_RESERVE_MS = float(os.getenv('QUESTION_DEADLINE_RESERVE_MS', '250'))
+# Draft every new-topic question in one LLM call at /interview/start (sessions only)
+INTERVIEW_PLAN_ENABLED = os.getenv('INTERVIEW_PLAN_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Shared per-job question pool generated at /job and drawn from by every interview for the job
+JOB_QUESTION_POOL_ENABLED = os.getenv('JOB_QUESTION_POOL_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+JOB_QUESTION_POOL_SIZE = int(os.getenv('JOB_QUESTION_POOL_SIZE', '20'))
+
+
+def _audio_urls_enabled():
+    """Signed audio URLs need a real SECRET_KEY (see create_app)"""
+    return current_app.config.get('AUDIO_URLS_ENABLED', False)
+
+
+def _audio_serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='tts-audio')
+
+
+def _audio_url(text):
+    """Signed URL that streams the audio for `text` (works on any worker)"""
+    return url_for('main.tts_stream', token=_audio_serializer().dumps(text), _external=True)
+
+
+def _submit_tts(result, inline_audio=False):
+    """
+    Attach audio to a generated question. By default the response carries an
+    audio_url the client streams from; inline_audio keeps the base64 MP3 in the
+    JSON and starts TTS on the shared I/O executor.
+    """
+    if not (result.get('success') and result.get('question')):
+        return None
+    if not inline_audio:
+        result.pop('audio', None)
+        if tts_service.is_available():
+            result['audio_url'] = _audio_url(result['question'])
+        return None
+    if result.get('audio'):
+        # Prefetched questions arrive with their audio already synthesized
+        return None
+    return io_executor.submit(tts_service.text_to_speech, result['question'])
+
+
+def _attach_audio(result, audio_future):
+    """Wait for a TTS future and attach its audio to the question result"""
+    if audio_future is None:
+        return
+    audio_result = audio_future.result()
+    if audio_result:
+        result['audio'] = audio_result
+
+
+def _schedule_prefetch(interview_id, job_description, resume_summary, conversation_history,
+                       result, total_questions, inline_audio=False, memory=None, interview_plan=None):
+    """
+    Speculatively generate the next new-topic question (and its audio) while the
+    candidate answers the question in `result`. The audio is always rendered so
+    the signed audio_url is served from the TTS cache.
+    """
+    if not (PREFETCH_ENABLED and interview_id and result.get('question')):
+        return
+    next_number = result.get('question_number', 1) + 1
+    if next_number > total_questions or interview_service.is_forced_followup(next_number):
+        return
+    
+    history = list(conversation_history) + [
+        {'role': 'interviewer', 'content': result['question'], 'focus_area': result.get('focus_area')}
+    ]
+    
+    def generate():
+        prefetched = interview_service.generate_new_topic_question(
+            job_description, resume_summary, history, next_number, total_questions, memory,
+            interview_plan=interview_plan
+        )
+        if prefetched.get('question') and tts_service.is_available():
+            audio_result = tts_service.text_to_speech(prefetched['question'])
+            if audio_result and inline_audio:
+                prefetched['audio'] = audio_result
+        return prefetched
+    
+    question_prefetcher.schedule(str(interview_id), next_number, generate)
+
+
+def _schedule_job_pool(job_id, job_description):
+    """
+    Generate the job's shared question pool in the background (unless it is
+    stored already) and pre-render its audio into the TTS cache, so interviews
+    for the job serve new-topic questions with no LLM or TTS wait. Only one
+    worker on the host builds a given job's pool.
+    
+    Returns:
+        'ready', 'building', 'failed' (the last build produced no pool; it is
+        retried after JOB_QUESTION_POOL_RETRY_SECONDS) or 'disabled'
+    """
+    if not JOB_QUESTION_POOL_ENABLED or JOB_QUESTION_POOL_SIZE <= 0:
+        return 'disabled'
+    if job_question_pools.get(job_id, job_description) is not None:
+        return 'ready'
+    build_state = job_question_pools.start_build(job_id)
+    if build_state != 'started':
+        return build_state
+    
+    def build():
+        items = []
+        try:
+            items = interview_service.generate_job_question_pool(job_description, JOB_QUESTION_POOL_SIZE)
+            if not items:
+                print(f"⚠ No question pool for job {job_id}, interviews will generate their questions")
+                return
+            job_question_pools.put(job_id, job_description, items)
+            print(f"✓ Question pool for job {job_id}: {len(items)} questions")
+            tts_service.prerender(item['question'] for item in items)
+        finally:
+            job_question_pools.finish_build(job_id, failed=not items)
+    
+    # The pool (and its audio) outlives the /job request, so it is built without its deadline
+    io_executor.submit_detached(build)
+    return 'building'
+
+
+def _schedule_interview_plan(session_id, job_description, resume_summary, total_questions, job_id=None):
+    """
+    Draft the interview plan in the background while the candidate answers the
+    opening question, and keep it on the session. Steps before it is ready (or
+    after it runs out) generate their questions one by one as before. When the
+    job has a question pool, the plan is its questions about the candidate's
+    skills instead, with no LLM call.
+    """
+    pooled = []
+    if job_id:
+        # The pool is built from the description registered at /job (clients compose their own
+        # job_description for the interview), so a pool for an older revision of the job is skipped
+        registered = get_job_description(job_id) or job_description
+        pooled = job_question_pools.candidate_items(job_id, resume_summary, registered)
+    if pooled:
+        plan = {'items': [{**item, 'pooled': True} for item in pooled], 'source': 'job_pool'}
+        interview_sessions.set_context(session_id, 'interview_plan', plan)
+        print(f"✓ Interview plan from the job question pool: {len(pooled)} questions")
+        return
+    if not INTERVIEW_PLAN_ENABLED:
+        return
+    
+    def generate():
+        plan = interview_service.generate_interview_plan(job_description, resume_summary, total_questions)
+        if plan is None:
+            print("⚠ No interview plan, questions will be generated step by step")
+            return
+        try:
+            interview_sessions.set_context(session_id, 'interview_plan', plan)
+            print(f"✓ Interview plan ready: {len(plan['items'])} topics")
+        except SessionNotFound:
+            pass
+    
+    io_executor.submit_detached(generate)
+
+
+def _session_plan(session):
+    """The session's interview plan, once it is ready (None otherwise)"""
+    return session['context'].get('interview_plan') if session is not None else None
+
+
+def _question_slo(data):
+    """
+    Seconds this request may wait for an LLM question: its slo_ms, else
+    QUESTION_SLO_MS, and never past the request deadline (None when unbounded)
+    """
+    try:
+        slo_ms = float(data.get('slo_ms', QUESTION_SLO_MS))
+    except (TypeError, ValueError):
+        slo_ms = QUESTION_SLO_MS
+    slo = slo_ms / 1000 if slo_ms > 0 else None
+    remaining = request_deadline.remaining()
+    if remaining is not None:
+        before_deadline = max(0.0, remaining - QUESTION_DEADLINE_RESERVE_MS / 1000)
+        slo = before_deadline if slo is None else min(slo, before_deadline)
+    return slo
+
+
+def _take_prefetched(interview_id, question_number, slo):
+    """
+    Take the prefetched question for question_number on the request thread,
+    waiting no longer than slo for one still in flight (an executor thread
+    blocked on a prefetch queued behind it would starve the pool). Returns
+    (prefetched, slo left for a fresh generation).
+    """
+    if interview_service.is_forced_followup(question_number):
+        return None, slo
+    started = time.monotonic()
+    prefetched = question_prefetcher.take(interview_id, question_number, max_wait=slo)
+    if slo is not None:
+        slo = max(0.0, slo - (time.monotonic() - started))
+    return prefetched, slo
+
+
+def _question_within_slo(generate, slo, bank_question):
+    """
+    Run generate on the I/O executor and wait up to slo seconds for it. Returns
+    (result, late_future): when the SLO is missed, the result is bank_question()
+    and late_future is the generation still running.
+    """
+    future = io_executor.submit(generate)
+    try:
+        return future.result(timeout=slo), None
+    except FutureTimeout:
+        print(f"⚠ No LLM question within the {slo * 1000:.0f}ms SLO, serving a question bank question")
+        return bank_question(), future
+
+
+def _stream_within_slo(steps, slo, bank_question, on_late):
+    """
+    Relay (kind, payload) steps of a question stream that runs on the I/O
+    executor. If no complete question arrives within slo seconds, the result is
+    bank_question() and on_late gets a future for the stream's eventual result.
+    """
+    if slo is None:
+        yield from steps
+        return
+    relay = queue.Queue()
+    result_future = Future()
+    
+    def produce():
+        try:
+            for step in steps:
+                relay.put(step)
+                if step[0] == 'result':
+                    result_future.set_result(step[1])
+        except Exception as e:
+            print(f"⚠ Question stream failed: {e}")
+        finally:
+            if not result_future.done():
+                result_future.set_result(None)
+            relay.put(None)
+    
+    io_executor.submit(produce)
+    deadline = time.monotonic() + slo
+    announced = False
+    while True:
+        try:
+            step = relay.get(timeout=None if announced else max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            print(f"⚠ No LLM question within the {slo * 1000:.0f}ms SLO, serving a question bank question")
+            on_late(result_future)
+            yield 'result', bank_question()
+            return
+        if step is None:
+            if result_future.result() is None:
+                yield 'result', bank_question()
+            return
+        announced = announced or step[0] == 'question'
+        yield step
+
+
+def _bank_question(job_description, resume_summary, conversation_history, question_number, total_questions):
+    """Question bank stand-in of the kind the LLM would have been asked for"""
+    question_type = 'follow_up' if interview_service.is_forced_followup(question_number) else 'new_topic'
+    return interview_service.bank_question(job_description, resume_summary, conversation_history,
+                                           question_number, total_questions, question_type=question_type)
+
+
+def _keep_late_question(interview_id, late_future, question_number, total_questions):
+    """
+    Hold a generation that missed its SLO as the prefetch for the next question.
+    Only a new-topic LLM question is still a sensible question one step later.
+    """
+    next_number = question_number + 1
+    if not (PREFETCH_ENABLED and interview_id) or next_number > total_questions \
+            or interview_service.is_forced_followup(next_number):
+        return False
+    question_prefetcher.store(
+        str(interview_id), next_number, late_future,
+        accept=lambda result: result.get('type') == 'new_topic' and not result.get('fallback')
+    )
+    return True
+
+
+def _last_exchange(conversation_history):
+    """Return the last (interviewer question, candidate answer) pair, if any"""
+    answer = None
+    for msg in reversed(conversation_history):
+        if msg.get('role') == 'candidate' and answer is None:
+            answer = msg.get('content', '')
+        elif msg.get('role') == 'interviewer' and answer is not None:
+            return msg.get('content', ''), answer
+    return None, None
+
+
+def _interview_inputs(data):
+    """
+    job_description, resume_summary, conversation_history and the session for a
+    request: from the server-side session when session_id is given, otherwise
+    from the request body (session is then None). Raises SessionNotFound.
+    """
+    session_id = data.get('session_id')
+    if session_id:
+        session = interview_sessions.get(session_id)
+        return session['job_description'], session['resume_summary'], session['conversation_history'], session
+    return data.get('job_description', ''), data.get('resume_summary', ''), data.get('conversation_history', []), None
+
+
+def _next_question_inputs(data):
+    """
+    Inputs for the next question. With a session_id the request carries only the
+    new answer: it is recorded on the session and the question number follows
+    from the stored conversation.
+    """
+    session_id = data.get('session_id')
+    if not session_id:
+        return (
+            data.get('job_description', ''),
+            data.get('resume_summary', ''),
+            data.get('conversation_history', []),
+            data.get('question_number', 1),
+            data.get('total_questions', 5),
+            data.get('interview_id'),
+            None
+        )
+    if 'answer' in data:
+        session = interview_sessions.record_answer(
+            session_id, data.get('answer') or '(No answer provided)', data.get('question_number')
+        )
+    else:
+        session = interview_sessions.get(session_id)
+    history = session['conversation_history']
+    question_number = sum(1 for msg in history if msg['role'] == 'interviewer') + 1
+    return (
+        session['job_description'],
+        session['resume_summary'],
+        history,
+        question_number,
+        session['total_questions'],
+        session['interview_id'] or session_id,
+        session
+    )
+
+
+def _session_memory(session, conversation_history):
+    """
+    The session's rolling conversation memory, with the newly recorded answer
+    folded in and stored back (None without a session; it is then built from
+    the history in the request)
+    """
+    if session is None:
+        return None
+    stored = session['context'].get('memory')
+    memory = interview_service.memory.update(stored, conversation_history)
+    if memory is not stored:
+        interview_sessions.set_context(session['session_id'], 'memory', memory)
+    return memory
+
+
+def _evaluation_inputs(data):
+    """_interview_inputs, first recording a final answer sent along with a session_id"""
+    if data.get('session_id') and 'answer' in data:
+        interview_sessions.record_answer(data['session_id'], data.get('answer') or '(No answer provided)')
+    return _interview_inputs(data)
+
+
+def _session_not_found():
+    return jsonify({'error': 'Interview session not found or expired; send the full interview context'}), 404
+
 
 @main.route('/interview/start', methods=['POST'])
 def start_interview():
@@ -550,7 +1141,20 @@ def start_interview():
               required: true
             interview_id:
               type: string
-              description: Optional interview ID for tracking
+              description: Optional interview ID for tracking (enables next-question prefetch)
+            job_id:
+              type: string
+              description: Optional job ID from /job; new-topic questions are then drawn from the job's question pool
+            total_questions:
+              type: integer
+              default: 5
+            inline_audio:
+              type: boolean
+              default: false
+              description: Embed base64 MP3 instead of returning audio_url (always on while SECRET_KEY is unset)
+            slo_ms:
+              type: number
+              description: Milliseconds to wait for the LLM before serving a question bank question (defaults to QUESTION_SLO_MS, 0 waits indefinitely)
     responses:
       200:
         description: Initial interview question
@@ -559,16 +1163,28 @@ def start_interview():
           properties:
             success:
               type: boolean
+            session_id:
+              type: string
+              description: Send with later calls instead of the job description, CV and conversation
             question:
               type: string
+            audio_url:
+              type: string
+              description: Streams the question audio (audio/mpeg)
             type:
               type: string
+            fallback:
+              type: boolean
+              description: True when the question came from the local question bank
       400:
         description: Invalid input
     """
     data = request.json
     job_description = data.get('job_description', '')
     resume_summary = data.get('resume_summary', '')
+    interview_id = data.get('interview_id')
+    total_questions = data.get('total_questions', 5)
+    inline_audio = data.get('inline_audio', False) or not _audio_urls_enabled()
     
     if not job_description:
         return jsonify({'error': 'Job description is required'}), 400
@@ -577,13 +1193,30 @@ def start_interview():
     print(f"Job description length: {len(job_description)}")
     print(f"Resume summary length: {len(resume_summary)}")
     
-    result = interview_service.generate_initial_question(job_description, resume_summary)
+    slo = _question_slo(data)
+    if slo is None:
+        result = interview_service.generate_initial_question(job_description, resume_summary)
+    else:
+        # Question 2 is always a follow-up, so a late opening question is not kept
+        result, _ = _question_within_slo(
+            lambda: interview_service.generate_initial_question(job_description, resume_summary),
+            slo,
+            lambda: interview_service.bank_question(job_description, resume_summary, [], 1, total_questions,
+                                                    question_type='opening')
+        )
     
     # Generate audio for the question using TTS
-    if result.get('success') and result.get('question'):
-        audio_result = tts_service.text_to_speech(result['question'])
-        if audio_result:
-            result['audio'] = audio_result
+    audio_future = _submit_tts(result, inline_audio)
+    session = interview_sessions.create(job_description, resume_summary, total_questions, interview_id)
+    interview_sessions.record_question(session['session_id'], result['question'], result.get('focus_area'))
+    result['session_id'] = session['session_id']
+    _attach_audio(result, audio_future)
+    
+    prefetch_key = interview_id or session['session_id']
+    question_prefetcher.discard(prefetch_key)
+    _schedule_interview_plan(session['session_id'], job_description, resume_summary, total_questions,
+                             data.get('job_id'))
+    _schedule_prefetch(prefetch_key, job_description, resume_summary, [], result, total_questions, inline_audio)
     
     return jsonify(result), 200
 
@@ -604,9 +1237,15 @@ def get_next_question():
         schema:
           type: object
           properties:
+            session_id:
+              type: string
+              description: Session from /interview/start; replaces job_description, resume_summary, conversation_history, total_questions and interview_id
+            answer:
+              type: string
+              description: With session_id, the candidate's answer to the previous question
             job_description:
               type: string
-              required: true
+              description: Required without session_id
             resume_summary:
               type: string
             conversation_history:
@@ -620,10 +1259,24 @@ def get_next_question():
                     type: string
             question_number:
               type: integer
-              required: true
+              description: Required without session_id
             total_questions:
               type: integer
               default: 5
+            interview_id:
+              type: string
+              description: Interview ID passed to /interview/start (serves prefetched questions)
+            evaluate_previous:
+              type: boolean
+              default: false
+              description: Also evaluate the last answer in conversation_history, concurrently with question generation
+            inline_audio:
+              type: boolean
+              default: false
+              description: Embed base64 MP3 instead of returning audio_url (always on while SECRET_KEY is unset)
+            slo_ms:
+              type: number
+              description: Milliseconds to wait for the LLM before serving a question bank question (defaults to QUESTION_SLO_MS, 0 waits indefinitely)
     responses:
       200:
         description: Next interview question
@@ -634,56 +1287,333 @@ def get_next_question():
               type: boolean
             question:
               type: string
+            audio_url:
+              type: string
+              description: Streams the question audio (audio/mpeg)
             question_number:
               type: integer
+            fallback:
+              type: boolean
+              description: True when the question came from the local question bank
       400:
         description: Invalid input
     """
     data = request.json
-    job_description = data.get('job_description', '')
-    resume_summary = data.get('resume_summary', '')
-    conversation_history = data.get('conversation_history', [])
-    question_number = data.get('question_number', 1)
-    total_questions = data.get('total_questions', 5)
+    evaluate_previous = data.get('evaluate_previous', False)
+    inline_audio = data.get('inline_audio', False) or not _audio_urls_enabled()
+    try:
+        (job_description, resume_summary, conversation_history, question_number, total_questions,
+         interview_id, session) = _next_question_inputs(data)
+    except SessionNotFound:
+        return _session_not_found()
     
     if not job_description:
         return jsonify({'error': 'Job description is required'}), 400
     
     print(f"\n=== Getting Question {question_number}/{total_questions} ===")
     
-    result = interview_service.generate_followup_question(
-        job_description,
-        resume_summary,
-        conversation_history,
-        question_number,
-        total_questions
-    )
+    # Evaluating the previous answer doesn't depend on the next question, so run it alongside
+    evaluation_future = None
+    if evaluate_previous:
+        previous_question, previous_answer = _last_exchange(conversation_history)
+        if previous_question and previous_answer:
+            evaluation_future = io_executor.submit(
+                interview_service.evaluate_answer,
+                job_description,
+                previous_question,
+                previous_answer,
+                resume_summary
+            )
     
-    # Generate audio for the question using TTS
-    if result.get('success') and result.get('question'):
-        audio_result = tts_service.text_to_speech(result['question'])
-        if audio_result:
-            result['audio'] = audio_result
+    memory = _session_memory(session, conversation_history)
+    interview_plan = _session_plan(session)
+    
+    prefetched, slo = _take_prefetched(interview_id, question_number, _question_slo(data))
+    
+    def generate():
+        return interview_service.generate_followup_question(
+            job_description,
+            resume_summary,
+            conversation_history,
+            question_number,
+            total_questions,
+            prefetched=prefetched,
+            memory=memory,
+            interview_plan=interview_plan
+        )
+    
+    late_kept = False
+    if slo is None:
+        result = generate()
+    else:
+        result, late_future = _question_within_slo(
+            generate, slo, lambda: _bank_question(job_description, resume_summary, conversation_history,
+                                                  question_number, total_questions)
+        )
+        if late_future is not None:
+            late_kept = _keep_late_question(interview_id, late_future, question_number, total_questions)
+    
+    # Generate audio for the question using TTS (overlaps with any pending evaluation)
+    audio_future = _submit_tts(result, inline_audio)
+    if session is not None:
+        interview_sessions.record_question(session['session_id'], result['question'], result.get('focus_area'))
+    if evaluation_future is not None:
+        result['previous_evaluation'] = evaluation_future.result()
+    _attach_audio(result, audio_future)
+    
+    if not late_kept:
+        _schedule_prefetch(interview_id, job_description, resume_summary, conversation_history, result,
+                           total_questions, inline_audio, memory, interview_plan)
     
     return jsonify(result), 200
 
 
-@main.route('/interview/evaluate-answer', methods=['POST'])
-def evaluate_answer():
+def _sse(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@main.route('/interview/next-question/stream', methods=['POST'])
+def stream_next_question():
     """
-    Evaluate a single interview answer
+    Stream the next interview question over Server-Sent Events
     ---
     tags:
       - Interview
     consumes:
       - application/json
+    produces:
+      - text/event-stream
     parameters:
       - in: body
         name: body
         required: true
+        description: Same body as /interview/next-question
         schema:
           type: object
           properties:
+            session_id:
+              type: string
+            answer:
+              type: string
+            job_description:
+              type: string
+            resume_summary:
+              type: string
+            conversation_history:
+              type: array
+              items:
+                type: object
+            question_number:
+              type: integer
+              required: true
+            total_questions:
+              type: integer
+              default: 5
+            interview_id:
+              type: string
+            evaluate_previous:
+              type: boolean
+              default: false
+            inline_audio:
+              type: boolean
+              default: false
+            slo_ms:
+              type: number
+              description: Milliseconds to wait for a complete LLM question before a question bank question is sent instead
+    responses:
+      200:
+        description: |
+          Event stream. `question_delta` ({text}) carries question text as it is generated
+          (provisional); `question` ({question, question_number, audio_url}) is sent as soon
+          as the question is complete, so audio playback can start while the rest of the
+          completion streams; `audio` ({audio}) follows when inline_audio is set;
+          `done` carries the same object /interview/next-question returns.
+      400:
+        description: Invalid input
+    """
+    data = request.json
+    evaluate_previous = data.get('evaluate_previous', False)
+    inline_audio = data.get('inline_audio', False) or not _audio_urls_enabled()
+    try:
+        (job_description, resume_summary, conversation_history, question_number, total_questions,
+         interview_id, session) = _next_question_inputs(data)
+    except SessionNotFound:
+        return _session_not_found()
+    
+    if not job_description:
+        return jsonify({'error': 'Job description is required'}), 400
+    
+    evaluation_future = None
+    if evaluate_previous:
+        previous_question, previous_answer = _last_exchange(conversation_history)
+        if previous_question and previous_answer:
+            evaluation_future = io_executor.submit(
+                interview_service.evaluate_answer,
+                job_description,
+                previous_question,
+                previous_answer,
+                resume_summary
+            )
+    
+    memory = _session_memory(session, conversation_history)
+    interview_plan = _session_plan(session)
+    
+    prefetched, slo = _take_prefetched(interview_id, question_number, _question_slo(data))
+    
+    def question_steps():
+        if prefetched:
+            yield 'result', interview_service.generate_followup_question(
+                job_description, resume_summary, conversation_history,
+                question_number, total_questions, prefetched=prefetched, memory=memory,
+                interview_plan=interview_plan
+            )
+        else:
+            yield from interview_service.stream_next_question(
+                job_description, resume_summary, conversation_history, question_number, total_questions, memory,
+                interview_plan=interview_plan
+            )
+    
+    late = {'kept': False}
+    
+    def keep_late(late_future):
+        late['kept'] = _keep_late_question(interview_id, late_future, question_number, total_questions)
+    
+    def events():
+        steps = _stream_within_slo(
+            question_steps(),
+            slo,
+            lambda: _bank_question(job_description, resume_summary, conversation_history,
+                                   question_number, total_questions),
+            keep_late
+        )
+        
+        announced = None
+        audio = {'success': True}
+        audio_future = None
+        result = None
+        for kind, payload in steps:
+            if kind == 'question_delta':
+                yield _sse('question_delta', {'text': payload})
+            elif kind == 'question':
+                # Start TTS on the finished question while focus_area is still streaming
+                announced = payload
+                audio = {'success': True, 'question': payload}
+                audio_future = _submit_tts(audio, inline_audio)
+                yield _sse('question', {
+                    'question': payload,
+                    'question_number': question_number,
+                    'audio_url': audio.get('audio_url')
+                })
+            else:
+                result = payload
+        
+        if result['question'] != announced:
+            # Fallback question, or the final parse differs from the streamed text
+            audio = {**result}
+            audio_future = _submit_tts(audio, inline_audio)
+            yield _sse('question', {
+                'question': result['question'],
+                'question_number': question_number,
+                'audio_url': audio.get('audio_url')
+            })
+        if audio.get('audio_url'):
+            result['audio_url'] = audio['audio_url']
+        if inline_audio:
+            if audio.get('audio'):
+                result['audio'] = audio['audio']
+            _attach_audio(result, audio_future)
+            if result.get('audio'):
+                yield _sse('audio', {'audio': result['audio']})
+        else:
+            result.pop('audio', None)
+        
+        if evaluation_future is not None:
+            result['previous_evaluation'] = evaluation_future.result()
+        
+        if session is not None:
+            interview_sessions.record_question(session['session_id'], result['question'], result.get('focus_area'))
+        if not late['kept']:
+            _schedule_prefetch(interview_id, job_description, resume_summary, conversation_history, result,
+                               total_questions, inline_audio, memory, interview_plan)
+        yield _sse('done', result)
+    
+    return Response(
+        stream_with_context(request_deadline.carry(events())),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@main.route('/interview/prefetch/status', methods=['GET'])
+def prefetch_status():
+    """
+    Next-question prefetch counters
+    ---
+    tags:
+      - Interview
+    responses:
+      200:
+        description: Scheduled, served, waited, missed, stale and failed prefetches
+    """
+    return jsonify({'enabled': PREFETCH_ENABLED, **question_prefetcher.stats()}), 200
+
+
+@main.route('/llm/health', methods=['GET'])
+def llm_health():
+    """
+    Per-model circuit state, error rate and latency
+    ---
+    tags:
+      - Interview
+    responses:
+      200:
+        description: Models in current routing order with their health, client counters, prompt token use per call site and question bank usage
+    """
+    return jsonify({
+        'routing_order': interview_service.llm.health.order_preview(interview_service.models_to_try),
+        'models': interview_service.llm.health.snapshot(),
+        'client': interview_service.llm.stats(),
+        'prompts': interview_service.prompts.stats(),
+        'memory': interview_service.memory.stats(),
+        'question_bank': interview_service.question_bank.stats(),
+        'job_question_pool': job_question_pools.stats()
+    }), 200
+
+
+@main.route('/metrics/llm', methods=['GET'])
+def llm_metrics():
+    """
+    Per-call-site and per-model LLM telemetry
+    ---
+    tags:
+      - Interview
+    responses:
+      200:
+        description: Calls, latency percentiles, queue wait, prompt/completion tokens, cost, outcomes and fallback depth, with the most expensive call sites first
+    """
+    return jsonify(llm_telemetry.snapshot()), 200
+
+
+@main.route('/interview/evaluate-answer', methods=['POST'])
+def evaluate_answer():
+    """
+    Evaluate a single interview answer
+    ---
+    tags:
+      - Interview
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            session_id:
+              type: string
+              description: Session from /interview/start; question and answer default to its last exchange
             job_description:
               type: string
               required: true
@@ -711,10 +1641,13 @@ def evaluate_answer():
         description: Invalid input
     """
     data = request.json
-    job_description = data.get('job_description', '')
-    question = data.get('question', '')
-    answer = data.get('answer', '')
-    resume_summary = data.get('resume_summary', '')
+    try:
+        job_description, resume_summary, conversation_history, session = _interview_inputs(data)
+    except SessionNotFound:
+        return _session_not_found()
+    question, answer = _last_exchange(conversation_history) if session else (None, None)
+    question = data.get('question') or question
+    answer = data.get('answer') or answer
     
     if not question or not answer:
         return jsonify({'error': 'Question and answer are required'}), 400
@@ -749,9 +1682,14 @@ def evaluate_full_interview():
         schema:
           type: object
           properties:
+            session_id:
+              type: string
+              description: Session from /interview/start; replaces job_description, resume_summary and conversation_history
+            answer:
+              type: string
+              description: With session_id, the candidate's final answer if not sent to next-question
             job_description:
               type: string
-              required: true
             resume_summary:
               type: string
             conversation_history:
@@ -780,9 +1718,10 @@ def evaluate_full_interview():
         description: Invalid input
     """
     data = request.json
-    job_description = data.get('job_description', '')
-    resume_summary = data.get('resume_summary', '')
-    conversation_history = data.get('conversation_history', [])
+    try:
+        job_description, resume_summary, conversation_history, session = _evaluation_inputs(data)
+    except SessionNotFound:
+        return _session_not_found()
     answer_scores = data.get('answer_scores', [])
     
     if not job_description:
@@ -796,12 +1735,317 @@ def evaluate_full_interview():
         job_description,
         resume_summary,
         conversation_history,
-        answer_scores
+        answer_scores,
+        memory=_session_memory(session, conversation_history)
+    )
+    
+    return jsonify(result), 200
+
+
+@main.route('/interview/evaluate-batch', methods=['POST'])
+def evaluate_interview_batch():
+    """
+    Score every answer and the whole interview in a single LLM call
+    Replaces one /interview/evaluate-answer call per question plus /interview/evaluate.
+    Long transcripts are split into as few calls as fit the prompt budget.
+    ---
+    tags:
+      - Interview
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            session_id:
+              type: string
+              description: Session from /interview/start; replaces job_description, resume_summary and conversation_history
+            answer:
+              type: string
+              description: With session_id, the candidate's final answer if not sent to next-question
+            job_description:
+              type: string
+            resume_summary:
+              type: string
+            conversation_history:
+              type: array
+              items:
+                type: object
+    responses:
+      200:
+        description: Per-answer scores and full interview evaluation
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+            overall_score:
+              type: integer
+            recommendation:
+              type: string
+            summary:
+              type: string
+            answer_scores:
+              type: array
+              items:
+                type: object
+                properties:
+                  question:
+                    type: string
+                  answer:
+                    type: string
+                  score:
+                    type: integer
+                  feedback:
+                    type: string
+            llm_calls:
+              type: integer
+      400:
+        description: Invalid input, or no answered questions to evaluate
+    """
+    data = request.json
+    try:
+        job_description, resume_summary, conversation_history, _ = _evaluation_inputs(data)
+    except SessionNotFound:
+        return _session_not_found()
+    
+    if not job_description:
+        return jsonify({'error': 'Job description is required'}), 400
+    if _last_exchange(conversation_history)[0] is None:
+        return jsonify({'error': 'conversation_history has no answered questions to evaluate'}), 400
+    
+    print(f"\n=== Batch Evaluating Interview ===")
+    print(f"Total exchanges: {len(conversation_history)}")
+    
+    result = interview_service.evaluate_interview_batch(
+        job_description,
+        resume_summary,
+        conversation_history
     )
     
     return jsonify(result), 200
 
 
+def _interview_results_payload(interview_token):
+    """Map a batched evaluation onto the body Django's interview-results endpoint expects"""
+    def build(result):
+        recommendation = result.get('recommendation')
+        return {
+            'interview_token': interview_token,
+            'overall_score': result.get('overall_score'),
+            'recommendation': recommendation if recommendation in ('recommend', 'consider', 'not_recommend') else 'consider',
+            # Django rejects a blank summary
+            'summary': result.get('summary') or 'Interview completed.',
+            'strengths': result.get('strengths', []),
+            'areas_for_improvement': result.get('areas_for_improvement', []),
+            'cv_verification': result.get('cv_verification', ''),
+            'job_fit': result.get('job_fit', ''),
+            'questions_and_answers': [
+                {key: item.get(key) for key in ('question', 'answer', 'score', 'feedback')}
+                for item in result.get('answer_scores', [])
+            ]
+        }
+    return build
+
+
+def _submit_evaluation_job(kind, fn, *args, webhook_payload=None):
+    try:
+        job = evaluation_jobs.submit(kind, fn, *args, webhook_payload=webhook_payload)
+    except QueueFullError as e:
+        print(f"⚠ Rejecting evaluation job: {e}")
+        response = jsonify({'error': 'Evaluation queue is full, retry shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+    job['poll_url'] = url_for('main.get_evaluation_job', job_id=job['job_id'])
+    return jsonify(job), 202
+
+
+@main.route('/interview/jobs/evaluate-answer', methods=['POST'])
+def submit_answer_evaluation_job():
+    """
+    Queue evaluation of a single answer and return a job ID immediately
+    Poll the returned poll_url for the same result /interview/evaluate-answer returns.
+    ---
+    tags:
+      - Interview
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            session_id:
+              type: string
+              description: Session from /interview/start; question and answer default to its last exchange
+            job_description:
+              type: string
+            question:
+              type: string
+              required: true
+            answer:
+              type: string
+              required: true
+            resume_summary:
+              type: string
+    responses:
+      202:
+        description: Job accepted
+        schema:
+          type: object
+          properties:
+            job_id:
+              type: string
+            status:
+              type: string
+            poll_url:
+              type: string
+      400:
+        description: Invalid input
+      429:
+        description: Evaluation queue is full
+    """
+    data = request.json
+    try:
+        job_description, resume_summary, conversation_history, session = _interview_inputs(data)
+    except SessionNotFound:
+        return _session_not_found()
+    question, answer = _last_exchange(conversation_history) if session else (None, None)
+    question = data.get('question') or question
+    answer = data.get('answer') or answer
+    
+    if not question or not answer:
+        return jsonify({'error': 'Question and answer are required'}), 400
+    
+    return _submit_evaluation_job(
+        'answer',
+        interview_service.evaluate_answer,
+        job_description,
+        question,
+        answer,
+        resume_summary
+    )
+
+
+@main.route('/interview/jobs/evaluate-interview', methods=['POST'])
+def submit_interview_evaluation_job():
+    """
+    Queue a batched evaluation of the whole interview and return a job ID immediately
+    With an interview_token and EVAL_RESULTS_WEBHOOK_URL configured, the finished
+    evaluation is also posted to Django's interview-results endpoint.
+    ---
+    tags:
+      - Interview
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            session_id:
+              type: string
+              description: Session from /interview/start; replaces job_description, resume_summary and conversation_history
+            answer:
+              type: string
+              description: With session_id, the candidate's final answer if not sent to next-question
+            job_description:
+              type: string
+            resume_summary:
+              type: string
+            conversation_history:
+              type: array
+              items:
+                type: object
+            interview_token:
+              type: string
+              description: Interview link token; enables webhook delivery to Django
+    responses:
+      202:
+        description: Job accepted
+        schema:
+          type: object
+          properties:
+            job_id:
+              type: string
+            status:
+              type: string
+            poll_url:
+              type: string
+            webhook:
+              type: object
+      400:
+        description: Invalid input, or no answered questions to evaluate
+      429:
+        description: Evaluation queue is full
+    """
+    data = request.json
+    interview_token = data.get('interview_token')
+    try:
+        job_description, resume_summary, conversation_history, _ = _evaluation_inputs(data)
+    except SessionNotFound:
+        return _session_not_found()
+    
+    if not job_description:
+        return jsonify({'error': 'Job description is required'}), 400
+    if _last_exchange(conversation_history)[0] is None:
+        return jsonify({'error': 'conversation_history has no answered questions to evaluate'}), 400
+    
+    return _submit_evaluation_job(
+        'interview',
+        interview_service.evaluate_interview_batch,
+        job_description,
+        resume_summary,
+        conversation_history,
+        webhook_payload=_interview_results_payload(interview_token) if interview_token else None
+    )
+
+
+@main.route('/interview/jobs', methods=['GET'])
+def evaluation_jobs_stats():
+    """
+    Evaluation job queue statistics
+    ---
+    tags:
+      - Interview
+    responses:
+      200:
+        description: Worker pool size, pending jobs and webhook delivery counts
+    """
+    return jsonify(evaluation_jobs.stats()), 200
+
+
+@main.route('/interview/jobs/<job_id>', methods=['GET'])
+def get_evaluation_job(job_id):
+    """
+    Poll an evaluation job
+    ---
+    tags:
+      - Interview
+    parameters:
+      - in: path
+        name: job_id
+        type: string
+        required: true
+    responses:
+      200:
+        description: Job status (queued, running, completed, failed); completed jobs include result
+      404:
+        description: Unknown or expired job
+    """
+    job = evaluation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job), 200
+
+
 @main.route('/tts/convert', methods=['POST'])
 def text_to_speech():
     """
@@ -883,14 +2127,97 @@ def tts_status():
               type: string
             model_id:
               type: string
+            cache:
+              type: object
+              description: Audio cache entries, bytes, hits, misses and hit rate
     """
     return jsonify({
         'available': tts_service.is_available(),
         'voice_id': tts_service.voice_id,
-        'model_id': tts_service.model_id
+        'model_id': tts_service.model_id,
+        'cache': tts_service.cache_stats()
     }), 200
 
 
+def _stream_audio(text):
+    """Relay TTS audio chunks to the client as they arrive (chunked audio/mpeg)"""
+    if not tts_service.is_available():
+        return jsonify({'error': 'TTS service is not available. Check ELEVENLABS_API_KEY.'}), 400
+    
+    chunks = tts_service.stream_speech(text)
+    if chunks is None:
+        return jsonify({'success': False, 'error': 'TTS conversion failed'}), 502
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype='audio/mpeg',
+        headers={'Cache-Control': f'private, max-age={TTS_AUDIO_URL_MAX_AGE}'}
+    )
+
+
+@main.route('/tts/stream/<token>', methods=['GET'])
+def tts_stream(token):
+    """
+    Stream the audio behind a signed audio_url from an interview response
+    ---
+    tags:
+      - Text-to-Speech
+    produces:
+      - audio/mpeg
+    parameters:
+      - in: path
+        name: token
+        type: string
+        required: true
+    responses:
+      200:
+        description: MP3 audio, streamed with chunked transfer encoding
+      404:
+        description: Invalid or expired audio link (or signed audio URLs are disabled)
+    """
+    if not _audio_urls_enabled():
+        return jsonify({'error': 'Invalid or expired audio link'}), 404
+    try:
+        text = _audio_serializer().loads(token, max_age=TTS_AUDIO_URL_MAX_AGE)
+    except BadSignature:
+        return jsonify({'error': 'Invalid or expired audio link'}), 404
+    return _stream_audio(text)
+
+
+@main.route('/tts/stream', methods=['POST'])
+def tts_stream_text():
+    """
+    Convert text to speech and stream the MP3 back as it is generated
+    ---
+    tags:
+      - Text-to-Speech
+    consumes:
+      - application/json
+    produces:
+      - audio/mpeg
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            text:
+              type: string
+              required: true
+    responses:
+      200:
+        description: MP3 audio, streamed with chunked transfer encoding
+      400:
+        description: Invalid input or TTS unavailable
+    """
+    data = request.json or {}
+    text = data.get('text', '')
+    if not text:
+        return jsonify({'error': 'Text is required'}), 400
+    return _stream_audio(text)
+
+
 @main.route('/stt/transcribe', methods=['POST'])
 def speech_to_text():
     """
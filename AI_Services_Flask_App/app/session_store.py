@@ -0,0 +1,208 @@
+"""
+Server-side interview sessions
+/interview/start creates a session holding the job description, CV and the
+conversation so far; later calls send only the session ID and the new answer.
+Sessions are cached in an in-process LRU and written through to SQLite, so they
+survive worker restarts and are visible to every gunicorn worker on the host.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+from typing import Dict, Any, Callable, Optional
+from .sqlite_store import SQLiteStore, RowCache
+
+
+class SessionNotFound(Exception):
+    """Raised when a session ID is unknown or its session has expired"""
+
+
+class InterviewSessionStore:
+    """LRU of interview sessions backed by a SQLite table (one JSON row per session)"""
+
+    def __init__(self, path: str, max_memory: int = 500, ttl: float = 24 * 3600):
+        """
+        Args:
+            path: SQLite database file
+            max_memory: Sessions kept in the in-process LRU
+            ttl: Seconds since its last update after which a session expires
+        """
+        self.path = path
+        self.max_memory = max(1, max_memory)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._memory = RowCache(self.max_memory)
+        self._stats = {'created': 0, 'memory_hits': 0, 'db_loads': 0, 'misses': 0, 'expired': 0}
+        self._store = SQLiteStore(path, schema=(
+            "CREATE TABLE IF NOT EXISTS interview_sessions ("
+            "session_id TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+            "updated_at REAL NOT NULL, data TEXT NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS idx_sessions_updated ON interview_sessions (updated_at)"
+        ))
+
+    def _remember(self, session: Dict[str, Any]):
+        self._memory.put(session['session_id'], session['version'], session)
+
+    def _load(self, session_id: str) -> Dict[str, Any]:
+        """
+        Current session from memory, reloaded from SQLite when another worker has
+        written a newer version (caller holds the lock)
+        """
+        row = self._store.connection().execute(
+            "SELECT version, updated_at, data FROM interview_sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            self._memory.discard(session_id)
+            self._stats['misses'] += 1
+            raise SessionNotFound(session_id)
+        version, updated_at, data = row
+        if time.time() - updated_at > self.ttl:
+            self._delete(session_id)
+            self._stats['expired'] += 1
+            raise SessionNotFound(session_id)
+        cached = self._memory.get(session_id, version)
+        if cached is not None:
+            self._stats['memory_hits'] += 1
+            return cached
+        session = json.loads(data)
+        self._remember(session)
+        self._stats['db_loads'] += 1
+        return session
+
+    def _write(self, session: Dict[str, Any], expected_version: Optional[int]) -> bool:
+        conn = self._store.connection()
+        with conn:
+            if expected_version is None:
+                conn.execute(
+                    "INSERT INTO interview_sessions (session_id, version, updated_at, data) VALUES (?, ?, ?, ?)",
+                    (session['session_id'], session['version'], session['updated_at'], json.dumps(session))
+                )
+                return True
+            cursor = conn.execute(
+                "UPDATE interview_sessions SET version = ?, updated_at = ?, data = ? "
+                "WHERE session_id = ? AND version = ?",
+                (session['version'], session['updated_at'], json.dumps(session), session['session_id'], expected_version)
+            )
+            return cursor.rowcount == 1
+
+    def _delete(self, session_id: str):
+        self._memory.discard(session_id)
+        with self._store.connection() as conn:
+            conn.execute("DELETE FROM interview_sessions WHERE session_id = ?", (session_id,))
+
+    def create(
+        self,
+        job_description: str,
+        resume_summary: str,
+        total_questions: int,
+        interview_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        now = time.time()
+        session = {
+            'session_id': uuid.uuid4().hex,
+            'interview_id': interview_id,
+            'job_description': job_description,
+            'resume_summary': resume_summary,
+            'total_questions': total_questions,
+            'conversation_history': [],
+            # Per-session cache for derived prompt context (plans, summaries)
+            'context': {},
+            'version': 1,
+            'created_at': now,
+            'updated_at': now
+        }
+        with self._lock:
+            self._write(session, None)
+            self._remember(session)
+            self._stats['created'] += 1
+            # Expired rows are cleared lazily as sessions are created
+            with self._store.connection() as conn:
+                conn.execute("DELETE FROM interview_sessions WHERE updated_at < ?", (now - self.ttl,))
+        return self._copy(session)
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        """Snapshot of a session; raises SessionNotFound"""
+        with self._lock:
+            return self._copy(self._load(session_id))
+
+    def update(self, session_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """
+        Apply mutate to a copy of the session and persist it. A concurrent write
+        from another worker makes the conditional UPDATE miss; the session is then
+        reloaded and mutate re-applied.
+        """
+        with self._lock:
+            for _ in range(3):
+                current = self._load(session_id)
+                session = self._copy(current)
+                mutate(session)
+                session['version'] = current['version'] + 1
+                session['updated_at'] = time.time()
+                if self._write(session, current['version']):
+                    self._remember(session)
+                    return self._copy(session)
+                self._memory.discard(session_id)
+        raise RuntimeError(f"Session {session_id} is being updated concurrently")
+
+    def record_answer(self, session_id: str, answer: str, next_question_number: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Append the candidate's answer to the last question. Retried requests are
+        idempotent: a repeated answer replaces the previous one, and with
+        next_question_number anything recorded from that question on (a response
+        the client never received) is dropped first.
+        """
+        def mutate(session):
+            history = session['conversation_history']
+            if next_question_number:
+                asked = 0
+                for index, msg in enumerate(history):
+                    if msg['role'] == 'interviewer':
+                        asked += 1
+                        if asked == next_question_number:
+                            del history[index:]
+                            break
+            if history and history[-1]['role'] == 'candidate':
+                history[-1]['content'] = answer
+            else:
+                history.append({'role': 'candidate', 'content': answer})
+        return self.update(session_id, mutate)
+
+    def record_question(self, session_id: str, question: str, focus_area: Optional[str] = None) -> Dict[str, Any]:
+        def mutate(session):
+            message = {'role': 'interviewer', 'content': question}
+            if focus_area:
+                message['focus_area'] = focus_area
+            session['conversation_history'].append(message)
+        return self.update(session_id, mutate)
+
+    def set_context(self, session_id: str, key: str, value: Any) -> Dict[str, Any]:
+        def mutate(session):
+            session['context'][key] = value
+        return self.update(session_id, mutate)
+
+    def _copy(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        copy = dict(session)
+        copy['conversation_history'] = [dict(msg) for msg in session['conversation_history']]
+        copy['context'] = dict(session['context'])
+        return copy
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = self._store.connection().execute("SELECT COUNT(*) FROM interview_sessions").fetchone()[0]
+            return {
+                'in_memory': len(self._memory),
+                'max_memory': self.max_memory,
+                'stored': stored,
+                'ttl_seconds': self.ttl,
+                **self._stats
+            }
+
+
+interview_sessions = InterviewSessionStore(
+    path=os.getenv('INTERVIEW_SESSION_DB') or os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), 'interview_sessions.sqlite3'
+    ),
+    max_memory=int(os.getenv('INTERVIEW_SESSION_MEMORY', '500')),
+    ttl=float(os.getenv('INTERVIEW_SESSION_TTL_SECONDS', str(24 * 3600)))
+)
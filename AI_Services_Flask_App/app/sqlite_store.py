@@ -0,0 +1,76 @@
+"""
+Host-shared SQLite storage
+State that every gunicorn worker on the host must see (interview sessions,
+evaluation jobs, job question pools, and anything else too small to warrant a
+server) lives in one SQLite file per store. Each thread keeps its own
+connection; WAL mode lets other workers read while one writes. Stores that
+serve hot rows from memory keep them in a RowCache checked against the row's
+version.
+"""
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+
+class SQLiteStore:
+    """One SQLite database file with a connection per thread"""
+
+    def __init__(self, path: str, schema: Iterable[str] = ()):
+        """
+        Args:
+            path: SQLite database file (its directory is created if missing)
+            schema: Statements run once at startup (CREATE TABLE/INDEX IF NOT EXISTS ...)
+        """
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self.connection() as conn:
+            for statement in schema:
+                conn.execute(statement)
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (use `with conn:` for a transaction)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class RowCache:
+    """
+    In-process LRU of decoded rows. Each entry keeps the version of the row it
+    was decoded from, and a lookup with another version (the row was rewritten
+    by a different worker since) is a miss. Not locked: the owning store
+    serializes access under its own lock.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        """The cached row if it was decoded from this version, else None"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, version: Any, value: Any):
+        """Keep a decoded row, evicting the least recently used past max_size"""
+        self._entries.pop(key, None)
+        self._entries[key] = (version, value)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -9,6 +9,8 @@ from typing import Optional, Dict, Any
 import requests
 from dotenv import load_dotenv
 
+from . import deadline as request_deadline
+
 
 load_dotenv()
 
@@ -20,8 +22,10 @@ class STTService:
         self.api_key = os.getenv("ELEVENLABS_STT_API_KEY") or os.getenv("ELEVENLABS_API_KEY", "")
         self.model_id = os.getenv("ELEVENLABS_STT_MODEL_ID", "scribe_v1")
         self.language_code = os.getenv("ELEVENLABS_STT_LANGUAGE", "en")
-        self.base_url = "https://api.elevenlabs.io/v1/speech-to-text"
+        self.base_url = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io/v1").rstrip("/") + "/speech-to-text"
         self.timeout = 45
+        # Shortest time left before the request deadline worth starting a transcription with
+        self.min_request_time = float(os.getenv("STT_MIN_REQUEST_MS", "1000")) / 1000
 
     def is_available(self) -> bool:
         """Check whether STT can be called."""
@@ -59,7 +63,7 @@ class STTService:
                 headers=headers,
                 data=data,
                 files=files,
-                timeout=self.timeout,
+                timeout=request_deadline.timeout_for(self.timeout, self.min_request_time, "speech-to-text"),
             )
 
             if response.status_code >= 400:
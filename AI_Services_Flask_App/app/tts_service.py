@@ -4,9 +4,16 @@ Converts interview questions to speech audio
 """
 import os
 import base64
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, Iterable
 import requests
 from dotenv import load_dotenv
+from .file_cache import FileCache
+from . import deadline as request_deadline
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no cross-worker lock
+    fcntl = None
 
 # Load environment variables
 load_dotenv()
@@ -19,8 +26,51 @@ class TTSService:
         self.api_key = os.getenv('ELEVENLABS_API_KEY', '')
         self.voice_id = os.getenv('ELEVENLABS_VOICE_ID', 'JBFqnCBsd6RMkjVDRZzb')  # George voice
         self.model_id = os.getenv('ELEVENLABS_MODEL_ID', 'eleven_multilingual_v2')
+        self.base_url = os.getenv('ELEVENLABS_BASE_URL', 'https://api.elevenlabs.io/v1').rstrip('/')
         self.output_format = 'mp3_44100_128'
         self.timeout = 45
+        # Shortest time left before the request deadline worth starting a synthesis with
+        self.min_request_time = float(os.getenv('TTS_MIN_REQUEST_MS', '500')) / 1000
+        self.stream_chunk_size = 4096
+        self.cache = None
+        if os.getenv('TTS_CACHE_ENABLED', 'True') == 'True':
+            default_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tts_cache')
+            try:
+                self.cache = FileCache(
+                    os.getenv('TTS_CACHE_DIR') or default_dir,
+                    max_bytes=int(float(os.getenv('TTS_CACHE_MAX_MB', '256')) * 1024 * 1024)
+                )
+            except OSError as e:
+                print(f"⚠ TTS audio cache disabled: {e}")
+    
+    def _cache_key(self, text: str) -> str:
+        return FileCache.make_key(text, self.voice_id, self.model_id, self.output_format)
+    
+    def _audio_result(self, audio_bytes: bytes) -> Dict[str, Any]:
+        return {
+            'audio_base64': base64.b64encode(audio_bytes).decode('utf-8'),
+            'format': 'mp3',
+            'voice_id': self.voice_id,
+            'model_id': self.model_id
+        }
+    
+    def _post_tts(self, text: str, stream: bool = False) -> requests.Response:
+        """POST the text to ElevenLabs; the /stream endpoint relays audio as it is generated"""
+        url = f"{self.base_url}/text-to-speech/{self.voice_id}"
+        if stream:
+            url += "/stream"
+        headers = {
+            'xi-api-key': self.api_key,
+            'Content-Type': 'application/json',
+            'Accept': 'audio/mpeg',
+        }
+        payload = {
+            'text': text,
+            'model_id': self.model_id,
+            'output_format': self.output_format,
+        }
+        timeout = request_deadline.timeout_for(self.timeout, self.min_request_time, 'text-to-speech')
+        return requests.post(url, headers=headers, json=payload, timeout=timeout, stream=stream)
     
     def text_to_speech(self, text: str) -> Optional[Dict[str, Any]]:
         """
@@ -41,22 +91,16 @@ class TTSService:
             print("WARN: Empty text provided for TTS")
             return None
         
+        cache_key = self._cache_key(text) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached:
+                return {**self._audio_result(cached), 'cached': True}
+        
         try:
             print(f"Converting text to speech ({len(text)} chars)...")
 
-            url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}"
-            headers = {
-                'xi-api-key': self.api_key,
-                'Content-Type': 'application/json',
-                'Accept': 'audio/mpeg',
-            }
-            payload = {
-                'text': text,
-                'model_id': self.model_id,
-                'output_format': self.output_format,
-            }
-
-            response = requests.post(url, headers=headers, json=payload, timeout=self.timeout)
+            response = self._post_tts(text)
             if response.status_code >= 400:
                 print(f"ERROR: TTS API error {response.status_code}: {response.text}")
                 return None
@@ -66,21 +110,108 @@ class TTSService:
                 print("ERROR: TTS API returned empty audio")
                 return None
             
-            # Encode to base64
-            audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-            
             print(f" TTS conversion successful ({len(audio_bytes)} bytes)")
             
-            return {
-                'audio_base64': audio_base64,
-                'format': 'mp3',
-                'voice_id': self.voice_id,
-                'model_id': self.model_id
-            }
-            
         except Exception as e:
             print(f"ERROR: TTS conversion failed: {e}")
             return None
+        
+        if cache_key:
+            try:
+                self.cache.put(cache_key, audio_bytes)
+            except OSError as e:
+                print(f"⚠ Could not cache TTS audio: {e}")
+        
+        return self._audio_result(audio_bytes)
+    
+    def stream_speech(self, text: str) -> Optional[Iterator[bytes]]:
+        """
+        Convert text to speech and relay MP3 chunks as they arrive from ElevenLabs
+        
+        Args:
+            text: The text to convert to speech
+            
+        Returns:
+            Iterator of raw MP3 byte chunks on success, None if the request failed
+            before any audio was produced
+        """
+        if not self.api_key:
+            print("WARN: ELEVENLABS_API_KEY not set - TTS disabled")
+            return None
+        
+        if not text or not text.strip():
+            print("WARN: Empty text provided for TTS")
+            return None
+        
+        cache_key = self._cache_key(text) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached:
+                size = self.stream_chunk_size
+                return (cached[i:i + size] for i in range(0, len(cached), size))
+        
+        try:
+            print(f"Streaming text to speech ({len(text)} chars)...")
+            response = self._post_tts(text, stream=True)
+            if response.status_code >= 400:
+                print(f"ERROR: TTS API error {response.status_code}: {response.text}")
+                response.close()
+                return None
+        except Exception as e:
+            print(f"ERROR: TTS streaming failed: {e}")
+            return None
+        
+        def relay():
+            # Only a stream that ran to completion is cached; a client that
+            # disconnects mid-way leaves a truncated buffer behind
+            buffer = bytearray() if cache_key else None
+            try:
+                for chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+                    if chunk:
+                        if buffer is not None:
+                            buffer.extend(chunk)
+                        yield chunk
+                print(" TTS stream complete")
+            finally:
+                response.close()
+            if buffer:
+                try:
+                    self.cache.put(cache_key, bytes(buffer))
+                except OSError as e:
+                    print(f"⚠ Could not cache TTS audio: {e}")
+        
+        return relay()
+    
+    def prerender(self, texts: Iterable[str]) -> int:
+        """
+        Synthesize texts that are not cached yet (e.g. static fallback questions).
+        Workers booting together share the cache directory, so renders are
+        serialized by a file lock there: a worker that waited finds the clips
+        already cached instead of paying for them again.
+        
+        Returns:
+            Number of texts newly rendered
+        """
+        if not self.cache or not self.is_available():
+            return 0
+        lock_file = open(os.path.join(self.cache.directory, '.prerender.lock'), 'w')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            rendered = 0
+            for text in texts:
+                if not text or self.cache.contains(self._cache_key(text)):
+                    continue
+                if self.text_to_speech(text):
+                    rendered += 1
+        finally:
+            # Closing the file releases the lock
+            lock_file.close()
+        print(f"✓ Pre-rendered {rendered} TTS audio clips")
+        return rendered
+    
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        return self.cache.stats() if self.cache else None
     
     def is_available(self) -> bool:
         """Check if TTS service is available"""
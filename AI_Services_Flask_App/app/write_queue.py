@@ -0,0 +1,516 @@
+"""
+Write-behind queue for ChromaDB writes
+Writes are acknowledged once they are appended (and fsynced) to a local log,
+then flushed to ChromaDB in batches by a background worker. Each gunicorn
+worker appends to its own log slot; a SQLite index shared by every worker on
+the host holds the latest write per ID, so a read served by any worker sees a
+write that another worker has acknowledged but not flushed yet.
+"""
+import os
+import glob
+import json
+import time
+import atexit
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
+from .sqlite_store import SQLiteStore
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, single log
+    fcntl = None
+
+
+class WriteBehindQueue:
+    """Durable append-only log + background batch flusher for ChromaDB writes"""
+
+    def __init__(
+        self,
+        log_path: str,
+        flush_fn: Callable[[str, List[str], List[str], List[Dict[str, Any]]], None],
+        batch_size: int = 64,
+        flush_interval: float = 0.5,
+        max_retry_delay: float = 30.0,
+        max_attempts: int = 5,
+        compact_min_records: int = 1000,
+        index_path: Optional[str] = None,
+        index_retention: float = 7 * 24 * 3600
+    ):
+        """
+        Args:
+            log_path: Base path of the append-only log; each process claims its
+                own numbered slot next to it (write_behind.0.log, write_behind.1.log, ...)
+            flush_fn: Called as flush_fn(collection_name, ids, documents, metadatas)
+            batch_size: Maximum number of records written to ChromaDB per call
+            flush_interval: Seconds the worker waits for more writes before flushing
+            max_retry_delay: Upper bound for the backoff after a failed flush
+            max_attempts: Failed batch attempts before records are retried one by one
+                and dead-lettered to the failed log
+            compact_min_records: Log lines after which the log is rewritten with only
+                the still-pending records (once at least half of its lines are flushed)
+            index_path: SQLite index of the latest write per ID, shared by every
+                process (default: next to the log)
+            index_retention: Seconds a flushed ID stays in the index, so a replayed
+                log can never overwrite a later write with an older one
+        """
+        self.base_log_path = log_path
+        self.log_path = log_path
+        self.failed_log_path = f"{log_path}.failed"
+        self.index_path = index_path or f"{os.path.splitext(log_path)[0]}.index.sqlite3"
+        self.flush_fn = flush_fn
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max(1, max_attempts)
+        self.compact_min_records = max(1, compact_min_records)
+        self.index_retention = index_retention
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._pending: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._index = None
+        self._log_file = None
+        self._slot_lock_file = None
+        self._worker = None
+        self._seq = 0
+        # Records in the log file, flushed or not (the log only ever grows between compactions)
+        self._log_records = 0
+        self._stats = {
+            'enqueued': 0,
+            'flushed': 0,
+            'batches': 0,
+            'failed': 0,
+            'replayed': 0,
+            'adopted': 0,
+            'superseded': 0,
+            'discarded': 0,
+            'compactions': 0
+        }
+
+    def start(self):
+        """
+        Replay any unflushed log entries (this process's slot and every slot no
+        running process holds) and start the background worker
+        """
+        with self._lock:
+            if self._worker is not None:
+                return
+            os.makedirs(os.path.dirname(self.base_log_path), exist_ok=True)
+            self.log_path = self._claim_log_slot()
+            self._replay_log()
+            self._log_file = open(self.log_path, 'a', encoding='utf-8')
+            self._adopt_orphan_logs()
+            self._drop_superseded()
+            if self._pending:
+                self._stats['replayed'] += len(self._pending)
+                print(f"✓ Replaying {len(self._pending)} unflushed ChromaDB writes from {self.log_path}")
+                self._index_put(list(self._pending.values()))
+            if self._log_records > len(self._pending):
+                self._compact_log()
+            self._prune_index()
+            self._worker = threading.Thread(target=self._run, name='chroma-write-behind', daemon=True)
+            self._worker.start()
+        atexit.register(self.stop)
+
+    def _claim_log_slot(self) -> str:
+        """
+        Lock the first free log slot so gunicorn workers never share a log file.
+        A restarted worker claims a slot left behind by a dead one and replays it.
+        """
+        root, ext = os.path.splitext(self.base_log_path)
+        if fcntl is None:
+            return f"{root}.0{ext}"
+        slot = 0
+        while True:
+            path = f"{root}.{slot}{ext}"
+            lock_file = open(f"{path}.lock", 'w')
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                slot += 1
+                continue
+            self._slot_lock_file = lock_file
+            return path
+
+    def _read_log(self, path: str) -> Tuple[int, List[Dict[str, Any]]]:
+        """(line count, parsed records) of a log file"""
+        lines, records = 0, []
+        with open(path, 'r', encoding='utf-8') as log_file:
+            for line in log_file:
+                line = line.strip()
+                if not line:
+                    continue
+                lines += 1
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn write from a crash mid-append; everything before it is intact
+                    continue
+        return lines, records
+
+    def _load(self, record: Dict[str, Any]) -> bool:
+        """Make a logged record pending unless a later one for its ID is (called with lock held)"""
+        key = (record['collection'], record['id'])
+        current = self._pending.get(key)
+        if current is not None and current.get('enqueued_at', 0) > record.get('enqueued_at', 0):
+            return False
+        self._pending.pop(key, None)
+        if record.get('deleted'):
+            # Tombstone: the writes logged before it were discarded
+            return False
+        self._pending[key] = record
+        return True
+
+    def _replay_log(self):
+        """Load records left in the log by a previous process (called with lock held)"""
+        if not os.path.exists(self.log_path):
+            return
+        lines, records = self._read_log(self.log_path)
+        self._log_records += lines
+        for record in records:
+            self._load(record)
+            self._seq = max(self._seq, record.get('seq', 0))
+
+    def _adopt_orphan_logs(self):
+        """
+        Take over the logs of slots no running process holds (called with lock
+        held). When the worker count goes down, the higher slots are never
+        claimed again; their records are appended to this process's log, and the
+        orphaned log is truncated once they are on disk here.
+        """
+        if fcntl is None:
+            return
+        root, ext = os.path.splitext(self.base_log_path)
+        for lock_path in sorted(glob.glob(f"{glob.escape(root)}.*{ext}.lock")):
+            path = lock_path[:-len('.lock')]
+            if path == self.log_path or not os.path.exists(path) or os.path.getsize(path) == 0:
+                continue
+            lock_file = open(lock_path, 'w')
+            try:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    # A running worker owns this slot
+                    continue
+                _, records = self._read_log(path)
+                adopted = 0
+                for record in records:
+                    self._seq += 1
+                    record = {**record, 'seq': self._seq}
+                    self._log_file.write(json.dumps(record) + "\n")
+                    self._log_records += 1
+                    adopted += self._load(record)
+                self._log_file.flush()
+                os.fsync(self._log_file.fileno())
+                with open(path, 'r+', encoding='utf-8') as orphan:
+                    orphan.truncate(0)
+                    os.fsync(orphan.fileno())
+                self._stats['adopted'] += adopted
+                print(f"✓ Took over {adopted} ChromaDB writes from orphaned log {path}")
+            finally:
+                lock_file.close()
+
+    def _drop_superseded(self):
+        """Forget pending records another process has written a later version of (called with lock held)"""
+        for key in self._superseded(list(self._pending.values())):
+            del self._pending[key]
+            self._stats['superseded'] += 1
+
+    def _index_store(self) -> SQLiteStore:
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = SQLiteStore(self.index_path, schema=(
+                        "CREATE TABLE IF NOT EXISTS write_behind_index ("
+                        "collection TEXT NOT NULL, id TEXT NOT NULL, enqueued_at REAL NOT NULL, "
+                        "data TEXT, PRIMARY KEY (collection, id))",
+                    ))
+        return self._index
+
+    def _index_put(self, records: List[Dict[str, Any]]):
+        """
+        Publish pending records (or tombstones) to the shared index, unless it
+        holds a later write for the ID
+        """
+        with self._index_store().connection() as conn:
+            conn.executemany(
+                "INSERT INTO write_behind_index (collection, id, enqueued_at, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(collection, id) DO UPDATE SET enqueued_at = excluded.enqueued_at, data = excluded.data "
+                "WHERE excluded.enqueued_at >= write_behind_index.enqueued_at",
+                [(r['collection'], r['id'], r['enqueued_at'], None if r.get('deleted') else json.dumps(r))
+                 for r in records]
+            )
+
+    def _index_flushed(self, records: List[Dict[str, Any]]):
+        """Mark flushed records in the index (a later write for the same ID stays pending)"""
+        with self._index_store().connection() as conn:
+            conn.executemany(
+                "UPDATE write_behind_index SET data = NULL WHERE collection = ? AND id = ? AND enqueued_at = ?",
+                [(r['collection'], r['id'], r['enqueued_at']) for r in records]
+            )
+
+    def _superseded(self, records: List[Dict[str, Any]]) -> Set[Tuple[str, str]]:
+        """Keys of records for which the index knows a later write from any process"""
+        superseded = set()
+        conn = self._index_store().connection()
+        by_collection: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            by_collection.setdefault(record['collection'], []).append(record)
+        for collection, group in by_collection.items():
+            for start in range(0, len(group), 500):
+                chunk = group[start:start + 500]
+                latest = dict(conn.execute(
+                    f"SELECT id, enqueued_at FROM write_behind_index WHERE collection = ? "
+                    f"AND id IN ({', '.join('?' * len(chunk))})",
+                    (collection, *[r['id'] for r in chunk])
+                ).fetchall())
+                superseded.update(
+                    (collection, r['id']) for r in chunk if latest.get(r['id'], 0) > r.get('enqueued_at', 0)
+                )
+        return superseded
+
+    def _prune_index(self):
+        with self._index_store().connection() as conn:
+            conn.execute(
+                "DELETE FROM write_behind_index WHERE data IS NULL AND enqueued_at < ?",
+                (time.time() - self.index_retention,)
+            )
+
+    def enqueue(self, collection: str, doc_id: str, document: str, metadata: Optional[Dict[str, Any]] = None):
+        """Durably append a write to the log; returns once it is on disk"""
+        if self._worker is None:
+            self.start()
+
+        with self._lock:
+            self._seq += 1
+            record = {
+                'seq': self._seq,
+                'collection': collection,
+                'id': str(doc_id),
+                'document': document,
+                'metadata': metadata or {},
+                'enqueued_at': time.time()
+            }
+            self._log_file.write(json.dumps(record) + "\n")
+            self._log_file.flush()
+            os.fsync(self._log_file.fileno())
+            self._log_records += 1
+
+            key = (collection, record['id'])
+            self._pending.pop(key, None)
+            self._pending[key] = record
+            self._stats['enqueued'] += 1
+            backlog = len(self._pending)
+            self._index_put([record])
+
+        if backlog >= self.batch_size:
+            self._wakeup.set()
+
+    def discard(self, collection: str, doc_ids: List[str], delete_fn: Optional[Callable[[List[str]], None]] = None):
+        """
+        Drop queued writes for doc_ids and log a tombstone for each, so no flush
+        or log replay (in any worker) re-adds them, then call delete_fn(ids) to
+        delete them from ChromaDB. Runs between flushes, so a batch being written
+        cannot re-add an ID after delete_fn removed it.
+        """
+        if self._worker is None:
+            self.start()
+
+        ids = [str(doc_id) for doc_id in doc_ids]
+        with self._flush_lock:
+            with self._lock:
+                tombstones = []
+                for doc_id in ids:
+                    self._seq += 1
+                    tombstones.append({
+                        'seq': self._seq,
+                        'collection': collection,
+                        'id': doc_id,
+                        'deleted': True,
+                        'enqueued_at': time.time()
+                    })
+                    self._pending.pop((collection, doc_id), None)
+                for tombstone in tombstones:
+                    self._log_file.write(json.dumps(tombstone) + "\n")
+                self._log_file.flush()
+                os.fsync(self._log_file.fileno())
+                self._log_records += len(tombstones)
+                self._stats['discarded'] += len(ids)
+                self._index_put(tombstones)
+            if delete_fn is not None:
+                delete_fn(ids)
+
+    def get_pending(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a write that is enqueued but not yet flushed (read-your-writes),
+        by this process or any other worker on the host
+        """
+        key = (collection, str(doc_id))
+        with self._lock:
+            record = self._pending.get(key)
+            record = dict(record) if record else None
+        row = self._index_store().connection().execute(
+            "SELECT enqueued_at, data FROM write_behind_index WHERE collection = ? AND id = ?", key
+        ).fetchone()
+        if row is not None and (record is None or row[0] > record['enqueued_at']):
+            # A later write (or a delete) from any worker; None once it is flushed
+            return json.loads(row[1]) if row[1] is not None else None
+        return record
+
+    def _next_batch(self) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """Take the oldest pending records that belong to the same collection"""
+        with self._lock:
+            if not self._pending:
+                return None, []
+            collection = next(iter(self._pending.values()))['collection']
+            batch = []
+            for record in self._pending.values():
+                if record['collection'] == collection:
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        break
+            return collection, batch
+
+    def _mark_done(self, records: List[Dict[str, Any]]):
+        """
+        Drop flushed records from the pending set. The log is truncated once
+        drained; under sustained ingest it never drains, so it is also compacted
+        once it has grown past compact_min_records and is mostly flushed records.
+        """
+        with self._lock:
+            for record in records:
+                key = (record['collection'], record['id'])
+                # A newer write for the same id may have replaced this record meanwhile
+                if self._pending.get(key) is record:
+                    del self._pending[key]
+            if self._log_file is None:
+                return
+            if not self._pending:
+                self._log_file.truncate(0)
+                self._log_file.seek(0)
+                self._log_file.flush()
+                os.fsync(self._log_file.fileno())
+                self._log_records = 0
+            elif self._log_records >= self.compact_min_records and self._log_records >= 2 * len(self._pending):
+                self._compact_log()
+
+    def _compact_log(self):
+        """
+        Rewrite the log with only the pending records and rename it over the old
+        one (called with lock held). The rename is atomic, so a crash leaves
+        either the old log or the compacted one, never a partial log.
+        """
+        compact_path = f"{self.log_path}.compact"
+        with open(compact_path, 'w', encoding='utf-8') as compact_file:
+            for record in self._pending.values():
+                compact_file.write(json.dumps(record) + "\n")
+            compact_file.flush()
+            os.fsync(compact_file.fileno())
+        os.replace(compact_path, self.log_path)
+        if hasattr(os, 'O_DIRECTORY'):
+            directory_fd = os.open(os.path.dirname(os.path.abspath(self.log_path)), os.O_DIRECTORY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+        self._log_file.close()
+        self._log_file = open(self.log_path, 'a', encoding='utf-8')
+        self._log_records = len(self._pending)
+        self._stats['compactions'] += 1
+
+    def _write_batch(self, collection: str, records: List[Dict[str, Any]]):
+        self.flush_fn(
+            collection,
+            [r['id'] for r in records],
+            [r['document'] for r in records],
+            [r['metadata'] for r in records]
+        )
+
+    def flush(self) -> int:
+        """Flush everything currently pending. Returns the number of records written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                collection, batch = self._next_batch()
+                if not batch:
+                    return written
+                # Another worker may have written a later version since (or deleted it)
+                superseded = self._superseded(batch)
+                current = [r for r in batch if (r['collection'], r['id']) not in superseded]
+                try:
+                    if current:
+                        self._write_batch(collection, current)
+                    with self._lock:
+                        self._stats['batches'] += 1
+                except Exception as e:
+                    print(f"⚠ Batch write to ChromaDB failed ({len(current)} records): {e}")
+                    for record in current:
+                        record['attempts'] = record.get('attempts', 0) + 1
+                    if max(r['attempts'] for r in current) < self.max_attempts:
+                        raise
+                    # Isolate bad records so one poison write can't block the queue
+                    current = self._write_individually(collection, current)
+                self._mark_done(batch)
+                self._index_flushed(current)
+                written += len(current)
+                with self._lock:
+                    self._stats['flushed'] += len(current)
+                    self._stats['superseded'] += len(superseded)
+
+    def _write_individually(self, collection: str, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Retry a failed batch record by record, moving rejected records to the failed log"""
+        done = []
+        for record in batch:
+            try:
+                self._write_batch(collection, [record])
+            except Exception as e:
+                print(f"✗ Dropping ChromaDB write {record['id']} to {self.failed_log_path}: {e}")
+                with open(self.failed_log_path, 'a', encoding='utf-8') as failed_file:
+                    failed_file.write(json.dumps({**record, 'error': str(e)}) + "\n")
+                with self._lock:
+                    self._stats['failed'] += 1
+            done.append(record)
+        return done
+
+    def _run(self):
+        retry_delay = self.flush_interval
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout=retry_delay)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                retry_delay = self.flush_interval
+            except Exception as e:
+                retry_delay = min(max(retry_delay, self.flush_interval) * 2, self.max_retry_delay)
+                print(f"⚠ ChromaDB write-behind flush failed, retrying in {retry_delay:.1f}s: {e}")
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker after a final best-effort flush"""
+        if self._worker is None or self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._worker.join(timeout=timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠ Final ChromaDB flush failed, writes remain in {self.log_path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue counters for monitoring"""
+        with self._lock:
+            pending = len(self._pending)
+            oldest = next(iter(self._pending.values()))['enqueued_at'] if self._pending else None
+            counters = dict(self._stats)
+        return {
+            **counters,
+            'pending': pending,
+            'oldest_pending_age_seconds': round(time.time() - oldest, 3) if oldest else 0.0,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval
+        }
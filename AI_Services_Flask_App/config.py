@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'your_default_secret_key'
+    # No default: signed audio URLs stay disabled until a real secret is set
+    SECRET_KEY = os.environ.get('SECRET_KEY')
     CHROMADB_URI = os.environ.get('CHROMADB_URI') or 'http://localhost:8000'
     DEBUG = os.environ.get('DEBUG', 'True') == 'True'
\ No newline at end of file
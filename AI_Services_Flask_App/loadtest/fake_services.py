@@ -0,0 +1,313 @@
+"""
+Local stand-ins for OpenRouter and ElevenLabs
+One HTTP server answering OpenRouter chat completions (plain and streamed),
+ElevenLabs text-to-speech (plain and /stream) and speech-to-text, with
+configurable latency distributions, error rates and streaming pace. Point the AI
+service at it with OPENROUTER_BASE_URL=<url>/api/v1 and ELEVENLABS_BASE_URL=<url>/v1.
+
+Run standalone (e.g. for a gunicorn node under test):
+    python -m loadtest.fake_services --port 8900 --llm-median-ms 1200 --llm-p95-ms 4000
+"""
+import re
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+CANNED_ANSWER = (
+    "In my last role I built a Django REST API backed by PostgreSQL and Redis. "
+    "I profiled slow endpoints, added caching and moved report generation to Celery workers."
+)
+
+
+class LatencyProfile:
+    """Log-normal latency given its median and p95, plus a failure probability"""
+
+    def __init__(self, median_ms: float, p95_ms: float, error_rate: float = 0.0):
+        self.median_ms = median_ms
+        self.p95_ms = max(p95_ms, median_ms)
+        self.error_rate = error_rate
+        self._sigma = math.log(self.p95_ms / median_ms) / 1.645 if median_ms > 0 else 0.0
+
+    def sample(self) -> float:
+        """One latency in seconds"""
+        if self.median_ms <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.median_ms), self._sigma) / 1000.0
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+
+def _completion_content(prompt: str, counter: int) -> str:
+    """A plausible JSON reply for whichever interview prompt this is"""
+    if '"answers"' in prompt:
+        indices = [int(i) for i in re.findall(r'^\[(\d+)\] Q:', prompt, re.MULTILINE)]
+        data: Dict[str, Any] = {'answers': [
+            {'index': i, 'score': random.randint(5, 9), 'feedback': 'Solid, specific answer.',
+             'strengths': ['Concrete example'], 'improvements': ['Quantify the impact']}
+            for i in indices
+        ]}
+        if '"overall_score"' in prompt:
+            data.update(_overall_evaluation())
+        return json.dumps(data)
+    if '"overall_score"' in prompt:
+        return json.dumps(_overall_evaluation())
+    if '"score"' in prompt:
+        return json.dumps({'score': random.randint(5, 9), 'feedback': 'Clear answer with a relevant example.',
+                           'strengths': ['Relevant experience'], 'improvements': ['More depth on trade-offs'],
+                           'cv_verified': True})
+    if '"questions"' in prompt:
+        count = int((re.search(r'Write (\d+) interview questions', prompt) or [0, 20])[1])
+        skills = ['Python', 'Django', 'PostgreSQL', 'Redis', 'Docker', 'Kubernetes', 'AWS', 'REST APIs']
+        return json.dumps({'questions': [
+            {'topic': skills[i % len(skills)], 'focus_area': skills[i % len(skills)],
+             'question': f"How have you used {skills[i % len(skills)]} in production (pool {counter}.{i})?"}
+            for i in range(count)
+        ]})
+    if '"topics"' in prompt:
+        count = int((re.search(r'Plan (\d+) interview questions', prompt) or [0, 5])[1])
+        areas = ['APIs', 'databases', 'caching', 'testing', 'deployment', 'monitoring', 'security', 'teamwork']
+        return json.dumps({'topics': [
+            {'topic': areas[i % len(areas)], 'focus_area': areas[i % len(areas)],
+             'question': f"Tell me about your experience with {areas[i % len(areas)]} (plan {counter}.{i})?"}
+            for i in range(count)
+        ]})
+    return json.dumps({'question': f"How did you approach scaling the service you mentioned (variant {counter})?",
+                       'focus_area': 'scalability'})
+
+
+def _overall_evaluation() -> Dict[str, Any]:
+    return {'overall_score': random.randint(5, 9), 'strengths': ['Backend depth'],
+            'areas_for_improvement': ['System design breadth'], 'cv_verification': 'verified',
+            'job_fit': 'good', 'recommendation': 'recommend', 'summary': 'Capable backend engineer.'}
+
+
+class FakeServices:
+    """Threaded HTTP server hosting every fake upstream on one port"""
+
+    def __init__(
+        self,
+        llm: LatencyProfile,
+        tts: LatencyProfile,
+        stt: LatencyProfile,
+        stream_chunk_chars: int = 16,
+        stream_interval_ms: float = 25.0,
+        audio_bytes_per_char: int = 800,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        """
+        Args:
+            llm, tts, stt: Latency/error profile per upstream (for streams, time to first byte)
+            stream_chunk_chars: Characters per streamed chat completion delta
+            stream_interval_ms: Delay between streamed deltas and between streamed audio chunks
+            audio_bytes_per_char: Size of the fake MP3 per character of text
+            host, port: Bind address (port 0 picks a free port)
+        """
+        self.llm = llm
+        self.tts = tts
+        self.stt = stt
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_interval = stream_interval_ms / 1000.0
+        self.audio_bytes_per_char = audio_bytes_per_char
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeServices':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name='fake-services')
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, endpoint: str, failed: bool) -> int:
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, {'requests': 0, 'errors': 0})
+            counts['requests'] += 1
+            counts['errors'] += int(failed)
+            return counts['requests']
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {endpoint: dict(counts) for endpoint, counts in self._counts.items()}
+
+    def _handler_class(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+            def _send(self, status: int, body: bytes, content_type: str = 'application/json'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _fail(self, profile: LatencyProfile):
+                time.sleep(profile.sample() / 2)
+                status = random.choice([429, 500, 502, 503])
+                self._send(status, json.dumps({'error': {'message': f'fake upstream error {status}'}}).encode())
+
+            def _stream(self, chunks, content_type: str):
+                """Write chunks with chunked transfer encoding so keep-alive still works"""
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading (an abandoned stream or a hedge loser)
+                    self.close_connection = True
+
+            def do_POST(self):
+                path = self.path.split('?', 1)[0]
+                if path.endswith('/chat/completions'):
+                    self._chat_completion()
+                elif '/text-to-speech/' in path:
+                    self._text_to_speech(path.endswith('/stream'))
+                elif path.endswith('/speech-to-text'):
+                    self._speech_to_text()
+                else:
+                    self._send(404, b'{"error": "unknown endpoint"}')
+
+            def _chat_completion(self):
+                body = json.loads(self._body() or b'{}')
+                failed = services.llm.should_fail()
+                number = services._count('chat_completions', failed)
+                if failed:
+                    return self._fail(services.llm)
+                prompt = "\n".join(str(m.get('content', '')) for m in body.get('messages', []))
+                content = _completion_content(prompt, number)
+                usage = {'prompt_tokens': len(prompt) // 4 + 1, 'completion_tokens': len(content) // 4 + 1}
+                usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+                latency = services.llm.sample()
+
+                if not body.get('stream'):
+                    time.sleep(latency)
+                    self._send(200, json.dumps({
+                        'id': f'fake-{number}', 'model': body.get('model'),
+                        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                     'finish_reason': 'stop'}],
+                        'usage': usage
+                    }).encode())
+                    return
+
+                # Time to first token is a third of the sampled latency; the rest is paced deltas
+                time.sleep(latency / 3)
+
+                def events():
+                    size = services.stream_chunk_chars
+                    for start in range(0, len(content), size):
+                        delta = {'choices': [{'index': 0, 'delta': {'content': content[start:start + size]}}]}
+                        yield f"data: {json.dumps(delta)}\n\n".encode()
+                        time.sleep(services.stream_interval)
+                    yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode()
+                    yield b"data: [DONE]\n\n"
+                self._stream(events(), 'text/event-stream')
+
+            def _text_to_speech(self, stream: bool):
+                body = json.loads(self._body() or b'{}')
+                failed = services.tts.should_fail()
+                services._count('text_to_speech_stream' if stream else 'text_to_speech', failed)
+                if failed:
+                    return self._fail(services.tts)
+                audio = b'\xff\xfb\x90\x00' + bytes(len(body.get('text', '')) * services.audio_bytes_per_char)
+                time.sleep(services.tts.sample())
+                if not stream:
+                    self._send(200, audio, 'audio/mpeg')
+                    return
+
+                def chunks():
+                    for start in range(0, len(audio), 4096):
+                        yield audio[start:start + 4096]
+                        time.sleep(services.stream_interval)
+                self._stream(chunks(), 'audio/mpeg')
+
+            def _speech_to_text(self):
+                self._body()
+                failed = services.stt.should_fail()
+                services._count('speech_to_text', failed)
+                if failed:
+                    return self._fail(services.stt)
+                time.sleep(services.stt.sample())
+                self._send(200, json.dumps({'text': CANNED_ANSWER, 'language_code': 'en',
+                                            'language_probability': 0.99}).encode())
+
+        return Handler
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """Latency/error flags shared by this module and the load-test runner"""
+    group = parser.add_argument_group('fake upstreams')
+    group.add_argument('--llm-median-ms', type=float, default=1200)
+    group.add_argument('--llm-p95-ms', type=float, default=3500)
+    group.add_argument('--llm-error-rate', type=float, default=0.02)
+    group.add_argument('--tts-median-ms', type=float, default=400)
+    group.add_argument('--tts-p95-ms', type=float, default=1200)
+    group.add_argument('--tts-error-rate', type=float, default=0.0)
+    group.add_argument('--stt-median-ms', type=float, default=600)
+    group.add_argument('--stt-p95-ms', type=float, default=1500)
+    group.add_argument('--stt-error-rate', type=float, default=0.0)
+    group.add_argument('--stream-chunk-chars', type=int, default=16)
+    group.add_argument('--stream-interval-ms', type=float, default=25)
+
+
+def services_from_args(args: argparse.Namespace, host: str = '127.0.0.1', port: int = 0) -> FakeServices:
+    return FakeServices(
+        llm=LatencyProfile(args.llm_median_ms, args.llm_p95_ms, args.llm_error_rate),
+        tts=LatencyProfile(args.tts_median_ms, args.tts_p95_ms, args.tts_error_rate),
+        stt=LatencyProfile(args.stt_median_ms, args.stt_p95_ms, args.stt_error_rate),
+        stream_chunk_chars=args.stream_chunk_chars,
+        stream_interval_ms=args.stream_interval_ms,
+        host=host,
+        port=port
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake OpenRouter and ElevenLabs servers for load testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    services = services_from_args(args, args.host, args.port).start()
+    print(f"✓ Fake upstreams on {services.base_url}")
+    print(f"  OPENROUTER_BASE_URL={services.base_url}/api/v1")
+    print(f"  ELEVENLABS_BASE_URL={services.base_url}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(json.dumps(services.stats(), indent=2))
+        services.stop()
+
+
+if __name__ == '__main__':
+    main()
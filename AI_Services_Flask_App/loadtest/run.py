@@ -0,0 +1,348 @@
+"""
+Interview load test
+Drives complete interview sessions (start -> N questions -> evaluation) against
+one AI service node at a series of concurrency levels, with OpenRouter and
+ElevenLabs replaced by the local fakes in loadtest.fake_services. Reports
+throughput and p50/p95/p99 latency per route for every step, and the
+concurrency at which the node saturates.
+
+In-process (the app is served by a threaded werkzeug server in this process):
+    python -m loadtest.run --concurrency 1,2,4,8,16,32 --step-seconds 60
+
+Against a real node (start it with OPENROUTER_BASE_URL / ELEVENLABS_BASE_URL
+pointing at the printed fake upstream URL and any API keys set):
+    python -m loadtest.run --target http://127.0.0.1:5000 --fake-port 8900
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+import requests
+
+from .fake_services import add_profile_arguments, services_from_args, CANNED_ANSWER
+
+JOB_DESCRIPTION = """Senior Backend Engineer (Python)
+Responsibilities:
+- Design and build scalable REST APIs with Django and FastAPI
+- Own PostgreSQL schema design, query optimization and migrations
+- Deploy services on AWS using Docker and Terraform
+Requirements:
+- 5+ years of professional Python experience
+- Strong knowledge of Redis, Celery and message queues
+"""
+RESUME = """Backend developer with 6 years of Python experience.
+Built a payment service in Django handling 2M requests/day on PostgreSQL and Redis.
+Led the migration of batch jobs to Celery on AWS ECS; CI/CD with GitHub Actions."""
+FAKE_AUDIO = b'\x1aE\xdf\xa3' + bytes(48 * 1024)
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Recorder:
+    """Thread-safe latency samples and error counts per route"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.interviews = 0
+        self.failed_interviews = 0
+
+    def record(self, route: str, seconds: float, ok: bool):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+    def finish_interview(self, ok: bool):
+        with self._lock:
+            self.interviews += 1
+            self.failed_interviews += int(not ok)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            routes = {}
+            for route, values in sorted(self.latencies.items()):
+                routes[route] = {
+                    'count': len(values),
+                    'errors': self.errors.get(route, 0),
+                    'p50_ms': round(_percentile(values, 0.50) * 1000),
+                    'p95_ms': round(_percentile(values, 0.95) * 1000),
+                    'p99_ms': round(_percentile(values, 0.99) * 1000),
+                }
+            requests_total = sum(len(values) for values in self.latencies.values())
+            errors_total = sum(self.errors.values())
+            return {
+                'elapsed_seconds': round(elapsed, 1),
+                'interviews': self.interviews,
+                'failed_interviews': self.failed_interviews,
+                'interviews_per_minute': round(self.interviews * 60 / elapsed, 2) if elapsed else 0.0,
+                'requests_per_second': round(requests_total / elapsed, 2) if elapsed else 0.0,
+                'error_rate': round(errors_total / requests_total, 4) if requests_total else 0.0,
+                'routes': routes
+            }
+
+
+class InterviewDriver:
+    """Runs one candidate's interview the way the React client does"""
+
+    def __init__(self, base_url: str, recorder: Recorder, args: argparse.Namespace):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.args = args
+        self.http = requests.Session()
+
+    def _call(self, route: str, method: str, path: str, **kwargs) -> Tuple[Optional[requests.Response], bool]:
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, timeout=self.args.request_timeout, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        self.recorder.record(route, time.perf_counter() - started, ok)
+        return response, ok
+
+    def _fetch_audio(self, audio_url: Optional[str]):
+        if self.args.audio and audio_url:
+            path = audio_url.split('://', 1)[-1]
+            path = path[path.find('/'):]
+            self._call('GET /tts/stream/<token>', 'GET', path)
+
+    def _answer(self) -> str:
+        if self.args.think_seconds:
+            time.sleep(random.uniform(0.5, 1.5) * self.args.think_seconds)
+        if self.args.stt:
+            response, ok = self._call('POST /stt/transcribe', 'POST', '/stt/transcribe',
+                                      files={'audio': ('answer.webm', FAKE_AUDIO, 'audio/webm')})
+            if ok:
+                return response.json().get('text') or CANNED_ANSWER
+        return CANNED_ANSWER
+
+    def _next_question(self, session_id: str, answer: str, number: int) -> Tuple[bool, Optional[str]]:
+        body = {'session_id': session_id, 'answer': answer, 'question_number': number}
+        if not self.args.stream:
+            response, ok = self._call('POST /interview/next-question', 'POST', '/interview/next-question', json=body)
+            return ok, response.json().get('audio_url') if ok else None
+
+        started = time.perf_counter()
+        audio_url, done, ok = None, False, False
+        try:
+            with self.http.post(self.base_url + '/interview/next-question/stream', json=body, stream=True,
+                                timeout=self.args.request_timeout) as response:
+                ok = response.status_code < 400
+                event = None
+                for raw in response.iter_lines():
+                    line = raw.decode('utf-8', errors='replace') if raw else ''
+                    if line.startswith('event: '):
+                        event = line[7:]
+                    elif line.startswith('data: ') and event == 'question' and audio_url is None:
+                        # Time until the client can show and voice the question
+                        self.recorder.record('SSE first question', time.perf_counter() - started, True)
+                        audio_url = json.loads(line[6:]).get('audio_url') or ''
+                    elif line.startswith('data: ') and event == 'done':
+                        done = True
+                        break
+        except requests.RequestException:
+            ok = False
+        ok = ok and done
+        self.recorder.record('POST /interview/next-question/stream', time.perf_counter() - started, ok)
+        return ok, audio_url
+
+    def _evaluate(self, session_id: str, answer: str) -> bool:
+        body = {'session_id': session_id, 'answer': answer}
+        if self.args.evaluation == 'batch':
+            _, ok = self._call('POST /interview/evaluate-batch', 'POST', '/interview/evaluate-batch', json=body)
+            return ok
+
+        started = time.perf_counter()
+        response, ok = self._call('POST /interview/jobs/evaluate-interview', 'POST',
+                                  '/interview/jobs/evaluate-interview', json=body)
+        if not ok:
+            return False
+        poll_path = response.json()['poll_url']
+        while time.perf_counter() - started < self.args.request_timeout:
+            time.sleep(self.args.poll_seconds)
+            response, ok = self._call('GET /interview/jobs/<id>', 'GET', poll_path)
+            status = response.json().get('status') if ok else None
+            if status in ('completed', 'failed'):
+                ok = status == 'completed'
+                self.recorder.record('evaluation job (submit to result)', time.perf_counter() - started, ok)
+                return ok
+        self.recorder.record('evaluation job (submit to result)', time.perf_counter() - started, False)
+        return False
+
+    def run(self) -> bool:
+        # A distinct CV per interview keeps the LLM response cache from serving every start
+        resume = f"{RESUME}\nCandidate reference {uuid.uuid4().hex[:8]}."
+        response, ok = self._call('POST /interview/start', 'POST', '/interview/start', json={
+            'job_description': JOB_DESCRIPTION,
+            'resume_summary': resume,
+            'interview_id': uuid.uuid4().hex,
+            'total_questions': self.args.questions
+        })
+        if not ok:
+            return False
+        result = response.json()
+        session_id = result['session_id']
+        self._fetch_audio(result.get('audio_url'))
+
+        for number in range(2, self.args.questions + 1):
+            ok, audio_url = self._next_question(session_id, self._answer(), number)
+            if not ok:
+                return False
+            self._fetch_audio(audio_url)
+        return self._evaluate(session_id, self._answer())
+
+
+def run_step(base_url: str, concurrency: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Keep `concurrency` interviews running back to back for step_seconds"""
+    recorder = Recorder()
+    deadline = time.perf_counter() + args.step_seconds
+    started = time.perf_counter()
+
+    def worker():
+        driver = InterviewDriver(base_url, recorder, args)
+        while time.perf_counter() < deadline:
+            try:
+                ok = driver.run()
+            except Exception as e:
+                print(f"⚠ Interview crashed: {e}")
+                ok = False
+            recorder.finish_interview(ok)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {'concurrency': concurrency, **recorder.summary(time.perf_counter() - started)}
+
+
+def find_saturation(steps: List[Dict[str, Any]], args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    """
+    First step past which adding interviews stops paying off: throughput grows by
+    less than --min-gain, the error rate exceeds --max-error-rate, or the
+    next-question p95 exceeds --slo-ms. Returns the last healthy step and why.
+    """
+    question_routes = ('POST /interview/next-question', 'POST /interview/next-question/stream')
+    previous = None
+    for step in steps:
+        p95 = max((step['routes'][r]['p95_ms'] for r in question_routes if r in step['routes']), default=0)
+        reason = None
+        if step['error_rate'] > args.max_error_rate:
+            reason = f"error rate {step['error_rate']:.1%} at concurrency {step['concurrency']}"
+        elif p95 > args.slo_ms:
+            reason = f"next-question p95 {p95} ms over {args.slo_ms} ms SLO at concurrency {step['concurrency']}"
+        elif previous and step['interviews_per_minute'] < previous['interviews_per_minute'] * (1 + args.min_gain):
+            reason = f"throughput gained < {args.min_gain:.0%} going to concurrency {step['concurrency']}"
+        if reason:
+            return {'sustained_concurrency': previous['concurrency'] if previous else 0, 'reason': reason}
+        previous = step
+    return None
+
+
+def print_step(step: Dict[str, Any]):
+    print(f"\n=== Concurrency {step['concurrency']}: {step['interviews']} interviews "
+          f"({step['failed_interviews']} failed), {step['interviews_per_minute']} interviews/min, "
+          f"{step['requests_per_second']} req/s, errors {step['error_rate']:.1%} ===")
+    print(f"{'route':<42}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, stats in step['routes'].items():
+        print(f"{route:<42}{stats['count']:>7}{stats['errors']:>8}"
+              f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}")
+
+
+def start_local_app(upstream_url: str) -> Tuple[str, Any]:
+    """Serve the AI service in this process, wired to the fake upstreams and throwaway state"""
+    state_dir = tempfile.mkdtemp(prefix='selectra-loadtest-')
+    os.environ.update({
+        'OPENROUTER_BASE_URL': f"{upstream_url}/api/v1",
+        'OPENROUTER_API_KEY': os.environ.get('OPENROUTER_API_KEY') or 'loadtest',
+        'ELEVENLABS_BASE_URL': f"{upstream_url}/v1",
+        'ELEVENLABS_API_KEY': os.environ.get('ELEVENLABS_API_KEY') or 'loadtest',
+        'TTS_CACHE_DIR': os.path.join(state_dir, 'tts_cache'),
+        'LLM_CACHE_DIR': os.path.join(state_dir, 'llm_cache'),
+        'INTERVIEW_SESSION_DB': os.path.join(state_dir, 'interview_sessions.sqlite3'),
+        'EVAL_JOB_DB': os.path.join(state_dir, 'evaluation_jobs.sqlite3'),
+        'JOB_QUESTION_POOL_DB': os.path.join(state_dir, 'job_question_pools.sqlite3'),
+        'CACHE_GENERATIONS_DB': os.path.join(state_dir, 'cache_generations.sqlite3'),
+        # Throwaway secret so the signed audio_url path is exercised
+        'SECRET_KEY': os.environ.get('SECRET_KEY') or uuid.uuid4().hex,
+    })
+    # Imported only now: services read their configuration at import time
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    from app import create_app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, create_app(), threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name='app-under-test').start()
+    print(f"✓ AI service under test on http://127.0.0.1:{server.server_port} (state in {state_dir})")
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test full interview sessions against one AI service node')
+    parser.add_argument('--target', help='Base URL of a running node (default: serve the app in-process)')
+    parser.add_argument('--fake-port', type=int, default=0, help='Port for the fake upstreams (0 = any free port)')
+    parser.add_argument('--concurrency', default='1,2,4,8,16', help='Comma-separated concurrent interviews per step')
+    parser.add_argument('--step-seconds', type=float, default=60)
+    parser.add_argument('--questions', type=int, default=5)
+    parser.add_argument('--think-seconds', type=float, default=1.0, help='Mean candidate answer time per question')
+    parser.add_argument('--stream', action='store_true', help='Use /interview/next-question/stream')
+    parser.add_argument('--stt', action='store_true', help='Transcribe each answer through /stt/transcribe')
+    parser.add_argument('--no-audio', dest='audio', action='store_false', help='Skip fetching question audio')
+    parser.add_argument('--evaluation', choices=('batch', 'job'), default='job')
+    parser.add_argument('--poll-seconds', type=float, default=0.5)
+    parser.add_argument('--request-timeout', type=float, default=120)
+    parser.add_argument('--slo-ms', type=float, default=8000, help='next-question p95 above this counts as saturated')
+    parser.add_argument('--max-error-rate', type=float, default=0.02)
+    parser.add_argument('--min-gain', type=float, default=0.10, help='Throughput gain per step below which it is saturated')
+    parser.add_argument('--json', help='Write the full report to this file')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    upstreams = services_from_args(args, port=args.fake_port).start()
+    print(f"✓ Fake OpenRouter/ElevenLabs on {upstreams.base_url}")
+    base_url, server = (args.target, None) if args.target else start_local_app(upstreams.base_url)
+
+    steps = []
+    for concurrency in [int(level) for level in args.concurrency.split(',') if level.strip()]:
+        step = run_step(base_url, concurrency, args)
+        print_step(step)
+        steps.append(step)
+
+    saturation = find_saturation(steps, args)
+    if saturation:
+        print(f"\nSaturation: sustained {saturation['sustained_concurrency']} concurrent interviews; "
+              f"{saturation['reason']}")
+    else:
+        print("\nNo saturation within the tested concurrency levels")
+
+    report = {'config': vars(args), 'steps': steps, 'saturation': saturation, 'upstream_requests': upstreams.stats()}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report written to {args.json}")
+
+    if server is not None:
+        server.shutdown()
+    upstreams.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -28,11 +28,6 @@ interface QuestionScore {
   feedback: string;
 }
 
-interface AnswerScore {
-  score: number;
-  feedback: string;
-}
-
 type InterviewStage = 
   | 'loading' 
   | 'intro' 
@@ -72,8 +67,6 @@ const Interview = () => {
   const [questionNumber, setQuestionNumber] = useState(0);
   const [answer, setAnswer] = useState('');
   const [conversationHistory, setConversationHistory] = useState<Message[]>([]); // Hidden from UI
-  const [answerScores, setAnswerScores] = useState<AnswerScore[]>([]);
-  const [questionScores, setQuestionScores] = useState<QuestionScore[]>([]);
   
   // Timer
   const [timeLeft, setTimeLeft] = useState(ANSWER_TIME_LIMIT);
@@ -130,6 +123,8 @@ const Interview = () => {
   const mediaStreamRef = useRef<MediaStream | null>(null);
   const recordedChunksRef = useRef<Blob[]>([]);
   const transcriptionChainRef = useRef<Promise<void>>(Promise.resolve());
+  // Server-side session; dropped (back to sending full context) if a session call ever fails
+  const sessionIdRef = useRef<string | null>(null);
   const handleSubmitAnswerRef = useRef<(providedAnswer?: string) => Promise<void>>(async () => {});
 
   const appendTranscript = useCallback((existingText: string, incomingText: string) => {
@@ -286,8 +281,8 @@ const Interview = () => {
     }
   }, [isRecording, liveTranscript, stopRecorder, toast]);
 
-  // Play audio from base64 encoded MP3
-  const playAudioFromBase64 = useCallback((audioBase64: string) => {
+  // Play question audio from a streaming URL (or inline base64 MP3 as a fallback)
+  const playAudio = useCallback((audioSrc: string) => {
     if (!audioEnabled) {
       setIsPlayingAudio(false);
       return;
@@ -299,8 +294,7 @@ const Interview = () => {
         audioRef.current = null;
       }
       
-      const audioData = `data:audio/mp3;base64,${audioBase64}`;
-      const audio = new Audio(audioData);
+      const audio = new Audio(audioSrc);
       audioRef.current = audio;
       
       audio.onplay = () => setIsPlayingAudio(true);
@@ -313,14 +307,19 @@ const Interview = () => {
     }
   }, [audioEnabled]);
 
-  const presentQuestionWithVoice = useCallback((questionText: string, audioBase64?: string) => {
+  const presentQuestionWithVoice = useCallback((
+    questionText: string,
+    audio?: { audio_url?: string; audio_base64?: string }
+  ) => {
     setCurrentQuestion(questionText);
     streamQuestionText(questionText);
 
-    if (audioBase64) {
-      playAudioFromBase64(audioBase64);
+    if (audio?.audio_url) {
+      playAudio(audio.audio_url);
+    } else if (audio?.audio_base64) {
+      playAudio(`data:audio/mp3;base64,${audio.audio_base64}`);
     }
-  }, [playAudioFromBase64, streamQuestionText]);
+  }, [playAudio, streamQuestionText]);
 
   // Fetch application data
   useEffect(() => {
@@ -468,10 +467,14 @@ const Interview = () => {
     setStage('asking');
     
     try {
-      const result = await flaskAPI.startInterview(jobDescription, resumeSummary);
+      const jobId = application?.job_post?.id;
+      const result = await flaskAPI.startInterview(
+        jobDescription, resumeSummary, id, TOTAL_QUESTIONS, jobId ? String(jobId) : undefined
+      );
       
       if (result.success && result.question) {
-        presentQuestionWithVoice(result.question, result.audio?.audio_base64);
+        sessionIdRef.current = result.session_id || null;
+        presentQuestionWithVoice(result.question, { audio_url: result.audio_url, ...result.audio });
         setQuestionNumber(1);
         
         // Store in conversation history (hidden from UI)
@@ -526,37 +529,17 @@ const Interview = () => {
     setStage('submitted');
     
     try {
-      // Evaluate the answer
-      const evalResult = await flaskAPI.evaluateAnswer(
-        jobDescription,
-        currentQuestion,
-        currentAnswer,
-        resumeSummary
-      );
-      
-      setAnswerScores(prev => [...prev, { 
-        score: evalResult.score || 5, 
-        feedback: evalResult.feedback || '' 
-      }]);
-      
-      setQuestionScores(prev => [...prev, {
-        question: currentQuestion,
-        answer: currentAnswer,
-        score: evalResult.score || 5,
-        feedback: evalResult.feedback || ''
-      }]);
-      
-      // Check if interview is complete
+      // Answers are scored together once the interview is complete
       if (questionNumber >= TOTAL_QUESTIONS) {
         await completeInterview(currentAnswer);
       }
       
     } catch (error) {
-      console.error('Error evaluating answer:', error);
+      console.error('Error submitting answer:', error);
     } finally {
       setIsSubmitting(false);
     }
-  }, [answer, questionNumber, currentQuestion, jobDescription, resumeSummary, isSubmitting]);
+  }, [answer, questionNumber, isSubmitting]);
 
   useEffect(() => {
     handleSubmitAnswerRef.current = handleSubmitAnswer;
@@ -574,17 +557,47 @@ const Interview = () => {
     
     try {
       const historyForAPI = conversationHistory.map(m => ({ role: m.role, content: m.content }));
+      const lastMessage = conversationHistory[conversationHistory.length - 1];
+      const session = sessionIdRef.current
+        ? { sessionId: sessionIdRef.current, answer: lastMessage?.role === 'candidate' ? lastMessage.content : undefined }
+        : undefined;
       
-      const nextQ = await flaskAPI.getNextQuestion(
-        jobDescription,
-        resumeSummary,
-        historyForAPI,
-        questionNumber + 1,
-        TOTAL_QUESTIONS
-      );
-      
+      // Stream the question so it is shown (and voiced) as soon as its text is complete
+      let presentedQuestion: string | null = null;
+      let nextQ;
+      try {
+        nextQ = await flaskAPI.streamNextQuestion(
+          jobDescription,
+          resumeSummary,
+          historyForAPI,
+          questionNumber + 1,
+          TOTAL_QUESTIONS,
+          id,
+          (question, audioUrl) => {
+            presentedQuestion = question;
+            presentQuestionWithVoice(question, { audio_url: audioUrl });
+          },
+          session
+        );
+      } catch (streamError) {
+        if (presentedQuestion) throw streamError;
+        console.warn('Question stream unavailable, using a regular request:', streamError);
+        // The session may be expired or out of step; the full context is always authoritative
+        sessionIdRef.current = null;
+        nextQ = await flaskAPI.getNextQuestion(
+          jobDescription,
+          resumeSummary,
+          historyForAPI,
+          questionNumber + 1,
+          TOTAL_QUESTIONS,
+          id
+        );
+      }
+
       if (nextQ.success && nextQ.question) {
-        presentQuestionWithVoice(nextQ.question, nextQ.audio?.audio_base64);
+        if (nextQ.question !== presentedQuestion) {
+          presentQuestionWithVoice(nextQ.question, { audio_url: nextQ.audio_url, ...nextQ.audio });
+        }
         setQuestionNumber(prev => prev + 1);
         
         // Add to conversation history (hidden)
@@ -625,18 +638,38 @@ const Interview = () => {
         ? conversationHistory.concat([{ role: 'candidate', content: lastAnswer, timestamp: new Date() }])
         : conversationHistory;
       
-      const finalEval = await flaskAPI.evaluateFullInterview(
-        jobDescription,
-        resumeSummary,
-        allMessages.map(m => ({ role: m.role, content: m.content })),
-        answerScores
-      );
+      const historyForAPI = allMessages.map(m => ({ role: m.role, content: m.content }));
+      const finalMessage = allMessages[allMessages.length - 1];
+      const session = sessionIdRef.current
+        ? { sessionId: sessionIdRef.current, answer: finalMessage?.role === 'candidate' ? finalMessage.content : undefined }
+        : undefined;
+      
+      // Every answer and the overall assessment are scored in one background job. With the
+      // webhook enabled the AI service saves the results to Django itself; the browser still
+      // saves them whenever that delivery is not confirmed, so results are never lost.
+      let finalEval: any = null;
+      let viaWebhook = false;
+      try {
+        const job = await flaskAPI.submitInterviewEvaluation(jobDescription, resumeSummary, historyForAPI, id || '', session);
+        viaWebhook = Boolean(job.webhook);
+        const finished = await flaskAPI.waitForEvaluationJob(job.job_id);
+        finalEval = finished.webhook?.status === 'delivered' ? null : finished.result;
+      } catch (jobError) {
+        console.warn('Evaluation job unavailable, evaluating inline:', jobError);
+        finalEval = await flaskAPI.evaluateInterviewBatch(jobDescription, resumeSummary, historyForAPI);
+      }
+      const questionScores: QuestionScore[] = (finalEval?.answer_scores || []).map((s: QuestionScore) => ({
+        question: s.question,
+        answer: s.answer,
+        score: s.score || 5,
+        feedback: s.feedback || ''
+      }));
       
       // Save to Django
       try {
-        const resultsData: any = {
+        const resultsData: any = finalEval && {
           interview_token: id || '',
-          overall_score: finalEval.overall_score || Math.round(answerScores.reduce((a, b) => a + b.score, 0) / answerScores.length),
+          overall_score: finalEval.overall_score || Math.round(questionScores.reduce((a, b) => a + b.score, 0) / Math.max(questionScores.length, 1)),
           recommendation: finalEval.recommendation || 'consider',
           summary: finalEval.summary || '',
           strengths: finalEval.strengths || [],
@@ -666,12 +699,15 @@ const Interview = () => {
           }
         }
 
-        await interviewResultsAPI.saveResults(resultsData);
+        if (resultsData) {
+          await interviewResultsAPI.saveResults(resultsData);
+        }
       } catch (saveError) {
         console.error('Failed to save interview results:', saveError);
 
         const statusCode = (saveError as any)?.response?.status;
-        if (statusCode === 409) {
+        // With a webhook, a 409 means the AI service's own delivery got there first
+        if (statusCode === 409 && !viaWebhook) {
           toast({
             title: 'Interview already submitted',
             description: 'This interview was already completed earlier and cannot be re-attempted.',
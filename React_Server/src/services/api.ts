@@ -322,12 +322,38 @@ export const interviewAPI = {
 // Flask AI Service API (for interview questions)
 const FLASK_API_URL = import.meta.env.VITE_FLASK_API_URL || 'http://localhost:5000';
 
+// Server-side interview session from /interview/start: later calls send only the new answer
+export interface InterviewSession {
+  sessionId: string;
+  answer?: string;
+}
+
+// Request body carrying either the session or the full interview context
+const interviewContext = (
+  jobDescription: string,
+  resumeSummary: string,
+  conversationHistory: { role: string; content: string }[],
+  session?: InterviewSession
+) => session
+  ? { session_id: session.sessionId, ...(session.answer !== undefined && { answer: session.answer }) }
+  : { job_description: jobDescription, resume_summary: resumeSummary, conversation_history: conversationHistory };
+
 export const flaskAPI = {
   // Start an interview session
-  startInterview: async (jobDescription: string, resumeSummary: string) => {
+  startInterview: async (
+    jobDescription: string,
+    resumeSummary: string,
+    interviewId?: string,
+    totalQuestions: number = 10,
+    jobId?: string
+  ) => {
+    // jobId lets the service draw new-topic questions from the job's shared question pool
     const response = await axios.post(`${FLASK_API_URL}/interview/start`, {
       job_description: jobDescription,
-      resume_summary: resumeSummary
+      resume_summary: resumeSummary,
+      interview_id: interviewId,
+      total_questions: totalQuestions,
+      job_id: jobId
     });
     return response.data;
   },
@@ -338,18 +364,73 @@ export const flaskAPI = {
     resumeSummary: string,
     conversationHistory: { role: string; content: string }[],
     questionNumber: number,
-    totalQuestions: number = 10
+    totalQuestions: number = 10,
+    interviewId?: string,
+    session?: InterviewSession
   ) => {
     const response = await axios.post(`${FLASK_API_URL}/interview/next-question`, {
-      job_description: jobDescription,
-      resume_summary: resumeSummary,
-      conversation_history: conversationHistory,
+      ...interviewContext(jobDescription, resumeSummary, conversationHistory, session),
       question_number: questionNumber,
-      total_questions: totalQuestions
+      total_questions: totalQuestions,
+      interview_id: interviewId
     });
     return response.data;
   },
 
+  // Stream the next question over Server-Sent Events. onQuestion fires as soon as the
+  // question text is complete (before the rest of the response); resolves with the final result.
+  streamNextQuestion: async (
+    jobDescription: string,
+    resumeSummary: string,
+    conversationHistory: { role: string; content: string }[],
+    questionNumber: number,
+    totalQuestions: number = 10,
+    interviewId: string | undefined,
+    onQuestion: (question: string, audioUrl?: string) => void,
+    session?: InterviewSession
+  ) => {
+    const response = await fetch(`${FLASK_API_URL}/interview/next-question/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+      body: JSON.stringify({
+        ...interviewContext(jobDescription, resumeSummary, conversationHistory, session),
+        question_number: questionNumber,
+        total_questions: totalQuestions,
+        interview_id: interviewId
+      })
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Question stream failed: HTTP ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const event = rawEvent.match(/^event: (.*)$/m)?.[1];
+        const data = rawEvent.match(/^data: (.*)$/m)?.[1];
+        if (!event || !data) continue;
+
+        const payload = JSON.parse(data);
+        if (event === 'question') {
+          onQuestion(payload.question, payload.audio_url || undefined);
+        } else if (event === 'done') {
+          reader.cancel();
+          return payload;
+        }
+      }
+    }
+    throw new Error('Question stream ended before completion');
+  },
+
   // Evaluate a single answer
   evaluateAnswer: async (
     jobDescription: string,
@@ -382,6 +463,61 @@ export const flaskAPI = {
     return response.data;
   },
 
+  // Score every answer and the whole interview in one batched evaluation
+  evaluateInterviewBatch: async (
+    jobDescription: string,
+    resumeSummary: string,
+    conversationHistory: { role: string; content: string }[],
+    session?: InterviewSession
+  ) => {
+    const response = await axios.post(
+      `${FLASK_API_URL}/interview/evaluate-batch`,
+      interviewContext(jobDescription, resumeSummary, conversationHistory, session)
+    );
+    return response.data;
+  },
+
+  // Queue the batched evaluation as a background job; results also go to Django when the webhook is enabled
+  submitInterviewEvaluation: async (
+    jobDescription: string,
+    resumeSummary: string,
+    conversationHistory: { role: string; content: string }[],
+    interviewToken: string,
+    session?: InterviewSession
+  ) => {
+    const response = await axios.post(`${FLASK_API_URL}/interview/jobs/evaluate-interview`, {
+      ...interviewContext(jobDescription, resumeSummary, conversationHistory, session),
+      interview_token: interviewToken
+    });
+    return response.data;
+  },
+
+  // Poll an evaluation job until it finishes (and, with a webhook, until delivery settles).
+  // Resolves with the finished job ({ result, webhook? }); a job not stored yet (404) is retried.
+  waitForEvaluationJob: async (jobId: string, intervalMs = 1000, timeoutMs = 180000, maxNotFound = 5) => {
+    const deadline = Date.now() + timeoutMs;
+    let notFound = 0;
+    while (Date.now() < deadline) {
+      try {
+        const response = await axios.get(`${FLASK_API_URL}/interview/jobs/${jobId}`);
+        notFound = 0;
+        const job = response.data;
+        if (job.status === 'failed') {
+          throw new Error(job.error || 'Evaluation job failed');
+        }
+        if (job.status === 'completed' && job.webhook?.status !== 'pending') {
+          return job;
+        }
+      } catch (error) {
+        if ((error as any)?.response?.status !== 404 || ++notFound > maxNotFound) {
+          throw error;
+        }
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    throw new Error('Timed out waiting for evaluation job');
+  },
+
   // Transcribe candidate speech audio using Flask ElevenLabs STT proxy
   transcribeSpeech: async (audioBlob: Blob) => {
     const formData = new FormData();
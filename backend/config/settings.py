@@ -183,6 +183,23 @@ SIMPLE_JWT = {
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
 
+# Caches: Django's default in-process cache, plus a file-based 'llm' cache for
+# LLM CV-parse responses so every worker shares them
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'llm': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('DJANGO_CACHE_DIR') or str(BASE_DIR / 'django_cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('DJANGO_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+}
+# How long a parsed CV is reused when the same CV text is parsed again (seconds, 0 disables)
+LLM_CACHE_TTL_CV_PARSE = int(os.getenv('LLM_CACHE_TTL_CV_PARSE', 7 * 24 * 3600))
+
 # Email Configuration
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
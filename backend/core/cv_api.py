@@ -9,6 +9,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .cv_parser import cv_parser
+from .views import FLASK_TIMEOUT, FLASK_DEADLINE_HEADERS
 
 logger = logging.getLogger(__name__)
 
@@ -154,7 +155,8 @@ def parse_cv_api(request):
                             'description': job.job_description,
                             'job_id': str(job.id)
                         },
-                        timeout=10
+                        timeout=FLASK_TIMEOUT,
+                        headers=FLASK_DEADLINE_HEADERS
                     )
                     
                     if job_response.status_code in [201, 409]:  # 201 Created or 409 Already exists
@@ -222,7 +224,8 @@ def parse_cv_api(request):
                             'candidate_email': candidate_email,
                             'user_id': str(request.user.id)
                         },
-                        timeout=10
+                        timeout=FLASK_TIMEOUT,
+                        headers=FLASK_DEADLINE_HEADERS
                     )
                     
                     if flask_response.status_code == 201:
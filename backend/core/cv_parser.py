@@ -14,6 +14,8 @@ from collections import defaultdict
 from openai import OpenAI
 import google.generativeai as genai
 from pathlib import Path
+from django.conf import settings
+from .llm_client import openrouter_client, extract_json
 
 # Load spaCy model for NER
 try:
@@ -550,8 +552,7 @@ class CVParser:
     def parse_with_aurora(self, text: str) -> Dict[str, Any]:
         """Parse CV using Aurora Alpha LLM via OpenRouter for enhanced extraction"""
         
-        # Initialize OpenRouter API key
-        api_key = os.getenv('OPENROUTER_API_KEY', '')
+        api_key = openrouter_client.api_key
         
         if not api_key:
             print("OPENROUTER_API_KEY not set, skipping LLM parsing")
@@ -608,101 +609,34 @@ IMPORTANT:
 
         print("Calling OpenRouter API...")
         
-        last_error = None
-        
-        # Try each model until one succeeds
-        for model in models_to_try:
-            try:
-                print(f"Trying model: {model}")
-                import requests
-                
-                response = requests.post(
-                    url="https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "https://selectra-ai.com",
-                        "X-Title": "Selectra AI Interviews",
-                    },
-                    json={
-                        "model": model,
-                        "messages": [
-                            {"role": "system", "content": "You are a professional CV parser. Return only valid JSON."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.1,
-                        "max_tokens": 3000
-                    },
-                    timeout=30
-                )
-                
-                result_data = response.json()
-                
-                # Check if response contains an error
-                if 'error' in result_data:
-                    error_msg = result_data['error'].get('message', 'Unknown error')
-                    error_code = result_data['error'].get('code', 'N/A')
-                    provider = result_data['error'].get('metadata', {}).get('provider_name', 'Unknown')
-                    
-                    print(f"Model {model} failed - Error {error_code}: {error_msg} (Provider: {provider})")
-                    last_error = f"{error_msg} (Code: {error_code})"
-                    continue  # Try next model
-                
-                if response.status_code != 200:
-                    print(f"Model {model} failed - HTTP {response.status_code}")
-                    last_error = f"HTTP {response.status_code}"
-                    continue  # Try next model
-                
-                # Check if choices exists in response
-                if 'choices' not in result_data or not result_data['choices']:
-                    print(f"Model {model} failed - No choices in response")
-                    last_error = "No choices in response"
-                    continue  # Try next model
-                
-                print(f"SUCCESS! Using model: {model}")
-                
-                result = result_data['choices'][0]['message']['content'].strip()
-                print(f"SUCCESS! Using model: {model}")
-                
-                result = result_data['choices'][0]['message']['content'].strip()
-                
-                print(f"Extracted content ({len(result)} chars)")
-                
-                # Clean up response
-                if result.startswith('```json'):
-                    result = result[7:]
-                elif result.startswith('```'):
-                    result = result[3:]
-                if result.endswith('```'):
-                    result = result[:-3]
-                
-                parsed_json = json.loads(result.strip())
-                
-                print("\n" + "="*70)
-                print("PARSED CV DATA (JSON):")
-                print("="*70)
-                print(json.dumps(parsed_json, indent=2))
-                print("="*70 + "\n")
-                
-                print("LLM parsing successful!")
-                return parsed_json
-                
-            except requests.exceptions.RequestException as e:
-                print(f"Model {model} failed - Request error: {str(e)[:100]}")
-                last_error = str(e)[:100]
-                continue  # Try next model
-            except json.JSONDecodeError as e:
-                print(f"Model {model} failed - JSON parse error: {str(e)[:100]}")
-                last_error = f"JSON parse error: {str(e)[:100]}"
-                continue  # Try next model
-            except Exception as e:
-                print(f"Model {model} failed - Unexpected error: {str(e)[:100]}")
-                last_error = str(e)[:100]
-                continue  # Try next model
-        
-        # All models failed
-        print(f"All models failed. Last error: {last_error}")
-        return {}
+        # Each model is tried in order; a reply that is not a JSON object falls through to the next
+        result = openrouter_client.complete(
+            models_to_try,
+            [
+                {"role": "system", "content": "You are a professional CV parser. Return only valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            max_tokens=3000,
+            validate=lambda content: bool(extract_json(content)),
+            # The same CV applied to several jobs parses to the same result
+            cache_ttl=settings.LLM_CACHE_TTL_CV_PARSE,
+            site='cv_parse'
+        )
+        if not result:
+            return {}
+        
+        print(f"Extracted content ({len(result)} chars)")
+        parsed_json = extract_json(result)
+        
+        print("\n" + "="*70)
+        print("PARSED CV DATA (JSON):")
+        print("="*70)
+        print(json.dumps(parsed_json, indent=2))
+        print("="*70 + "\n")
+        
+        print("LLM parsing successful!")
+        return parsed_json
     
     def parse_with_gemini(self, file_path: str) -> Dict[str, Any]:
         """Parse CV directly using Google Gemini API (can process PDF directly)"""
@@ -0,0 +1,109 @@
+"""
+LLM client of the backend (CV parsing)
+The client itself (pooled session, retries, timeouts, JSON extraction) lives
+in the shared selectra_llm package, also used by AI_Services_Flask_App; this
+module adds the response cache on the Django cache framework (the 'llm'
+cache alias) and builds the OpenRouter client.
+"""
+import os
+import json
+import hashlib
+from typing import Dict, Any, List, Optional
+from django.core.cache import caches
+from django.db import DatabaseError
+from django.db.models import F
+# extract_json is imported from here by the call sites
+from selectra_llm import LLMClient, extract_json, llm_telemetry
+
+
+class LLMResponseCache:
+    """
+    LLM response cache on the Django 'llm' cache alias, keyed by
+    (model, normalized prompt, temperature, max_tokens). Hit and token-saving
+    counters are one database row updated atomically, so they are shared by
+    all workers and never evicted with cache entries.
+    """
+
+    PREFIX = 'llm_response:'
+    COUNTERS = ('hits', 'misses', 'stores', 'prompt_tokens_saved', 'completion_tokens_saved')
+
+    def __init__(self, alias: str = 'llm'):
+        self.alias = alias
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        normalized = [[m.get('role', ''), ' '.join(str(m.get('content', '')).split())] for m in messages]
+        payload = json.dumps([model, normalized, temperature, max_tokens], ensure_ascii=False)
+        return LLMResponseCache.PREFIX + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _count(self, **amounts: int):
+        """Add to the shared counters in one atomic UPDATE (the row is created on first use)"""
+        from .models import LLMResponseCacheStats
+        try:
+            updated = LLMResponseCacheStats.objects.filter(pk=1).update(
+                **{counter: F(counter) + amount for counter, amount in amounts.items()}
+            )
+            if not updated:
+                LLMResponseCacheStats.objects.get_or_create(pk=1)
+                LLMResponseCacheStats.objects.filter(pk=1).update(
+                    **{counter: F(counter) + amount for counter, amount in amounts.items()}
+                )
+        except DatabaseError as e:
+            print(f"⚠ Could not update LLM cache counters: {e}")
+
+    def lookup(self, models, messages, temperature, max_tokens) -> Optional[str]:
+        """Return a cached answer to this prompt from any of the models, or None"""
+        for model in models:
+            entry = self.cache.get(self.make_key(model, messages, temperature, max_tokens))
+            if entry is None:
+                continue
+            usage = entry.get('usage') or {}
+            self._count(
+                hits=1,
+                prompt_tokens_saved=int(usage.get('prompt_tokens') or 0),
+                completion_tokens_saved=int(usage.get('completion_tokens') or 0)
+            )
+            print(f"LLM response cache hit ({model}), saved {usage.get('total_tokens') or 'unknown'} tokens")
+            return entry.get('content')
+        self._count(misses=1)
+        return None
+
+    def store_answer(self, model, messages, temperature, max_tokens, content, usage, ttl):
+        self.cache.set(
+            self.make_key(model, messages, temperature, max_tokens),
+            {'content': content, 'usage': usage},
+            timeout=ttl
+        )
+        self._count(stores=1)
+
+    def stats(self) -> Dict[str, Any]:
+        from .models import LLMResponseCacheStats
+        row = LLMResponseCacheStats.objects.filter(pk=1).values(*self.COUNTERS).first()
+        stats = {c: (row or {}).get(c, 0) for c in self.COUNTERS}
+        stats['calls_saved'] = stats['hits']
+        stats['tokens_saved'] = stats['prompt_tokens_saved'] + stats['completion_tokens_saved']
+        return stats
+
+
+response_cache = LLMResponseCache()
+
+# Global client instance
+openrouter_client = LLMClient(
+    os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
+    api_key=os.getenv('OPENROUTER_API_KEY', ''),
+    extra_headers={
+        'HTTP-Referer': 'https://selectra-ai.com',
+        'X-Title': 'Selectra AI Interviews',
+    },
+    pool_size=int(os.getenv('LLM_POOL_SIZE', '10')),
+    connect_timeout=float(os.getenv('LLM_CONNECT_TIMEOUT', '5')),
+    read_timeout=float(os.getenv('LLM_READ_TIMEOUT', '30')),
+    total_timeout=float(os.getenv('LLM_TOTAL_TIMEOUT', '90')),
+    max_retries=int(os.getenv('LLM_MAX_RETRIES', '2')),
+    cache=response_cache,
+    telemetry=llm_telemetry
+)
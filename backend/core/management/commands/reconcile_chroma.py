@@ -0,0 +1,171 @@
+"""
+Management command to reconcile Postgres applications with the ChromaDB store.
+
+Removes orphans (applications deleted or rejected in Django but still indexed in
+ChromaDB) and re-ingests applications that are missing from ChromaDB because a
+sync call in perform_create failed. Both sides are walked in fixed-size chunks,
+so memory use is bounded by --batch-size regardless of table size.
+
+Safe to run repeatedly (e.g. nightly):
+    python manage.py reconcile_chroma
+    python manage.py reconcile_chroma --dry-run
+"""
+
+import os
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Application
+from core.views import build_cv_text
+
+
+class Command(BaseCommand):
+    help = 'Remove orphaned applications from ChromaDB and re-ingest missing ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of IDs fetched, deleted or re-ingested per request (default: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the differences without deleting or re-ingesting anything',
+        )
+        parser.add_argument(
+            '--keep-rejected',
+            action='store_true',
+            help='Do not remove rejected applications from ChromaDB',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=30,
+            help='Timeout in seconds for each Flask service request (default: 30)',
+        )
+
+    def _post(self, path, payload):
+        response = self.session.post(f"{self.flask_url}{path}", json=payload, timeout=self.timeout)
+        if response.status_code >= 400:
+            raise CommandError(f"{path} failed - HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def remove_orphans(self, batch_size, dry_run, keep_rejected):
+        """
+        Page through ChromaDB application IDs and delete the ones whose Django row
+        is gone (or rejected). Returns (scanned, removed).
+        """
+        live_rows = Application.objects.all()
+        if not keep_rejected:
+            live_rows = live_rows.exclude(status='rejected')
+
+        scanned = removed = 0
+        offset = 0
+        while True:
+            ids = self._post('/applications/ids', {'offset': offset, 'limit': batch_size}).get('ids', [])
+            if not ids:
+                break
+            scanned += len(ids)
+
+            # Only numeric IDs are Django applications; parsed_* entries come from /parsed-cv
+            django_ids = {i: int(i) for i in ids if str(i).isdigit()}
+            live = set(live_rows.filter(id__in=django_ids.values()).values_list('id', flat=True))
+            orphans = [i for i, pk in django_ids.items() if pk not in live]
+
+            if orphans and not dry_run:
+                self._post('/applications/delete', {'ids': orphans})
+                # Deleted rows shift later pages back
+                offset += len(ids) - len(orphans)
+            else:
+                offset += len(ids)
+            removed += len(orphans)
+
+            if orphans:
+                self.stdout.write(f'  {"Would remove" if dry_run else "Removed"} {len(orphans)} orphaned applications')
+
+        return scanned, removed
+
+    def add_missing(self, batch_size, dry_run):
+        """
+        Walk Django applications in primary-key order and re-ingest the ones
+        ChromaDB does not have. Returns (checked, added, skipped).
+        """
+        candidates = (
+            Application.objects
+            .exclude(status='rejected')
+            .exclude(parsed_resume__isnull=True)
+            .select_related('job_post')
+            .order_by('id')
+        )
+
+        checked = added = skipped = 0
+        last_id = 0
+        while True:
+            chunk = list(candidates.filter(id__gt=last_id)[:batch_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            checked += len(chunk)
+
+            present = set(self._post('/applications/ids', {'ids': [str(a.id) for a in chunk]}).get('ids', []))
+            payload = []
+            for application in chunk:
+                if str(application.id) in present:
+                    continue
+                cv_text = build_cv_text(application.parsed_resume)
+                if not cv_text:
+                    skipped += 1
+                    continue
+                payload.append({
+                    'application_id': str(application.id),
+                    'cv_text': cv_text,
+                    'job_id': str(application.job_post.id) if application.job_post else None,
+                    'candidate_name': application.candidate_name,
+                    'candidate_email': application.candidate_email,
+                })
+
+            if not payload:
+                continue
+            if dry_run:
+                added += len(payload)
+            else:
+                result = self._post('/applications/batch', {'applications': payload})
+                added += len(result.get('saved', []))
+                for error in result.get('errors', []):
+                    skipped += 1
+                    self.stdout.write(
+                        self.style.ERROR(f"  Failed to re-ingest application {error.get('application_id')}: {error.get('error')}")
+                    )
+            self.stdout.write(f'  {"Would re-ingest" if dry_run else "Re-ingested"} {len(payload)} missing applications')
+
+        return checked, added, skipped
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        dry_run = options['dry_run']
+        self.timeout = options['timeout']
+        self.flask_url = os.getenv('FLASK_AI_SERVICE_URL', 'http://localhost:5000').rstrip('/')
+        # One keep-alive connection for every batch request
+        self.session = requests.Session()
+
+        self.stdout.write(self.style.SUCCESS(f'Reconciling applications with ChromaDB at {self.flask_url}...'))
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Running in DRY-RUN mode. No changes will be made.'))
+
+        try:
+            self.stdout.write('\nRemoving orphaned applications from ChromaDB...')
+            scanned, removed = self.remove_orphans(batch_size, dry_run, options['keep_rejected'])
+
+            self.stdout.write('\nRe-ingesting applications missing from ChromaDB...')
+            checked, added, skipped = self.add_missing(batch_size, dry_run)
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f'Could not reach Flask AI service at {self.flask_url}: {e}')
+        finally:
+            self.session.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nReconciliation {"dry run " if dry_run else ""}complete: '
+            f'scanned {scanned} ChromaDB entries, checked {checked} Django applications, '
+            f'removed {removed}, added {added}, skipped {skipped}'
+        ))
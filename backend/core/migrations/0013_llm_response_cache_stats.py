@@ -0,0 +1,34 @@
+"""
+Migration to add the LLM response cache counters table.
+
+A single row of hit/miss/store and tokens-saved counters shared by all workers.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_add_recording_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMResponseCacheStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hits', models.BigIntegerField(default=0)),
+                ('misses', models.BigIntegerField(default=0)),
+                ('stores', models.BigIntegerField(default=0)),
+                ('prompt_tokens_saved', models.BigIntegerField(default=0)),
+                ('completion_tokens_saved', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'LLM Response Cache Stats',
+                'verbose_name_plural': 'LLM Response Cache Stats',
+                'db_table': 'llm_response_cache_stats',
+            },
+        ),
+    ]
@@ -200,3 +200,24 @@ class Interview(models.Model):
     
     def __str__(self):
         return f"Interview for {self.application.candidate_name} - {self.status}"
+
+
+class LLMResponseCacheStats(models.Model):
+    """
+    Counters for the LLM response cache (a single row). Updated with F()
+    expressions, so increments from every worker are atomic.
+    """
+    hits = models.BigIntegerField(default=0)
+    misses = models.BigIntegerField(default=0)
+    stores = models.BigIntegerField(default=0)
+    prompt_tokens_saved = models.BigIntegerField(default=0)
+    completion_tokens_saved = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'llm_response_cache_stats'
+        verbose_name = 'LLM Response Cache Stats'
+        verbose_name_plural = 'LLM Response Cache Stats'
+    
+    def __str__(self):
+        return f"LLM cache: {self.hits} hits, {self.misses} misses"
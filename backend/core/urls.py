@@ -8,6 +8,7 @@ from .views import (
     save_interview_results,
     get_interview_results,
     upload_interview_recordings,
+    llm_metrics,
 )
 from .cv_api import parse_cv_api, parse_cv_text, test_cv_endpoint
 
@@ -25,4 +26,5 @@ urlpatterns = [
     path('interview-results/', save_interview_results, name='save-interview-results'),
     path('interview-results/<str:interview_token>/', get_interview_results, name='get-interview-results'),
     path('interview-recordings/', upload_interview_recordings, name='upload-interview-recordings'),
+    path('llm-metrics/', llm_metrics, name='llm-metrics'),
 ]
@@ -12,6 +12,8 @@ import json
 import uuid
 from .models import OrganizationDetails, JobPost, Application, Interview
 from .cv_parser import cv_parser
+from selectra_llm import llm_telemetry
+from .llm_client import response_cache
 from .email_service import send_interview_invitation_email, send_rejection_email
 from .serializers import (
     OrganizationDetailsSerializer,
@@ -30,6 +32,11 @@ from .serializers import (
 
 User = get_user_model()
 
+# Calls to the Flask AI service; the deadline header lets it stop work this
+# side has already given up waiting for
+FLASK_TIMEOUT = 10
+FLASK_DEADLINE_HEADERS = {'X-Request-Deadline-Ms': str(FLASK_TIMEOUT * 1000)}
+
 
 def get_application_by_interview_token(interview_token):
     """Resolve interview token to an application using exact token match from interview_link."""
@@ -61,7 +68,8 @@ def calculate_similarity_score(cv_text, job_description, job_id=None):
         job_response = requests.post(
             f'{flask_url}/job',
             json=job_payload,
-            timeout=10
+            timeout=FLASK_TIMEOUT,
+            headers=FLASK_DEADLINE_HEADERS
         )
         
         print(f"Job creation response status: {job_response.status_code}")
@@ -79,7 +87,8 @@ def calculate_similarity_score(cv_text, job_description, job_id=None):
         compare_response = requests.post(
             f'{flask_url}/compare/{flask_job_id}',
             json={'cv': cv_text},
-            timeout=10
+            timeout=FLASK_TIMEOUT,
+            headers=FLASK_DEADLINE_HEADERS
         )
         
         print(f"Comparison response status: {compare_response.status_code}")
@@ -106,6 +115,48 @@ def calculate_similarity_score(cv_text, job_description, job_id=None):
         return None
 
 
+def build_cv_text(parsed_data):
+    """Build a plain-text CV representation from parsed resume data."""
+    if not parsed_data:
+        return ''
+    
+    cv_text_parts = []
+    
+    if parsed_data.get('summary'):
+        cv_text_parts.append(parsed_data['summary'])
+    
+    if parsed_data.get('skills'):
+        skills = parsed_data['skills']
+        if isinstance(skills, list):
+            cv_text_parts.append(' '.join(skills))
+        elif isinstance(skills, str):
+            cv_text_parts.append(skills)
+    
+    if parsed_data.get('experience'):
+        exp = parsed_data['experience']
+        if isinstance(exp, list):
+            for e in exp:
+                if isinstance(e, dict):
+                    cv_text_parts.append(f"{e.get('title', '')} at {e.get('company', '')}. {e.get('description', '')}")
+                else:
+                    cv_text_parts.append(str(e))
+        elif isinstance(exp, str):
+            cv_text_parts.append(exp)
+    
+    if parsed_data.get('education'):
+        edu = parsed_data['education']
+        if isinstance(edu, list):
+            for e in edu:
+                if isinstance(e, dict):
+                    cv_text_parts.append(f"{e.get('degree', '')} from {e.get('institution', '')}")
+                else:
+                    cv_text_parts.append(str(e))
+        elif isinstance(edu, str):
+            cv_text_parts.append(edu)
+    
+    return ' '.join(cv_text_parts)
+
+
 def generate_interview_link(application):
     """
     Generate a unique interview link for an application if similarity score >= 40%.
@@ -207,7 +258,8 @@ class JobPostViewSet(viewsets.ModelViewSet):
                     'description': job.job_description,
                     'job_id': str(job.id)  # Send Django job ID
                 },
-                timeout=10
+                timeout=FLASK_TIMEOUT,
+                headers=FLASK_DEADLINE_HEADERS
             )
             
             if response.status_code == 201:
@@ -343,43 +395,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             print(f"\n=== Starting similarity calculation for application {application.id} ===")
             try:
                 # Extract CV text from parsed resume
-                parsed_data = application.parsed_resume
-                cv_text_parts = []
-                
-                # Build a text representation of the CV
-                if parsed_data.get('summary'):
-                    cv_text_parts.append(parsed_data['summary'])
-                
-                if parsed_data.get('skills'):
-                    skills = parsed_data['skills']
-                    if isinstance(skills, list):
-                        cv_text_parts.append(' '.join(skills))
-                    elif isinstance(skills, str):
-                        cv_text_parts.append(skills)
-                
-                if parsed_data.get('experience'):
-                    exp = parsed_data['experience']
-                    if isinstance(exp, list):
-                        for e in exp:
-                            if isinstance(e, dict):
-                                cv_text_parts.append(f"{e.get('title', '')} at {e.get('company', '')}. {e.get('description', '')}")
-                            else:
-                                cv_text_parts.append(str(e))
-                    elif isinstance(exp, str):
-                        cv_text_parts.append(exp)
-                
-                if parsed_data.get('education'):
-                    edu = parsed_data['education']
-                    if isinstance(edu, list):
-                        for e in edu:
-                            if isinstance(e, dict):
-                                cv_text_parts.append(f"{e.get('degree', '')} from {e.get('institution', '')}")
-                            else:
-                                cv_text_parts.append(str(e))
-                    elif isinstance(edu, str):
-                        cv_text_parts.append(edu)
-                
-                cv_text = ' '.join(cv_text_parts)
+                cv_text = build_cv_text(application.parsed_resume)
                 job_description = application.job_post.job_description
                 job_id = application.job_post.id
                 
@@ -458,7 +474,8 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                             'description': application.job_post.job_description,
                             'job_id': str(application.job_post.id)
                         },
-                        timeout=10
+                        timeout=FLASK_TIMEOUT,
+                        headers=FLASK_DEADLINE_HEADERS
                     )
                     if job_response.status_code in [201, 409]:
                         print(f"✓ Job {application.job_post.id} available on Flask")
@@ -472,42 +489,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             
             if application.parsed_resume:
                 # Build CV text from parsed data
-                parsed_data = application.parsed_resume
-                cv_text_parts = []
-                
-                if parsed_data.get('summary'):
-                    cv_text_parts.append(parsed_data['summary'])
-                
-                if parsed_data.get('skills'):
-                    skills = parsed_data['skills']
-                    if isinstance(skills, list):
-                        cv_text_parts.append(' '.join(skills))
-                    elif isinstance(skills, str):
-                        cv_text_parts.append(skills)
-                
-                if parsed_data.get('experience'):
-                    exp = parsed_data['experience']
-                    if isinstance(exp, list):
-                        for e in exp:
-                            if isinstance(e, dict):
-                                cv_text_parts.append(f"{e.get('title', '')} at {e.get('company', '')}. {e.get('description', '')}")
-                            else:
-                                cv_text_parts.append(str(e))
-                    elif isinstance(exp, str):
-                        cv_text_parts.append(exp)
-                
-                if parsed_data.get('education'):
-                    edu = parsed_data['education']
-                    if isinstance(edu, list):
-                        for e in edu:
-                            if isinstance(e, dict):
-                                cv_text_parts.append(f"{e.get('degree', '')} from {e.get('institution', '')}")
-                            else:
-                                cv_text_parts.append(str(e))
-                    elif isinstance(edu, str):
-                        cv_text_parts.append(edu)
-                
-                cv_text = ' '.join(cv_text_parts)
+                cv_text = build_cv_text(application.parsed_resume)
             
             if cv_text:
                 print(f"CV text length: {len(cv_text)} characters")
@@ -521,7 +503,8 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                         'candidate_name': application.candidate_name,
                         'candidate_email': application.candidate_email
                     },
-                    timeout=10
+                    timeout=FLASK_TIMEOUT,
+                    headers=FLASK_DEADLINE_HEADERS
                 )
                 
                 if response.status_code == 201:
@@ -1095,3 +1078,17 @@ def upload_interview_recordings(request):
             {'error': f'Failed to upload recordings: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def llm_metrics(request):
+    """
+    LLM call telemetry for this worker (CV parsing): calls, latency, tokens,
+    cost, outcomes and fallback depth per call site and per model, plus the
+    response cache's calls and tokens saved (shared by all workers).
+    """
+    return Response({
+        **llm_telemetry.snapshot(),
+        'response_cache': response_cache.stats()
+    }, status=status.HTTP_200_OK)
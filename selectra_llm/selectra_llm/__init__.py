@@ -0,0 +1,12 @@
+"""
+Shared LLM client and call telemetry used by the AI service (AI_Services_Flask_App) and the
+Django backend. Each service builds its own client instances and wires in
+its own response cache, health registry and request deadline.
+"""
+from .client import LLMClient, LLMError, JsonStringFieldStreamer, extract_json, RETRYABLE_STATUS
+from .telemetry import LLMTelemetry, llm_telemetry
+
+__all__ = [
+    'LLMClient', 'LLMError', 'JsonStringFieldStreamer', 'extract_json', 'RETRYABLE_STATUS',
+    'LLMTelemetry', 'llm_telemetry'
+]
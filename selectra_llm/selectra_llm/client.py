@@ -0,0 +1,724 @@
+"""
+LLM client for OpenAI-compatible chat completion APIs (OpenRouter, Ollama)
+One pooled keep-alive session per endpoint, bounded retries with jittered
+backoff on 429/5xx, per-attempt and total timeouts, and a single JSON
+extraction routine for model output. Shared by the AI service and the Django
+backend; each service wires in its own health registry, response cache and
+request deadline.
+"""
+import re
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from .telemetry import LLMTelemetry, OK, INVALID, ERROR, TIMEOUT, CANCELLED
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """A chat completion failed; `retryable` is True for transient failures"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = False,
+                 retry_after: Optional[str] = None, timed_out: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.timed_out = timed_out
+
+
+def _strip_code_fences(text: str) -> str:
+    cleaned = text.strip()
+    if cleaned.startswith('```json'):
+        cleaned = cleaned[7:]
+    elif cleaned.startswith('```'):
+        cleaned = cleaned[3:]
+    if cleaned.endswith('```'):
+        cleaned = cleaned[:-3]
+    return cleaned.strip()
+
+
+def extract_json(text: Optional[str]) -> Dict[str, Any]:
+    """
+    Parse the JSON object in an LLM response. Handles markdown code fences and
+    prose around the object; returns {} when no object can be parsed.
+    """
+    if not text:
+        return {}
+    cleaned = _strip_code_fences(text)
+    try:
+        data = json.loads(cleaned)
+        return data if isinstance(data, dict) else {}
+    except json.JSONDecodeError:
+        pass
+
+    # Decode from each '{' until one yields a complete object
+    decoder = json.JSONDecoder()
+    start = cleaned.find('{')
+    while start != -1:
+        try:
+            data, _ = decoder.raw_decode(cleaned, start)
+            if isinstance(data, dict):
+                return data
+        except json.JSONDecodeError:
+            pass
+        start = cleaned.find('{', start + 1)
+    return {}
+
+
+class JsonStringFieldStreamer:
+    """
+    Incrementally decodes one top-level string field (e.g. "question") from a
+    JSON object that arrives in chunks, so its text can be shown before the
+    rest of the object has been generated.
+    """
+
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ''
+        self._pos: Optional[int] = None  # index of the next undecoded value character
+        self.value = ''
+        self.complete = False
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of model output; returns the newly decoded part of the field value"""
+        if self.complete:
+            return ''
+        self._buffer += chunk
+        if self._pos is None:
+            match = self._key.search(self._buffer)
+            if not match:
+                return ''
+            self._pos = match.end()
+
+        decoded = []
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '"':
+                self.complete = True
+                pos += 1
+                break
+            if char != '\\':
+                decoded.append(char)
+                pos += 1
+                continue
+            # Escape sequence: wait until it has fully arrived
+            if pos + 1 >= len(buffer):
+                break
+            escape = buffer[pos + 1]
+            if escape == 'u':
+                if pos + 6 > len(buffer):
+                    break
+                try:
+                    decoded.append(chr(int(buffer[pos + 2:pos + 6], 16)))
+                except ValueError:
+                    pass
+                pos += 6
+            else:
+                decoded.append(self._ESCAPES.get(escape, escape))
+                pos += 2
+        self._pos = pos
+        text = ''.join(decoded)
+        self.value += text
+        return text
+
+
+class LLMClient:
+    """Pooled chat-completions client with retries and timeouts"""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str = '',
+        extra_headers: Optional[Dict[str, str]] = None,
+        pool_size: int = 20,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        total_timeout: float = 60.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        health: Optional[Any] = None,
+        cache: Optional[Any] = None,
+        hedge_delay: Optional[float] = None,
+        hedge_quantile: float = 0.9,
+        hedge_workers: int = 16,
+        telemetry: Optional[LLMTelemetry] = None,
+        min_attempt_time: float = 1.0,
+        deadline_clamp: Optional[Callable[[float], float]] = None
+    ):
+        """
+        Args:
+            base_url: API root; requests go to {base_url}/chat/completions
+            api_key: Bearer token (optional for local endpoints)
+            pool_size: Keep-alive connections kept per host
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for a response, per attempt
+            total_timeout: Upper bound in seconds for one call across all retries and models
+                (cut short by deadline_clamp)
+            max_retries: Retries per model for 429/5xx and connection errors
+            backoff_base: First backoff delay in seconds (doubles per retry, full jitter)
+            backoff_max: Largest backoff delay in seconds
+            health: Optional registry used to skip unhealthy models and order the rest
+                (order, latency_quantile, record_success, record_failure)
+            cache: Optional response cache for call sites that pass cache_ttl
+                (lookup, store_answer)
+            hedge_delay: Enables hedging. Seconds to wait for a model before racing the
+                next one, used until the model has enough samples for its own quantile
+            hedge_quantile: Latency quantile of the running model used as the hedge delay
+            hedge_workers: Threads available to hedged calls
+            telemetry: Optional recorder for per-call and per-attempt latency, tokens and outcome
+            min_attempt_time: Seconds that must be left before the deadline to start an
+                attempt (or the model's median latency, if longer); otherwise it is skipped
+            deadline_clamp: Optional hook cutting a call's monotonic deadline short,
+                e.g. to the deadline of the request being served
+        """
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+        self.api_key = api_key
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.health = health
+        self.cache = cache
+        self.hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self.telemetry = telemetry
+        self.min_attempt_time = min_attempt_time
+        self.deadline_clamp = deadline_clamp
+        self._hedge_executor = (
+            ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix='llm-hedge')
+            if hedge_delay is not None else None
+        )
+
+        self.headers = {'Content-Type': 'application/json'}
+        if api_key:
+            self.headers['Authorization'] = f"Bearer {api_key}"
+        self.headers.update(extra_headers or {})
+
+        # requests.Session is shared by all threads; the adapter's urllib3 pool is thread-safe
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'calls': 0, 'attempts': 0, 'retries': 0, 'failures': 0,
+            'hedged_calls': 0, 'hedge_wins': 0, 'deadline_skips': 0
+        }
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _deadline(self) -> float:
+        """End of a new call: total_timeout from now, or the clamped deadline if sooner"""
+        deadline = time.monotonic() + self.total_timeout
+        return self.deadline_clamp(deadline) if self.deadline_clamp else deadline
+
+    def _attempt_budget(self, model: str) -> float:
+        """Shortest time left worth starting an attempt on model with"""
+        budget = self.min_attempt_time
+        if self.health:
+            observed = self.health.latency_quantile(model, 0.5)
+            if observed is not None:
+                budget = max(budget, observed)
+        return budget
+
+    def _skip(self, model: str, remaining: float) -> str:
+        """Record that model was not tried because too little time was left; returns the reason"""
+        self._count('deadline_skips')
+        reason = f"Skipped {model}: {max(remaining, 0):.1f}s left before the deadline"
+        print(f"⚠ {reason}")
+        return reason
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _attempt(self, payload: Dict[str, Any], timeout: float) -> Tuple[str, Dict[str, Any]]:
+        """One HTTP round trip returning (content, usage); raises LLMError on any failure"""
+        self._count('attempts')
+        try:
+            response = self.session.post(
+                self.url,
+                headers=self.headers,
+                json=payload,
+                timeout=(min(self.connect_timeout, timeout), timeout)
+            )
+        except requests.exceptions.RequestException as e:
+            raise LLMError(f"Request error: {str(e)[:100]}", retryable=True,
+                           timed_out=isinstance(e, requests.exceptions.Timeout))
+
+        try:
+            result_data = response.json()
+        except ValueError:
+            result_data = {}
+        if not isinstance(result_data, dict):
+            result_data = {}
+
+        if response.status_code != 200 or 'error' in result_data:
+            error = result_data.get('error') if isinstance(result_data.get('error'), dict) else {}
+            message = error.get('message') or f"HTTP {response.status_code}"
+            raise LLMError(
+                message,
+                status=response.status_code,
+                retryable=response.status_code in RETRYABLE_STATUS,
+                retry_after=response.headers.get('Retry-After')
+            )
+
+        choices = result_data.get('choices') or []
+        if not choices:
+            raise LLMError("No choices in response")
+        content = (choices[0].get('message') or {}).get('content') or ''
+        return content.strip(), result_data.get('usage') or {}
+
+    def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        deadline: Optional[float] = None,
+        cancelled: Optional[threading.Event] = None,
+        site: str = 'chat'
+    ) -> str:
+        """
+        Run one chat completion against `model`, retrying transient failures.
+
+        Args:
+            deadline: time.monotonic() value the call must finish by
+                (defaults to now + total_timeout, or the clamped deadline if sooner)
+            cancelled: Set when the answer is no longer needed (a hedge won);
+                no further attempts are made
+            site: Call site name the telemetry is aggregated under
+
+        Returns:
+            The message content (stripped)
+
+        Raises:
+            LLMError: when the model fails or the deadline is exhausted
+        """
+        trace = self.telemetry.start_call(site, [model]) if self.telemetry else None
+        try:
+            content = self._chat(model, messages, temperature, max_tokens, deadline, cancelled, trace=trace)[0]
+        except LLMError:
+            self._record_call(trace, 'failed')
+            raise
+        self._record_call(trace, OK, model, 0)
+        return content
+
+    def _record_attempt(self, trace, model, depth, attempt, queue_wait, latency, outcome, messages,
+                        usage=None, content=None, error: Optional[LLMError] = None, hedge=False):
+        if trace is None:
+            return
+        self.telemetry.record_attempt(
+            trace, model, depth, attempt, queue_wait, latency, outcome,
+            usage=usage, messages=messages, content=content,
+            status=error.status if error else None, error=str(error) if error else None, hedge=hedge
+        )
+
+    def _record_call(self, trace, outcome, model=None, depth=None, cache_hit=False):
+        if trace is not None:
+            self.telemetry.record_call(trace, outcome, model, depth, cache_hit)
+
+    def _chat(self, model, messages, temperature, max_tokens, deadline=None, cancelled=None, validate=None,
+              trace=None, depth=0, queued_at=None, hedge=False) -> Tuple[str, Dict[str, Any]]:
+        """
+        chat() returning (content, usage). A reply rejected by validate fails
+        the model without a retry. Every HTTP attempt is recorded on trace, with
+        the time it waited (for a hedge worker or a retry backoff) since due.
+        """
+        if deadline is None:
+            deadline = self._deadline()
+        payload = {
+            'model': model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }
+
+        due = queued_at if queued_at is not None else time.monotonic()
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMError("Deadline exceeded", retryable=True, timed_out=True)
+            if cancelled is not None and cancelled.is_set():
+                raise LLMError("Cancelled")
+            sent = time.monotonic()
+            try:
+                content, usage = self._attempt(payload, min(self.read_timeout, remaining))
+            except LLMError as e:
+                outcome = CANCELLED if cancelled is not None and cancelled.is_set() else (TIMEOUT if e.timed_out else ERROR)
+                self._record_attempt(trace, model, depth, attempt, sent - due, time.monotonic() - sent, outcome,
+                                     messages, error=e, hedge=hedge)
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e.retry_after)
+                # Only retry if the retry could still finish in time
+                if deadline - (time.monotonic() + delay) < self._attempt_budget(model):
+                    raise
+                print(f"⚠ Model {model} failed ({e}), retrying in {delay:.1f}s")
+                self._count('retries')
+                due = time.monotonic()
+                if cancelled is not None:
+                    if cancelled.wait(delay):
+                        raise LLMError("Cancelled")
+                else:
+                    time.sleep(delay)
+                attempt += 1
+                continue
+
+            valid = not validate or validate(content)
+            if cancelled is not None and cancelled.is_set():
+                outcome = CANCELLED
+            else:
+                outcome = OK if valid else INVALID
+            self._record_attempt(trace, model, depth, attempt, sent - due, time.monotonic() - sent, outcome,
+                                 messages, usage=usage, content=content, hedge=hedge)
+            if not valid:
+                raise LLMError("Response failed validation")
+            return content, usage
+
+    def complete(
+        self,
+        models: List[str],
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        validate: Optional[Callable[[str], bool]] = None,
+        cache_ttl: Optional[float] = None,
+        site: str = 'unknown'
+    ) -> Optional[str]:
+        """
+        Try each model in order until one answers, within one total timeout
+        (or what deadline_clamp leaves of it). With a health registry, models
+        whose circuit is open are skipped and the rest are tried fastest/most
+        reliable first; a model is also skipped when the time left is shorter
+        than its median latency.
+
+        Args:
+            validate: Optional check on the content; a rejected answer counts
+                as a failure and the next model is tried
+            cache_ttl: Opt in to the response cache for this call site: a previous
+                answer to the same prompt (from any of the models) is replayed, and a
+                new answer is stored for this many seconds
+            site: Call site name the telemetry is aggregated under
+
+        Returns:
+            The first successful message content, or None if every model failed
+        """
+        self._count('calls')
+        deadline = self._deadline()
+        trace = self.telemetry.start_call(site, models) if self.telemetry else None
+
+        use_cache = bool(cache_ttl) and self.cache is not None
+        if use_cache:
+            cached = self.cache.lookup(models, messages, temperature, max_tokens)
+            if cached is not None:
+                self._record_call(trace, 'cache_hit', cache_hit=True)
+                return cached
+
+        if self.health:
+            models = self.health.order(models)
+            if not models:
+                print("All models failed. Last error: Every model circuit is open")
+                self._count('failures')
+                self._record_call(trace, 'failed')
+                return None
+
+        if self._hedge_executor is not None and len(models) > 1:
+            answer, last_error = self._complete_hedged(models, messages, temperature, max_tokens, validate, deadline, trace)
+        else:
+            answer, last_error = self._complete_sequential(models, messages, temperature, max_tokens, validate, deadline, trace)
+        if answer is not None:
+            model, content, usage = answer
+            if use_cache:
+                self.cache.store_answer(model, messages, temperature, max_tokens, content, usage, cache_ttl)
+            self._record_call(trace, OK, model, models.index(model))
+            return content
+
+        print(f"All models failed. Last error: {last_error}")
+        self._count('failures')
+        self._record_call(trace, 'failed')
+        return None
+
+    def _run_model(self, model, messages, temperature, max_tokens, validate, deadline, cancelled=None,
+                   trace=None, depth=0, queued_at=None, hedge=False):
+        """
+        chat() plus validation and health bookkeeping. Returns (model, content, usage);
+        raises LLMError on failure.
+        """
+        started = time.monotonic()
+        try:
+            result, usage = self._chat(
+                model, messages, temperature, max_tokens, deadline, cancelled, validate,
+                trace=trace, depth=depth, queued_at=queued_at, hedge=hedge
+            )
+        except LLMError as e:
+            # A hedge loser that was called off says nothing about the model's health
+            if self.health and not (cancelled is not None and cancelled.is_set()):
+                self.health.record_failure(model)
+            raise
+        if self.health:
+            self.health.record_success(model, time.monotonic() - started)
+        return model, result, usage
+
+    def _complete_sequential(self, models, messages, temperature, max_tokens, validate, deadline, trace=None):
+        last_error = None
+        for depth, model in enumerate(models):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                last_error = "Total timeout exceeded"
+                break
+            if remaining < self._attempt_budget(model):
+                last_error = self._skip(model, remaining)
+                continue
+            try:
+                answer = self._run_model(model, messages, temperature, max_tokens, validate, deadline,
+                                         trace=trace, depth=depth)
+                return answer, None
+            except LLMError as e:
+                print(f"Model {model} failed - {e}")
+                last_error = str(e)
+        return None, last_error
+
+    def _hedge_delay_for(self, model: str) -> float:
+        """The running model's observed latency quantile, else the configured delay"""
+        if self.health:
+            observed = self.health.latency_quantile(model, self.hedge_quantile)
+            if observed is not None:
+                return min(max(observed, 0.05), self.read_timeout)
+        return self.hedge_delay
+
+    def _complete_hedged(self, models, messages, temperature, max_tokens, validate, deadline, trace=None):
+        """
+        Start the first model; if it has not answered within its hedge delay, race
+        the next one with the same prompt. The first valid answer wins and the
+        other call is told to stop. A model that fails outright is replaced by
+        the next one immediately, as in the sequential path, and models that
+        could not answer in the time left are skipped.
+        """
+        remaining_models = list(models)
+        cancelled = threading.Event()
+        pending = {}
+        hedge_futures = set()
+        skipped = []
+        hedged = False
+
+        def launch(as_hedge=False):
+            """Start the next model with enough time left; returns its hedge time, None if none started"""
+            while remaining_models:
+                depth = len(models) - len(remaining_models)
+                model = remaining_models.pop(0)
+                remaining = deadline - time.monotonic()
+                if remaining < self._attempt_budget(model):
+                    skipped.append(self._skip(model, remaining))
+                    continue
+                future = self._hedge_executor.submit(
+                    self._run_model, model, messages, temperature, max_tokens, validate, deadline, cancelled,
+                    trace, depth, time.monotonic(), as_hedge
+                )
+                pending[future] = model
+                if as_hedge:
+                    hedge_futures.add(future)
+                return time.monotonic() + self._hedge_delay_for(model)
+            return None
+
+        hedge_at = launch()
+        last_error = skipped[-1] if skipped else None
+
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    last_error = "Total timeout exceeded"
+                    break
+                can_hedge = not hedged and remaining_models
+                timeout = deadline - now
+                if can_hedge:
+                    timeout = min(timeout, max(0.0, hedge_at - now))
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    if can_hedge and time.monotonic() >= hedge_at:
+                        hedged = True
+                        self._count('hedged_calls')
+                        launch(as_hedge=True)
+                    continue
+
+                for future in done:
+                    model = pending.pop(future)
+                    try:
+                        answer = future.result()
+                    except LLMError as e:
+                        print(f"Model {model} failed - {e}")
+                        last_error = str(e)
+                        continue
+                    if future in hedge_futures:
+                        self._count('hedge_wins')
+                    return answer, None
+
+                # Everything in flight failed: fall through to the next model
+                if not pending and remaining_models:
+                    hedge_at = launch()
+        finally:
+            cancelled.set()
+        return None, last_error
+
+    def _open_stream(self, payload: Dict[str, Any], timeout: float) -> requests.Response:
+        self._count('attempts')
+        try:
+            response = self.session.post(
+                self.url,
+                headers={**self.headers, 'Accept': 'text/event-stream'},
+                json={**payload, 'stream': True},
+                timeout=(min(self.connect_timeout, timeout), timeout),
+                stream=True
+            )
+        except requests.exceptions.RequestException as e:
+            raise LLMError(f"Request error: {str(e)[:100]}", retryable=True,
+                           timed_out=isinstance(e, requests.exceptions.Timeout))
+        if response.status_code != 200:
+            try:
+                error = response.json().get('error') or {}
+            except (ValueError, AttributeError):
+                error = {}
+            response.close()
+            message = (error.get('message') if isinstance(error, dict) else None) or f"HTTP {response.status_code}"
+            raise LLMError(message, status=response.status_code, retryable=response.status_code in RETRYABLE_STATUS)
+        return response
+
+    @staticmethod
+    def _iter_deltas(response: requests.Response, usage: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Content deltas from an OpenAI-compatible SSE stream; a usage block, if sent, is copied into usage"""
+        for raw_line in response.iter_lines():
+            line = raw_line.decode('utf-8', errors='replace').strip() if raw_line else ''
+            # Blank lines separate events; ':' lines are keep-alive comments
+            if not line.startswith('data:'):
+                continue
+            data = line[5:].strip()
+            if data == '[DONE]':
+                return
+            try:
+                event = json.loads(data)
+            except json.JSONDecodeError:
+                continue
+            if event.get('error'):
+                error = event['error']
+                raise LLMError(error.get('message', 'Stream error') if isinstance(error, dict) else str(error))
+            if usage is not None and isinstance(event.get('usage'), dict):
+                usage.update(event['usage'])
+            choices = event.get('choices') or []
+            if choices:
+                content = (choices[0].get('delta') or {}).get('content')
+                if content:
+                    yield content
+
+    def stream(
+        self,
+        models: List[str],
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        site: str = 'unknown'
+    ) -> Iterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+        Models are tried in routing order until one starts streaming; once
+        content has been yielded the model cannot be switched, so a mid-stream
+        failure raises LLMError.
+        """
+        self._count('calls')
+        deadline = self._deadline()
+        trace = self.telemetry.start_call(site, models, streaming=True) if self.telemetry else None
+        if self.health:
+            models = self.health.order(models)
+        payload = {
+            'model': None,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }
+        last_error = "Every model circuit is open" if not models else None
+
+        for depth, model in enumerate(models):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                last_error = "Total timeout exceeded"
+                break
+            if remaining < self._attempt_budget(model):
+                last_error = self._skip(model, remaining)
+                continue
+            started = time.monotonic()
+            yielded = False
+            chunks: List[str] = []
+            usage: Dict[str, Any] = {}
+            try:
+                response = self._open_stream({**payload, 'model': model}, min(self.read_timeout, remaining))
+                try:
+                    for delta in self._iter_deltas(response, usage):
+                        yielded = True
+                        chunks.append(delta)
+                        yield delta
+                finally:
+                    response.close()
+                if not yielded:
+                    raise LLMError("Empty stream")
+            except GeneratorExit:
+                # The consumer stopped reading (e.g. the client disconnected)
+                self._record_attempt(trace, model, depth, 0, 0.0, time.monotonic() - started, CANCELLED,
+                                     messages, usage=usage, content=''.join(chunks))
+                self._record_call(trace, CANCELLED, model)
+                raise
+            except (LLMError, requests.exceptions.RequestException) as e:
+                print(f"Model {model} failed - {e}")
+                last_error = str(e)
+                timed_out = getattr(e, 'timed_out', False) or isinstance(e, requests.exceptions.Timeout)
+                self._record_attempt(trace, model, depth, 0, 0.0, time.monotonic() - started,
+                                     TIMEOUT if timed_out else ERROR, messages, usage=usage,
+                                     content=''.join(chunks), error=e if isinstance(e, LLMError) else LLMError(str(e)))
+                if self.health:
+                    self.health.record_failure(model)
+                if yielded:
+                    self._count('failures')
+                    self._record_call(trace, 'failed', model)
+                    raise LLMError(f"Stream from {model} broke off: {last_error}")
+                continue
+            self._record_attempt(trace, model, depth, 0, 0.0, time.monotonic() - started, OK,
+                                 messages, usage=usage, content=''.join(chunks))
+            self._record_call(trace, OK, model, depth)
+            if self.health:
+                self.health.record_success(model, time.monotonic() - started)
+            return
+
+        print(f"All models failed. Last error: {last_error}")
+        self._count('failures')
+        self._record_call(trace, 'failed')
+        raise LLMError(f"All models failed. Last error: {last_error}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['hedging'] = self._hedge_executor is not None
+        stats['hedge_rate'] = round(stats['hedged_calls'] / stats['calls'], 4) if stats['calls'] else 0.0
+        stats['hedge_win_rate'] = (
+            round(stats['hedge_wins'] / stats['hedged_calls'], 4) if stats['hedged_calls'] else 0.0
+        )
+        return stats
@@ -0,0 +1,327 @@
+"""
+LLM call telemetry
+Every chat completion attempt is recorded with its call site, model, attempt
+index, fallback depth, queue wait, latency, token usage and outcome, and every
+call with its end-to-end latency and winning model. Records are aggregated in
+memory per call site and per model (served by /metrics/llm in the AI service and
+/api/core/llm-metrics/ in the backend) and can also be appended to a JSONL file
+for offline analysis. Each process records into its own llm_telemetry.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+# Attempt outcomes
+OK = 'ok'
+INVALID = 'invalid'
+ERROR = 'error'
+TIMEOUT = 'timeout'
+CANCELLED = 'cancelled'
+OUTCOMES = (OK, INVALID, ERROR, TIMEOUT, CANCELLED)
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _load_prices(raw: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """
+    LLM_MODEL_PRICES: JSON of USD per million tokens, e.g.
+    {"anthropic/claude-3-haiku": {"prompt": 0.25, "completion": 1.25}}
+    """
+    if not raw:
+        return {}
+    try:
+        prices = json.loads(raw)
+    except ValueError:
+        print("⚠ LLM_MODEL_PRICES is not valid JSON, costs will only come from usage")
+        return {}
+    return {
+        model: {'prompt': float(price.get('prompt', 0)), 'completion': float(price.get('completion', 0))}
+        for model, price in prices.items() if isinstance(price, dict)
+    }
+
+
+class _Aggregate:
+    """Rolling latency window plus running totals for one call site or model"""
+
+    def __init__(self, window_size: int):
+        self.latencies: "deque[float]" = deque(maxlen=window_size)
+        self.queue_waits: "deque[float]" = deque(maxlen=window_size)
+        self.counts: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_usage = 0
+        self.cost_usd = 0.0
+        self.unpriced = 0
+
+    def add_usage(self, prompt_tokens: int, completion_tokens: int, estimated: bool, cost: Optional[float]):
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.estimated_usage += int(estimated)
+        if cost is None:
+            self.unpriced += int(bool(prompt_tokens or completion_tokens))
+        else:
+            self.cost_usd += cost
+
+    def count(self, key: str):
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def usage_view(self) -> Dict[str, Any]:
+        return {
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'estimated_usage': self.estimated_usage,
+            'cost_usd': round(self.cost_usd, 6),
+            'unpriced_attempts': self.unpriced
+        }
+
+    def latency_view(self, prefix: str, values: "deque[float]") -> Dict[str, Any]:
+        values = list(values)
+        return {
+            f'{prefix}_p50_ms': round(_percentile(values, 0.5) * 1000) if values else None,
+            f'{prefix}_p95_ms': round(_percentile(values, 0.95) * 1000) if values else None,
+        }
+
+
+class LLMTelemetry:
+    """Thread-safe recorder for LLM calls and attempts, shared by every LLMClient in the process"""
+
+    def __init__(
+        self,
+        window_size: int = 500,
+        jsonl_path: Optional[str] = None,
+        prices: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        """
+        Args:
+            window_size: Recent calls/attempts the latency percentiles are computed over
+            jsonl_path: Optional file every call and attempt record is appended to
+            prices: USD per million prompt/completion tokens per model, used when the
+                response usage carries no cost (models ending in ':free' cost nothing)
+        """
+        self.window_size = window_size
+        self.jsonl_path = jsonl_path
+        self.prices = prices or {}
+        self._lock = threading.Lock()
+        self._sink_lock = threading.Lock()
+        self._sites: Dict[str, _Aggregate] = {}
+        self._models: Dict[str, _Aggregate] = {}
+        self._depths: Dict[str, Dict[int, int]] = {}
+        self._started_at = time.time()
+        self._sink = None
+        if jsonl_path:
+            directory = os.path.dirname(os.path.abspath(jsonl_path))
+            os.makedirs(directory, exist_ok=True)
+            self._sink = open(jsonl_path, 'a', buffering=1, encoding='utf-8')
+
+    def start_call(self, site: str, models: List[str], streaming: bool = False) -> Dict[str, Any]:
+        """New trace for one complete()/stream()/chat() call; passed to the record methods"""
+        return {
+            'call_id': uuid.uuid4().hex[:16],
+            'site': site or 'unknown',
+            'models': list(models),
+            'streaming': streaming,
+            'started': time.monotonic(),
+            'attempts': 0
+        }
+
+    def _cost(self, model: str, usage: Dict[str, Any], prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        if isinstance(usage.get('cost'), (int, float)):
+            return float(usage['cost'])
+        if model.endswith(':free'):
+            return 0.0
+        price = self.prices.get(model)
+        if price is None:
+            return None
+        return (prompt_tokens * price['prompt'] + completion_tokens * price['completion']) / 1_000_000
+
+    def record_attempt(
+        self,
+        trace: Dict[str, Any],
+        model: str,
+        depth: int,
+        attempt: int,
+        queue_wait: float,
+        latency: float,
+        outcome: str,
+        usage: Optional[Dict[str, Any]] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        content: Optional[str] = None,
+        status: Optional[int] = None,
+        error: Optional[str] = None,
+        hedge: bool = False
+    ):
+        """
+        One HTTP round trip. When content came back without a usage block from
+        the provider, tokens are estimated from messages and content (flagged as
+        estimated); a failed request with no content counts no tokens.
+
+        Args:
+            depth: Position of the model in the routed order (0 = first choice)
+            attempt: Retry index for this model (0 = first try)
+            queue_wait: Seconds between the attempt becoming due and the request being
+                sent (waiting for a hedge worker, or backing off before a retry)
+        """
+        usage = usage or {}
+        prompt_tokens = int(usage.get('prompt_tokens') or 0)
+        completion_tokens = int(usage.get('completion_tokens') or 0)
+        estimated = False
+        if not usage and content:
+            prompt_tokens = sum(_estimate_tokens(str(m.get('content', ''))) for m in messages or [])
+            completion_tokens = _estimate_tokens(content) if content else 0
+            estimated = True
+        cost = self._cost(model, usage, prompt_tokens, completion_tokens)
+
+        with self._lock:
+            trace['attempts'] += 1
+            for aggregate in (self._site(trace['site']), self._model(model)):
+                aggregate.add_usage(prompt_tokens, completion_tokens, estimated, cost)
+            model_stats = self._models[model]
+            model_stats.count(outcome)
+            model_stats.queue_waits.append(queue_wait)
+            if outcome in (OK, INVALID):
+                model_stats.latencies.append(latency)
+
+        self._write({
+            'type': 'attempt',
+            'ts': time.time(),
+            'call_id': trace['call_id'],
+            'site': trace['site'],
+            'model': model,
+            'streaming': trace['streaming'],
+            'depth': depth,
+            'attempt': attempt,
+            'hedge': hedge,
+            'queue_wait_ms': round(queue_wait * 1000, 1),
+            'latency_ms': round(latency * 1000, 1),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'estimated_usage': estimated,
+            'cost_usd': cost,
+            'outcome': outcome,
+            'status': status,
+            'error': error[:200] if error else None
+        })
+
+    def record_call(
+        self,
+        trace: Dict[str, Any],
+        outcome: str,
+        model: Optional[str] = None,
+        depth: Optional[int] = None,
+        cache_hit: bool = False
+    ):
+        """
+        End of a call: outcome is 'ok', 'cache_hit', 'cancelled' (a stream the
+        consumer abandoned) or 'failed'; depth is the winning model's position
+        """
+        latency = time.monotonic() - trace['started']
+        with self._lock:
+            site = self._site(trace['site'])
+            site.count('calls')
+            site.count(outcome)
+            if not cache_hit:
+                site.latencies.append(latency)
+            if depth is not None:
+                depths = self._depths.setdefault(trace['site'], {})
+                depths[depth] = depths.get(depth, 0) + 1
+
+        self._write({
+            'type': 'call',
+            'ts': time.time(),
+            'call_id': trace['call_id'],
+            'site': trace['site'],
+            'streaming': trace['streaming'],
+            'outcome': outcome,
+            'model': model,
+            'depth': depth,
+            'attempts': trace['attempts'],
+            'latency_ms': round(latency * 1000, 1)
+        })
+
+    def _site(self, site: str) -> _Aggregate:
+        aggregate = self._sites.get(site)
+        if aggregate is None:
+            aggregate = self._sites[site] = _Aggregate(self.window_size)
+        return aggregate
+
+    def _model(self, model: str) -> _Aggregate:
+        aggregate = self._models.get(model)
+        if aggregate is None:
+            aggregate = self._models[model] = _Aggregate(self.window_size)
+        return aggregate
+
+    def _write(self, record: Dict[str, Any]):
+        if self._sink is None:
+            return
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        try:
+            with self._sink_lock:
+                self._sink.write(line)
+        except (OSError, ValueError) as e:
+            print(f"⚠ LLM telemetry sink write failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-site and per-model aggregates, most expensive call sites first"""
+        with self._lock:
+            sites = {}
+            for name, site in self._sites.items():
+                calls = site.counts.get('calls', 0)
+                depths = self._depths.get(name, {})
+                fallbacks = sum(count for depth, count in depths.items() if depth > 0)
+                sites[name] = {
+                    'calls': calls,
+                    'succeeded': site.counts.get(OK, 0),
+                    'cache_hits': site.counts.get('cache_hit', 0),
+                    'cancelled': site.counts.get(CANCELLED, 0),
+                    'failed': site.counts.get('failed', 0),
+                    **site.latency_view('latency', site.latencies),
+                    **site.usage_view(),
+                    'avg_prompt_tokens': round(site.prompt_tokens / calls) if calls else 0,
+                    'fallback_rate': round(fallbacks / sum(depths.values()), 4) if depths else 0.0,
+                    'fallback_depths': {str(depth): count for depth, count in sorted(depths.items())}
+                }
+            models = {
+                name: {
+                    'attempts': sum(model.counts.get(outcome, 0) for outcome in OUTCOMES),
+                    'outcomes': {outcome: model.counts.get(outcome, 0) for outcome in OUTCOMES},
+                    **model.latency_view('latency', model.latencies),
+                    **model.latency_view('queue_wait', model.queue_waits),
+                    **model.usage_view()
+                }
+                for name, model in self._models.items()
+            }
+        ranked = sorted(sites.items(), key=lambda item: (-item[1]['cost_usd'], -item[1]['prompt_tokens']))
+        return {
+            'since': self._started_at,
+            'window_size': self.window_size,
+            'jsonl_sink': self.jsonl_path,
+            'totals': {
+                'calls': sum(site['calls'] for site in sites.values()),
+                'prompt_tokens': sum(site['prompt_tokens'] for site in sites.values()),
+                'completion_tokens': sum(site['completion_tokens'] for site in sites.values()),
+                'cost_usd': round(sum(site['cost_usd'] for site in sites.values()), 6)
+            },
+            'sites': dict(ranked),
+            'models': models
+        }
+
+
+llm_telemetry = LLMTelemetry(
+    window_size=int(os.getenv('LLM_TELEMETRY_WINDOW', '500')),
+    jsonl_path=os.getenv('LLM_TELEMETRY_JSONL') or None,
+    prices=_load_prices(os.getenv('LLM_MODEL_PRICES'))
+)
@@ -14,6 +14,7 @@ TESTS_DIR = CURRENT_FILE.parent
 PROJECT_ROOT = TESTS_DIR.parent
 BACKEND_PATH = PROJECT_ROOT / 'backend'
 FLASK_PATH = PROJECT_ROOT / 'AI_Services_Flask_App'
+SHARED_LLM_PATH = PROJECT_ROOT / 'selectra_llm'
 
 # Add backend to Python path first (most important)
 if str(BACKEND_PATH) not in sys.path:
@@ -22,6 +23,10 @@ if str(BACKEND_PATH) not in sys.path:
 if str(FLASK_PATH) not in sys.path:
     sys.path.insert(0, str(FLASK_PATH))
 
+# Shared LLM client used by both services (normally installed with pip install -e)
+if str(SHARED_LLM_PATH) not in sys.path:
+    sys.path.insert(0, str(SHARED_LLM_PATH))
+
 # Change working directory to backend if not already there
 original_cwd = os.getcwd()
 if 'backend' not in original_cwd: